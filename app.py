@@ -1,23 +1,39 @@
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, Response, JSONResponse
 from contextlib import asynccontextmanager
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from pathlib import Path
 import os
+import time
+import threading
 from datetime import datetime
 
 # Importações das rotas
 from routes.eventos import eventos_router
-from routes.auth import router as auth_router, verificar_autenticacao, get_current_user
+from routes.auth import router as auth_router, verificar_autenticacao, get_current_user, is_admin
 from routes.relatorios import router as relatorios_router
+from routes.perfis import router as perfis_router
 
 # Importações de configuração
 from config.database import conectar_db, fechar_conexao, get_database
 from config.secrets import SECRET_KEY, ALGORITHM
+from config.assets import StaticFilesOtimizados, StaticFilesVersionados
+from config.templates import templates, pre_compilar
+from services.metricas import (
+    registro, MetricasMiddleware, CONTENT_TYPE_METRICAS, token_metricas_valido
+)
+from services.saude import monitor_lag, verificador_saude, drenar_trabalhos_pendentes
+from services.watchdog import watchdog_loop, WATCHDOG_ATIVO
+from services.compressao import CompressaoMiddleware, COMPRESSAO_ATIVA
+from services.ao_vivo import canal_convidados
+from services.cabecalhos_eventos import cabecalhos_eventos
+from services.mudancas import ouvinte_mudancas, MUDANCAS_ATIVAS
+from services.perfilador import (
+    PERFILAMENTO_ATIVO, AmostradorPilha, amostrador_atual, controle_perfilamento,
+    perfil_solicitado, endpoint_da_requisicao, salvar_perfil
+)
 from jose import jwt
 
 # Obtém o diretório base do projeto
@@ -28,8 +44,21 @@ BASE_DIR = Path(__file__).resolve().parent
 async def lifespan(app: FastAPI):
     print("Iniciando aplicação...")
     await conectar_db()
+    print(f"Templates carregados: {pre_compilar()}")
+    monitor_lag.iniciar()
+    if WATCHDOG_ATIVO:
+        watchdog_loop.iniciar(app)
+    canal_convidados.encerrar_ao_receber_sinal()
+    if MUDANCAS_ATIVAS:
+        ouvinte_mudancas.assinar(cabecalhos_eventos.aplicar_mudanca)
+        ouvinte_mudancas.assinar(canal_convidados.aplicar_mudanca)
+        ouvinte_mudancas.iniciar(get_database())
     yield
     print("Encerrando aplicação...")
+    await drenar_trabalhos_pendentes(timeout=float(os.getenv("UVICORN_GRACEFUL_TIMEOUT", 30)))
+    watchdog_loop.parar()
+    await ouvinte_mudancas.parar()
+    await monitor_lag.parar()
     await fechar_conexao()
 
 # Criar a aplicação FastAPI
@@ -42,9 +71,6 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Configuração dos templates
-templates = Jinja2Templates(directory=str(BASE_DIR / "templates"))
-
 # Middleware de autenticação
 @app.middleware("http")
 async def authenticate(request: Request, call_next):
@@ -62,7 +88,8 @@ async def authenticate(request: Request, call_next):
         "/api/eventos/motivo-recusa",       # Adicionada rota de recusa
         "/static",
         "/uploads",
-        "/login"
+        "/login",
+        "/health"
     ]
     
     # Verifica se é uma rota de convidado (observações, motivo de recusa, etc)
@@ -78,6 +105,10 @@ async def authenticate(request: Request, call_next):
     # Se for uma solicitação de arquivo estático ou upload
     if request.url.path.startswith(("/static/", "/uploads/")):
         return await call_next(request)
+
+    # O /metrics tem autenticação própria (token do scraper ou administrador)
+    if request.url.path == "/metrics":
+        return await call_next(request)
     
     # Verifica se é uma rota de convidado
     is_guest_action = any(path in request.url.path for path in guest_paths)
@@ -111,6 +142,47 @@ async def authenticate(request: Request, call_next):
     response = await call_next(request)
     return response
 
+# Middleware de métricas (latência por rota e requisições em andamento),
+# medida até o fim do corpo das respostas em streaming
+app.add_middleware(MetricasMiddleware)
+
+# Middleware de perfilamento sob demanda (apenas administradores)
+@app.middleware("http")
+async def perfilar_requisicao(request: Request, call_next):
+    if not PERFILAMENTO_ATIVO or not perfil_solicitado(request):
+        return await call_next(request)
+
+    try:
+        user = await get_current_user(request)
+    except HTTPException:
+        user = None
+    if not user or not is_admin(user):
+        return await call_next(request)
+
+    if not controle_perfilamento.reservar():
+        response = await call_next(request)
+        response.headers["X-Profile-Status"] = "ocupado"
+        return response
+
+    try:
+        rota, endpoint = endpoint_da_requisicao(app, request.scope)
+        amostrador = AmostradorPilha(threading.get_ident(), getattr(endpoint, "__code__", None))
+        marcador = amostrador_atual.set(amostrador)
+        amostrador.iniciar()
+        try:
+            response = await call_next(request)
+        finally:
+            amostrador.parar()
+            amostrador_atual.reset(marcador)
+
+        response.headers["X-Profile-Id"] = salvar_perfil(amostrador, rota or request.url.path)
+        response.headers["X-Profile-Samples"] = str(amostrador.total_amostras)
+        if amostrador.interrompido:
+            response.headers["X-Profile-Status"] = "limite-atingido"
+        return response
+    finally:
+        controle_perfilamento.liberar()
+
 # Configura CORS
 app.add_middleware(
     CORSMiddleware,
@@ -128,6 +200,10 @@ app.add_middleware(
     max_age=1800  # 30 minutos
 )
 
+# Compressão das respostas JSON/HTML (a mais externa: comprime o corpo final)
+if COMPRESSAO_ATIVA:
+    app.add_middleware(CompressaoMiddleware)
+
 # Configuração de diretórios estáticos
 static_dir = BASE_DIR / "static"
 uploads_dir = BASE_DIR / "uploads"
@@ -137,13 +213,16 @@ static_dir.mkdir(exist_ok=True)
 uploads_dir.mkdir(exist_ok=True)
 
 # Monta diretórios estáticos
-app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-app.mount("/uploads", StaticFiles(directory=str(uploads_dir)), name="uploads")
+# Nomes com impressão digital (asset() nos templates) recebem cache imutável
+app.mount("/static", StaticFilesVersionados(directory=str(static_dir)), name="static")
+# Uploads: ETag forte, revalidação e Range (download parcial de arquivos grandes)
+app.mount("/uploads", StaticFilesOtimizados(directory=str(uploads_dir)), name="uploads")
 
 # Inclui os routers
 app.include_router(eventos_router, prefix="/api/eventos", tags=["eventos"])
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 app.include_router(relatorios_router, prefix="/api/relatorios", tags=["relatorios"])
+app.include_router(perfis_router, prefix="/api/perfis", tags=["perfis"])
 
 # Rota raiz
 @app.get("/", response_class=HTMLResponse)
@@ -285,9 +364,47 @@ async def health_check():
         "version": "1.0.0"
     }
 
-# Configuração para execução local
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness: o processo está de pé e o event loop responde"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness: retorna 503 quando o worker não deve receber tráfego"""
+    pronto, verificacoes = await verificador_saude.prontidao()
+    return JSONResponse(
+        status_code=200 if pronto else 503,
+        content={
+            "status": "ready" if pronto else "degraded",
+            "version": "1.0.0",
+            "checks": verificacoes
+        }
+    )
+
+# Rota de métricas no formato Prometheus
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    """Exporta as métricas do processo no formato de texto do Prometheus"""
+    if not token_metricas_valido(request.headers.get("authorization")):
+        try:
+            user = await get_current_user(request)
+        except HTTPException:
+            user = None
+        if not user or not is_admin(user):
+            raise HTTPException(
+                status_code=401,
+                detail="Não autenticado",
+                headers={"WWW-Authenticate": "Bearer"}
+            )
+    return Response(content=registro.exportar(), media_type=CONTENT_TYPE_METRICAS)
+
+# Configuração para execução local (desenvolvimento, com reload).
+# Em produção use `python servidor.py`.
 if __name__ == "__main__":
     import uvicorn
+    os.environ.setdefault("TEMPLATES_AUTO_RELOAD", "1")
+    os.environ.setdefault("PROFILING_ENABLED", "1")
     port = int(os.getenv("PORT", 8000))
     uvicorn.run(
         "app:app",
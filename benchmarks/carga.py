@@ -0,0 +1,363 @@
+"""
+Teste de carga das rotas de RSVP com um worker.
+
+A aplicação roda em um processo separado (um worker uvicorn) com o MongoDB
+substituído pelo mongomock-motor e o Mailjet por um servidor HTTP local
+(ver benchmarks/suporte.py). O processo principal semeia os eventos, gera a
+carga com vários clientes concorrentes e mede, por rota:
+    requisicoes, erros         total de respostas e de respostas >= 400 / falhas
+    rps                        requisições por segundo
+    p50_ms, p95_ms, p99_ms     percentis de latência
+    max_ms                     maior latência
+
+Rotas exercitadas (peso padrão entre parênteses, alterável com --mix):
+    confirmar (30)             GET  /api/eventos/confirmar/{token}
+    recusar (15)               GET  /api/eventos/recusar/{token}
+    confirmar_presenca (25)    GET  /api/eventos/confirmar-presenca/{id}/{email}/{sim|nao}
+    adicionar_convidado (15)   POST /api/eventos/{id}/convidados (envia convite)
+    importar_convidados (5)    POST /api/eventos/{id}/convidados/importar (envia convites)
+    relatorio_evento (8)       GET  /api/relatorios/gerar-relatorio-evento/{id}
+    relatorio_geral (2)        GET  /api/relatorios/gerar-relatorio
+
+Uso:
+    python benchmarks/carga.py --eventos 10 --convidados 500 --concorrencia 50 --duracao 30
+    python benchmarks/carga.py --mix confirmar=1,recusar=1 --latencia-mailjet-ms 0
+
+O resultado é salvo em JSON (padrão: benchmarks/resultados/).
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from suporte import BASE_DIR, preparar_ambiente, commit_atual
+
+DIRETORIO_RESULTADOS = BASE_DIR / "benchmarks" / "resultados"
+
+MIX_PADRAO = {
+    "confirmar": 30,
+    "recusar": 15,
+    "confirmar_presenca": 25,
+    "adicionar_convidado": 15,
+    "importar_convidados": 5,
+    "relatorio_evento": 8,
+    "relatorio_geral": 2,
+}
+
+# Convidados por planilha enviada na rota de importação
+CONVIDADOS_POR_PLANILHA = 20
+
+TEMPO_MAXIMO_INICIO = 60
+
+
+# ---------------------------------------------------------------------------
+# Processo do servidor
+# ---------------------------------------------------------------------------
+
+async def _servir(porta, mailjet_url, arquivo_semente, quantidade_eventos, convidados):
+    """Executado no processo filho: sobe a aplicação, semeia o banco e atende"""
+    preparar_ambiente()
+    import uvicorn
+    from bson import ObjectId
+    import app as modulo_app
+    from suporte import usar_mongodb_local, usar_dns_local, usar_mailjet_local, semear_eventos, cookie_admin
+    from config.database import obter_db
+    from services.email_service import email_service
+
+    usar_mongodb_local()
+    usar_dns_local()
+    usar_mailjet_local(mailjet_url)
+
+    servidor = uvicorn.Server(uvicorn.Config(
+        modulo_app.app, host="127.0.0.1", port=porta,
+        log_level="warning", access_log=False, lifespan="on"
+    ))
+    tarefa = asyncio.create_task(servidor.serve())
+    while not servidor.started:
+        if tarefa.done():
+            tarefa.result()
+            return
+        await asyncio.sleep(0.05)
+
+    db = obter_db()
+    eventos = []
+    for evento_id in await semear_eventos(db, quantidade_eventos, convidados):
+        evento = await db.eventos.find_one({"_id": ObjectId(evento_id)}, {"convidados.email": 1})
+        convites = []
+        for convidado in evento["convidados"]:
+            links = email_service.gerar_tokens_para_evento(evento_id, convidado["email"])
+            # Apenas o caminho: o processo principal usa a URL do servidor local
+            convites.append([convidado["email"], *(urlsplit(link).path for link in links)])
+        eventos.append({"id": evento_id, "convites": convites})
+
+    # Escreve em um arquivo temporário e renomeia, para o processo principal nunca ler pela metade
+    temporario = Path(f"{arquivo_semente}.parcial")
+    temporario.write_text(json.dumps({"eventos": eventos, "cookies": cookie_admin()}))
+    temporario.rename(arquivo_semente)
+    await tarefa
+
+
+def iniciar_servidor(porta, mailjet_url, quantidade_eventos, convidados):
+    """
+    Inicia o processo da aplicação e espera a semente do banco
+
+    Returns:
+        tuple: (processo, semente)
+    """
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as arquivo:
+        caminho = Path(arquivo.name)
+    caminho.unlink()
+    erros = tempfile.TemporaryFile(mode="w+")
+    processo = subprocess.Popen(
+        [sys.executable, __file__, "--servidor", str(caminho), "--porta", str(porta),
+         "--mailjet-url", mailjet_url, "--eventos", str(quantidade_eventos),
+         "--convidados", str(convidados)],
+        cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=erros
+    )
+    limite = time.monotonic() + TEMPO_MAXIMO_INICIO
+    while not caminho.exists():
+        if processo.poll() is not None or time.monotonic() > limite:
+            processo.kill()
+            erros.seek(0)
+            sys.exit(f"Falha ao iniciar a aplicação:\n{erros.read()}")
+        time.sleep(0.1)
+    semente = json.loads(caminho.read_text())
+    caminho.unlink()
+    return processo, semente
+
+
+def parar_servidor(processo):
+    processo.send_signal(signal.SIGINT)
+    try:
+        processo.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        processo.kill()
+
+
+def _porta_livre():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# ---------------------------------------------------------------------------
+# Geração de carga
+# ---------------------------------------------------------------------------
+
+class Cenario:
+    """Monta as requisições de cada rota a partir da semente do banco"""
+
+    def __init__(self, semente):
+        self.eventos = semente["eventos"]
+        self._sequencia = 0
+
+    def _proximo(self):
+        self._sequencia += 1
+        return self._sequencia
+
+    def _convite(self):
+        evento = random.choice(self.eventos)
+        return evento, random.choice(evento["convites"])
+
+    def _planilha(self):
+        # Uma planilha por requisição para que os emails sejam sempre novos
+        from suporte import gerar_planilha_convidados
+
+        return gerar_planilha_convidados(CONVIDADOS_POR_PLANILHA, prefixo=f"carga{self._proximo()}")
+
+    def requisicao(self, rota):
+        """Retorna (método, caminho, kwargs do httpx)"""
+        if rota == "confirmar":
+            _, (_, link, _) = self._convite()
+            return "GET", link, {}
+        if rota == "recusar":
+            _, (_, _, link) = self._convite()
+            return "GET", link, {}
+        if rota == "confirmar_presenca":
+            evento, (email, _, _) = self._convite()
+            resposta = random.choice(("sim", "nao"))
+            return "GET", f"/api/eventos/confirmar-presenca/{evento['id']}/{email}/{resposta}", {}
+        evento = random.choice(self.eventos)
+        if rota == "adicionar_convidado":
+            numero = self._proximo()
+            return "POST", f"/api/eventos/{evento['id']}/convidados", {"json": {
+                "nome": f"Convidado carga {numero}",
+                "email": f"carga{numero}@exemplo.com.br",
+                "telefone": "(11) 91234-5678",
+            }}
+        if rota == "importar_convidados":
+            arquivo = ("convidados.xlsx", self._planilha(),
+                       "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+            return "POST", f"/api/eventos/{evento['id']}/convidados/importar?enviar_emails=true", {
+                "files": {"file": arquivo}
+            }
+        if rota == "relatorio_evento":
+            return "GET", f"/api/relatorios/gerar-relatorio-evento/{evento['id']}", {}
+        if rota == "relatorio_geral":
+            return "GET", "/api/relatorios/gerar-relatorio", {}
+        raise ValueError(f"Rota desconhecida: {rota}")
+
+
+async def _executar_requisicao(cliente, cenario, rota):
+    metodo, caminho, kwargs = cenario.requisicao(rota)
+    inicio = time.perf_counter()
+    try:
+        resposta = await cliente.request(metodo, caminho, **kwargs)
+        await resposta.aread()
+        falhou = resposta.status_code >= 400
+    except Exception:
+        falhou = True
+    return (time.perf_counter() - inicio) * 1000, falhou
+
+
+async def gerar_carga(base_url, semente, mix, concorrencia, duracao):
+    """
+    Dispara requisições com `concorrencia` clientes durante `duracao` segundos
+
+    Returns:
+        tuple: (latências por rota, erros por rota, duração real em segundos)
+    """
+    import httpx
+
+    cenario = Cenario(semente)
+    rotas = [rota for rota, peso in mix.items() if peso > 0]
+    pesos = [mix[rota] for rota in rotas]
+    latencias = defaultdict(list)
+    erros = defaultdict(int)
+
+    limites = httpx.Limits(max_connections=concorrencia, max_keepalive_connections=concorrencia)
+    async with httpx.AsyncClient(base_url=base_url, cookies=semente["cookies"], limits=limites,
+                                 timeout=120) as cliente:
+        # Aquecimento: a primeira chamada de cada rota carrega módulos e templates
+        for rota in rotas:
+            await _executar_requisicao(cliente, cenario, rota)
+
+        limite = time.perf_counter() + duracao
+
+        async def usuario():
+            while time.perf_counter() < limite:
+                rota = random.choices(rotas, pesos)[0]
+                duracao_ms, falhou = await _executar_requisicao(cliente, cenario, rota)
+                latencias[rota].append(duracao_ms)
+                if falhou:
+                    erros[rota] += 1
+
+        inicio = time.perf_counter()
+        await asyncio.gather(*(usuario() for _ in range(concorrencia)))
+        decorrido = time.perf_counter() - inicio
+    return latencias, erros, decorrido
+
+
+def resumir(amostras, erros, decorrido):
+    """Percentis e vazão de uma rota"""
+    ordenadas = sorted(amostras)
+    if len(ordenadas) > 1:
+        cortes = statistics.quantiles(ordenadas, n=100, method="inclusive")
+        p50, p95, p99 = cortes[49], cortes[94], cortes[98]
+    else:
+        p50 = p95 = p99 = ordenadas[0]
+    return {
+        "requisicoes": len(ordenadas),
+        "erros": erros,
+        "rps": round(len(ordenadas) / decorrido, 1),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "p99_ms": round(p99, 1),
+        "max_ms": round(ordenadas[-1], 1),
+    }
+
+
+def _imprimir_tabela(resultado):
+    colunas = ("requisicoes", "erros", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms")
+    print(f"{'rota':<22}" + "".join(f"{c:>12}" for c in colunas))
+    for rota, resumo in {**resultado["rotas"], "total": resultado["total"]}.items():
+        print(f"{rota:<22}" + "".join(f"{resumo[c]:>12}" for c in colunas))
+    print(f"Envios recebidos pelo Mailjet falso: {resultado['envios_mailjet']}")
+
+
+def _ler_mix(texto):
+    mix = {rota: 0 for rota in MIX_PADRAO}
+    for item in texto.split(","):
+        rota, _, peso = item.partition("=")
+        rota = rota.strip()
+        if rota not in MIX_PADRAO:
+            raise argparse.ArgumentTypeError(f"Rota desconhecida: {rota}. Use uma de {', '.join(MIX_PADRAO)}")
+        mix[rota] = float(peso or 1)
+    return mix
+
+
+def executar(args):
+    from suporte import ServidorMailjetFalso
+
+    with ServidorMailjetFalso(latencia_ms=args.latencia_mailjet_ms) as mailjet:
+        porta = _porta_livre()
+        processo, semente = iniciar_servidor(porta, mailjet.url, args.eventos, args.convidados)
+        try:
+            latencias, erros, decorrido = asyncio.run(gerar_carga(
+                f"http://127.0.0.1:{porta}", semente, args.mix, args.concorrencia, args.duracao
+            ))
+        finally:
+            parar_servidor(processo)
+        envios = mailjet.envios
+
+    todas = [valor for amostras in latencias.values() for valor in amostras]
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": {
+            "eventos": args.eventos,
+            "convidados": args.convidados,
+            "concorrencia": args.concorrencia,
+            "duracao_s": args.duracao,
+            "latencia_mailjet_ms": args.latencia_mailjet_ms,
+            "mix": args.mix,
+        },
+        "duracao_real_s": round(decorrido, 2),
+        "envios_mailjet": envios,
+        "total": resumir(todas, sum(erros.values()), decorrido),
+        "rotas": {rota: resumir(latencias[rota], erros[rota], decorrido) for rota in args.mix if latencias[rota]},
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--eventos", type=int, default=10)
+    parser.add_argument("--convidados", type=int, default=500, help="convidados semeados por evento")
+    parser.add_argument("--concorrencia", type=int, default=50, help="clientes simultâneos")
+    parser.add_argument("--duracao", type=float, default=30, help="segundos de carga")
+    parser.add_argument("--latencia-mailjet-ms", type=float, default=50, help="tempo de resposta do Mailjet falso")
+    parser.add_argument("--mix", type=_ler_mix, default=dict(MIX_PADRAO),
+                        help="pesos por rota, ex: confirmar=3,recusar=1 (rotas omitidas ficam fora)")
+    parser.add_argument("--saida", type=Path, help="arquivo JSON de saída (padrão: benchmarks/resultados/)")
+    parser.add_argument("--servidor", help=argparse.SUPPRESS)
+    parser.add_argument("--porta", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--mailjet-url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.servidor:
+        try:
+            asyncio.run(_servir(args.porta, args.mailjet_url, args.servidor, args.eventos, args.convidados))
+        except KeyboardInterrupt:
+            pass
+        sys.exit(0)
+
+    resultado = executar(args)
+    saida = args.saida or DIRETORIO_RESULTADOS / f"carga-{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    _imprimir_tabela(resultado)
+    print(f"Resultado salvo em {saida}")
@@ -0,0 +1,162 @@
+"""
+Benchmark de inicialização da aplicação.
+
+Cada repetição roda em um interpretador novo e mede:
+    importacao_ms          tempo de `import app`
+    inicializacao_ms       startup do lifespan (conexão com o MongoDB local, monitores)
+    primeira_<rota>_ms     latência da primeira requisição de cada rota
+    segunda_<rota>_ms      latência da mesma requisição já aquecida
+    encerramento_ms        shutdown do lifespan
+    memoria_*_mib          memória máxima do processo (um worker) em cada etapa
+
+O MongoDB é substituído pelo mongomock-motor (ver benchmarks/suporte.py).
+O resultado (mediana das repetições) é salvo em JSON e pode ser comparado
+com uma execução anterior para detectar regressões:
+
+    python benchmarks/inicializacao.py --repeticoes 5 --saida base.json
+    python benchmarks/inicializacao.py --comparar base.json --tolerancia 0.2
+
+Com --comparar, sai com código 1 se alguma métrica piorar mais que a
+tolerância (relativa) em relação ao arquivo informado.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from suporte import BASE_DIR, preparar_ambiente, commit_atual, comparar_metricas
+
+DIRETORIO_RESULTADOS = BASE_DIR / "benchmarks" / "resultados"
+
+
+def _memoria_mib():
+    import resource
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _requisitar(cliente, metodo, caminho):
+    inicio = time.perf_counter()
+    resposta = await cliente.request(metodo, caminho)
+    duracao = (time.perf_counter() - inicio) * 1000
+    if resposta.status_code >= 500:
+        raise RuntimeError(f"{metodo} {caminho} retornou {resposta.status_code}")
+    return duracao
+
+
+async def _medir_processo(convidados):
+    """Executado no processo filho: mede uma inicialização completa"""
+    preparar_ambiente()
+    metricas = {}
+
+    inicio = time.perf_counter()
+    import app as modulo_app
+    metricas["importacao_ms"] = (time.perf_counter() - inicio) * 1000
+    metricas["memoria_importacao_mib"] = _memoria_mib()
+
+    import httpx
+    from suporte import usar_mongodb_local, semear_eventos, cookie_admin
+    from config.database import obter_db
+
+    usar_mongodb_local()
+    aplicacao = modulo_app.app
+
+    lifespan = aplicacao.router.lifespan_context(aplicacao)
+    inicio = time.perf_counter()
+    await lifespan.__aenter__()
+    metricas["inicializacao_ms"] = (time.perf_counter() - inicio) * 1000
+    metricas["memoria_inicializacao_mib"] = _memoria_mib()
+
+    evento_id = (await semear_eventos(obter_db(), 1, convidados))[0]
+    rotas = {
+        "health": ("GET", "/health/live"),
+        "login": ("GET", "/login"),
+        "listar_eventos": ("GET", "/api/eventos/"),
+        "obter_evento": ("GET", f"/api/eventos/{evento_id}"),
+        "relatorio_evento": ("GET", f"/api/relatorios/gerar-relatorio-evento/{evento_id}"),
+    }
+
+    transporte = httpx.ASGITransport(app=aplicacao)
+    async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark",
+                                 cookies=cookie_admin()) as cliente:
+        for nome, (metodo, caminho) in rotas.items():
+            metricas[f"primeira_{nome}_ms"] = await _requisitar(cliente, metodo, caminho)
+        for nome, (metodo, caminho) in rotas.items():
+            metricas[f"segunda_{nome}_ms"] = await _requisitar(cliente, metodo, caminho)
+    metricas["memoria_apos_requisicoes_mib"] = _memoria_mib()
+
+    inicio = time.perf_counter()
+    await lifespan.__aexit__(None, None, None)
+    metricas["encerramento_ms"] = (time.perf_counter() - inicio) * 1000
+    return metricas
+
+
+def medir_em_processo_novo(convidados):
+    """Roda uma repetição em um interpretador novo e retorna as métricas"""
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as arquivo:
+        caminho = arquivo.name
+    try:
+        processo = subprocess.run(
+            [sys.executable, __file__, "--filho", caminho, "--convidados", str(convidados)],
+            cwd=BASE_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if processo.returncode != 0:
+            sys.exit(f"Falha na medição:\n{processo.stderr}")
+        return json.loads(Path(caminho).read_text())
+    finally:
+        os.unlink(caminho)
+
+
+def executar(repeticoes, convidados):
+    medicoes = [medir_em_processo_novo(convidados) for _ in range(repeticoes)]
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "convidados": convidados,
+        "metricas": {
+            nome: round(statistics.median(m[nome] for m in medicoes), 2)
+            for nome in medicoes[0]
+        },
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--convidados", type=int, default=500, help="convidados do evento usado nas requisições")
+    parser.add_argument("--saida", type=Path, help="arquivo JSON de saída (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    parser.add_argument("--filho", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.filho:
+        Path(args.filho).write_text(json.dumps(asyncio.run(_medir_processo(args.convidados))))
+        sys.exit(0)
+
+    resultado = executar(args.repeticoes, args.convidados)
+    saida = args.saida or DIRETORIO_RESULTADOS / f"inicializacao-{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    print(json.dumps(resultado["metricas"], indent=2))
+    print(f"Resultado salvo em {saida}")
+
+    if args.comparar:
+        regressoes = comparar_metricas(resultado, json.loads(args.comparar.read_text()), args.tolerancia)
+        if regressoes:
+            print("Regressões em relação a", args.comparar)
+            for regressao in regressoes:
+                print("  " + regressao)
+            sys.exit(1)
+        print("Sem regressões em relação a", args.comparar)
@@ -0,0 +1,85 @@
+"""
+Verificação do orçamento de inicialização da aplicação.
+
+Importa `app` em interpretadores novos (para não aproveitar módulos já
+carregados), mede o tempo de importação e a memória do processo, e confere
+que as dependências pesadas continuam fora da inicialização: elas devem ser
+importadas apenas no primeiro uso dos relatórios, da importação de planilhas,
+do envio de emails e da verificação de domínios (DNS). O mesmo orçamento é
+conferido a cada execução dos testes por tests/test_orcamento_importacao.py.
+
+Uso:
+    python benchmarks/orcamento_importacao.py [--repeticoes 5] [--orcamento-ms 1500]
+
+Sai com código 1 se a mediana passar do orçamento ou se algum módulo
+pesado for importado junto com a aplicação.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Módulos que não podem ser carregados na importação de app
+MODULOS_PESADOS = ("openpyxl", "pandas", "numpy", "bs4", "mailjet_rest", "dns")
+
+ORCAMENTO_PADRAO_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+CODIGO_MEDICAO = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+import app
+duracao = time.perf_counter() - inicio
+print(json.dumps({
+    "importacao_ms": duracao * 1000,
+    "memoria_mib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "carregados": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def medir_importacao():
+    """Importa app em um processo novo e retorna as medições"""
+    resultado = subprocess.run(
+        [sys.executable, "-c", CODIGO_MEDICAO % (MODULOS_PESADOS,)],
+        cwd=BASE_DIR, capture_output=True, text=True
+    )
+    if resultado.returncode != 0:
+        sys.exit(f"Falha ao importar app:\n{resultado.stderr}")
+    # A última linha é o JSON; as anteriores são prints da aplicação
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def verificar(repeticoes, orcamento_ms):
+    medicoes = [medir_importacao() for _ in range(repeticoes)]
+    tempos = [m["importacao_ms"] for m in medicoes]
+    carregados = sorted({modulo for m in medicoes for modulo in m["carregados"]})
+    resumo = {
+        "importacao_ms_mediana": round(statistics.median(tempos), 1),
+        "importacao_ms_min": round(min(tempos), 1),
+        "memoria_mib_max": round(max(m["memoria_mib"] for m in medicoes), 1),
+        "orcamento_ms": orcamento_ms,
+        "modulos_pesados_carregados": carregados,
+    }
+    resumo["ok"] = resumo["importacao_ms_mediana"] <= orcamento_ms and not carregados
+    return resumo
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--orcamento-ms", type=float, default=ORCAMENTO_PADRAO_MS)
+    args = parser.parse_args()
+
+    resumo = verificar(args.repeticoes, args.orcamento_ms)
+    print(json.dumps(resumo, indent=2, ensure_ascii=False))
+    if not resumo["ok"]:
+        if resumo["modulos_pesados_carregados"]:
+            print(f"Módulos pesados importados na inicialização: {', '.join(resumo['modulos_pesados_carregados'])}")
+        else:
+            print(f"Importação acima do orçamento de {args.orcamento_ms:.0f}ms")
+        sys.exit(1)
@@ -0,0 +1,200 @@
+"""
+Micro-benchmarks dos geradores de planilhas dos relatórios.
+
+Executa os geradores de services/planilhas.py (os mesmos chamados pelas rotas
+de relatórios) com eventos sintéticos, sem banco de dados. Os convidados são
+montados no mesmo formato de DataFrame produzido por carregar_quadro.
+Para cada relatório e quantidade de convidados são medidos:
+    <relatorio>_<n>_ms         mediana do tempo de geração
+    <relatorio>_<n>_mib        pico de memória alocada durante a geração (tracemalloc)
+    <relatorio>_<n>_kib        tamanho do arquivo .xlsx gerado
+
+Relatórios: geral, evento, completo. Nos relatórios geral e completo os
+convidados são divididos entre --eventos eventos.
+
+Uso:
+    python benchmarks/relatorios.py --convidados 100 10000 100000
+    python benchmarks/relatorios.py --relatorios evento --convidados 10000 --saida base.json
+    python benchmarks/relatorios.py --relatorios evento --convidados 10000 --comparar base.json
+
+O tempo é medido sem o tracemalloc ativo; o pico de memória vem de uma
+execução extra com o tracemalloc ligado. Quando uma geração passa de
+--limite-s segundos, as quantidades maiores daquele relatório são puladas
+(e registradas em "ignorados"), já que o custo dos geradores cresce mais que
+linearmente com o número de convidados. Com --comparar, sai com código 1 se
+alguma métrica piorar mais que a tolerância em relação ao arquivo informado.
+"""
+import argparse
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+from suporte import BASE_DIR, commit_atual, comparar_metricas, gerar_convidados
+
+DIRETORIO_RESULTADOS = BASE_DIR / "benchmarks" / "resultados"
+
+RELATORIOS = ("geral", "evento", "completo")
+QUANTIDADES_PADRAO = (100, 10_000, 100_000)
+
+# Campos do $project de cada rota em routes/relatorios.py
+CAMPOS_CONVIDADO = ["nome", "email", "telefone", "status", "observacoes"]
+CAMPOS_GERAL = ["evento_nome", "evento_data", "nome", "email", "telefone", "status"]
+CAMPOS_COMPLETO = ["evento_id", "evento_nome", "evento_data", "evento_local"] + CAMPOS_CONVIDADO
+
+
+def gerar_cabecalhos(quantidade_eventos):
+    """Cabeçalhos dos eventos, como retornados pelas consultas com projeção"""
+    from bson import ObjectId
+
+    return [
+        {
+            "_id": ObjectId(),
+            "nome": f"Evento de benchmark {i}",
+            "data": "2099-12-31",
+            "hora": "19:00",
+            "local": "Salão de testes",
+            "responsavel": "Benchmark",
+            "categoria": "outros",
+            "status": "ativo",
+            "descricao": "Evento gerado para benchmark",
+        }
+        for i in range(quantidade_eventos)
+    ]
+
+
+def montar_quadro(convidados, eventos, campos):
+    """DataFrame de convidados no formato de carregar_quadro, distribuídos entre os eventos"""
+    import pandas as pd
+
+    colunas = {campo: [] for campo in campos}
+    for i, convidado in enumerate(convidados):
+        evento = eventos[i % len(eventos)]
+        linha = {
+            **convidado,
+            "evento_id": str(evento["_id"]),
+            "evento_nome": evento["nome"],
+            "evento_data": evento["data"],
+            "evento_local": evento["local"],
+        }
+        for campo in campos:
+            colunas[campo].append(linha[campo])
+    return pd.DataFrame(colunas, columns=campos)
+
+
+def preparar(relatorio, quantidade, quantidade_eventos):
+    """
+    Monta os dados de entrada de um relatório
+
+    Returns:
+        tuple: (função geradora, argumentos)
+    """
+    from services import planilhas
+
+    convidados = gerar_convidados(quantidade)
+    if relatorio == "evento":
+        evento = gerar_cabecalhos(1)[0]
+        return planilhas.montar_relatorio_evento, (evento, montar_quadro(convidados, [evento], CAMPOS_CONVIDADO))
+    eventos = gerar_cabecalhos(quantidade_eventos)
+    if relatorio == "geral":
+        return planilhas.montar_relatorio_geral, (montar_quadro(convidados, eventos, CAMPOS_GERAL),)
+    return planilhas.montar_relatorio_completo, (eventos, montar_quadro(convidados, eventos, CAMPOS_COMPLETO))
+
+
+def medir(funcao, argumentos, repeticoes):
+    """
+    Returns:
+        dict: tempo (mediana), pico de memória e tamanho do arquivo
+    """
+    tempos = []
+    for _ in range(repeticoes):
+        gc.collect()
+        inicio = time.perf_counter()
+        saida = funcao(*argumentos)
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    tamanho = len(saida.getbuffer())
+    del saida
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcao(*argumentos)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "ms": round(statistics.median(tempos), 1),
+        "mib": round(pico / 1024 / 1024, 1),
+        "kib": round(tamanho / 1024, 1),
+    }
+
+
+def executar(relatorios, quantidades, quantidade_eventos, repeticoes, limite_s):
+    # Importa openpyxl e pandas antes das medições
+    import services.planilhas  # noqa: F401
+
+    metricas = {}
+    ignorados = []
+    lentos = set()
+    for quantidade in sorted(quantidades):
+        for relatorio in relatorios:
+            if relatorio in lentos:
+                ignorados.append(f"{relatorio}_{quantidade}")
+                print(f"{relatorio:<10}{quantidade:>10} convidados: ignorado (acima de {limite_s:.0f}s)", flush=True)
+                continue
+            funcao, argumentos = preparar(relatorio, quantidade, quantidade_eventos)
+            resultado = medir(funcao, argumentos, repeticoes)
+            for unidade, valor in resultado.items():
+                metricas[f"{relatorio}_{quantidade}_{unidade}"] = valor
+            print(f"{relatorio:<10}{quantidade:>10} convidados: {resultado['ms']:>10.1f} ms"
+                  f"{resultado['mib']:>10.1f} MiB{resultado['kib']:>12.1f} KiB", flush=True)
+            del funcao, argumentos
+            if resultado["ms"] > limite_s * 1000:
+                lentos.add(relatorio)
+
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit_atual(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "eventos": quantidade_eventos,
+        "limite_s": limite_s,
+        "metricas": metricas,
+        "ignorados": ignorados,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--relatorios", nargs="+", choices=RELATORIOS, default=list(RELATORIOS))
+    parser.add_argument("--convidados", nargs="+", type=int, default=list(QUANTIDADES_PADRAO))
+    parser.add_argument("--eventos", type=int, default=10, help="eventos nos relatórios geral e completo")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--limite-s", type=float, default=120,
+                        help="pula as quantidades maiores de um relatório que passar deste tempo")
+    parser.add_argument("--saida", type=Path, help="arquivo JSON de saída (padrão: benchmarks/resultados/)")
+    parser.add_argument("--comparar", type=Path, help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    resultado = executar(args.relatorios, args.convidados, args.eventos, args.repeticoes, args.limite_s)
+    saida = args.saida or DIRETORIO_RESULTADOS / f"relatorios-{datetime.now():%Y%m%d-%H%M%S}.json"
+    saida.parent.mkdir(parents=True, exist_ok=True)
+    saida.write_text(json.dumps(resultado, indent=2, ensure_ascii=False))
+    print(f"Resultado salvo em {saida}")
+
+    if args.comparar:
+        regressoes = comparar_metricas(resultado, json.loads(args.comparar.read_text()), args.tolerancia)
+        if regressoes:
+            print("Regressões em relação a", args.comparar)
+            for regressao in regressoes:
+                print("  " + regressao)
+            sys.exit(1)
+        print("Sem regressões em relação a", args.comparar)
@@ -0,0 +1,231 @@
+"""
+Substitutos locais usados pelos benchmarks.
+
+O MongoDB é substituído pelo mongomock-motor (em memória), o Mailjet por um
+servidor HTTP local que aceita os envios e o DNS dos emails por um resolver
+que aceita qualquer domínio. Os dados de teste são gerados aqui, para que os
+benchmarks rodem sem serviços externos. Nada deste módulo é importado pela
+aplicação.
+
+Dependências extras (apenas para os benchmarks): benchmarks/requirements.txt
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+STATUS_SINTETICOS = ("pendente", "confirmado", "recusado")
+
+# Diferenças absolutas menores que estas são tratadas como ruído na comparação
+RUIDO_MS = 5.0
+RUIDO_MIB = 2.0
+
+
+def preparar_ambiente():
+    """Variáveis de ambiente mínimas para a aplicação iniciar localmente"""
+    os.environ.setdefault("MONGODB_URL", "mongodb://benchmark.local:27017")
+    os.environ.setdefault("DATABASE_NAME", "rsvp_benchmark")
+    os.environ.setdefault("MAILJET_API_KEY", "benchmark")
+    os.environ.setdefault("MAILJET_API_SECRET", "benchmark")
+    os.environ.setdefault("PROFILING_ENABLED", "0")
+
+
+def usar_mongodb_local():
+    """Faz conectar_db criar um cliente mongomock-motor em vez do Motor real"""
+    from mongomock_motor import AsyncMongoMockClient
+    import config.database
+
+    config.database.AsyncIOMotorClient = AsyncMongoMockClient
+    _compatibilizar_mongomock()
+
+
+def _compatibilizar_mongomock():
+    """O mongomock ainda não aceita o argumento sort repassado pelo bulk_write do pymongo 4.11"""
+    import mongomock.collection
+
+    construtor = mongomock.collection.BulkOperationBuilder
+    if getattr(construtor, "_sort_ignorado", False):
+        return
+    add_update = construtor.add_update
+
+    def add_update_sem_sort(self, *args, sort=None, **kwargs):
+        return add_update(self, *args, **kwargs)
+
+    construtor.add_update = add_update_sem_sort
+    construtor._sort_ignorado = True
+
+
+def usar_dns_local():
+    """Aceita qualquer domínio de email sem consultar o DNS"""
+    from config.email_validador import verificador_dominios
+
+    verificador_dominios._resolver = lambda dominio: (True, "Domínio aceita emails", True)
+
+
+def usar_mailjet_local(api_url):
+    """Aponta o cliente Mailjet da aplicação para o servidor falso em api_url"""
+    from mailjet_rest import Client
+    from services.email_service import email_service
+
+    email_service.mailjet = Client(auth=("benchmark", "benchmark"), version="v3.1", api_url=api_url)
+
+
+class ServidorMailjetFalso:
+    """
+    Servidor HTTP local que responde aos envios como a API v3.1 do Mailjet.
+
+    Roda em uma thread própria; `latencia_ms` simula o tempo de resposta da
+    API real. Uso:
+
+        with ServidorMailjetFalso(latencia_ms=50) as mailjet:
+            usar_mailjet_local(mailjet.url)
+    """
+
+    def __init__(self, latencia_ms=0):
+        self.latencia = latencia_ms / 1000
+        self.envios = 0
+        self._lock = threading.Lock()
+        self._servidor = None
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._servidor.server_port}/"
+
+    def _criar_handler(self):
+        falso = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                corpo = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                mensagens = json.loads(corpo or b"{}").get("Messages", [])
+                if falso.latencia:
+                    time.sleep(falso.latencia)
+                with falso._lock:
+                    falso.envios += len(mensagens)
+                resposta = json.dumps({"Messages": [{"Status": "success"} for _ in mensagens]}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(resposta)))
+                self.end_headers()
+                self.wfile.write(resposta)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def iniciar(self):
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", 0), self._criar_handler())
+        self._servidor.daemon_threads = True
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="mailjet-falso", daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *args):
+        self.parar()
+
+
+def gerar_convidados(quantidade, com_observacoes=0.2):
+    """Lista de convidados sintéticos no formato gravado em eventos.convidados"""
+    a_cada = int(1 / com_observacoes) if com_observacoes else 0
+    return [
+        {
+            "nome": f"Convidado {i}",
+            "email": f"convidado{i}@exemplo{i % 50}.com.br",
+            "telefone": f"(11) 9{i % 10000:04d}-{i % 9000 + 1000:04d}",
+            "status": STATUS_SINTETICOS[i % len(STATUS_SINTETICOS)],
+            "observacoes": f"Observação do convidado {i}" if a_cada and i % a_cada == 0 else None,
+        }
+        for i in range(quantidade)
+    ]
+
+
+def gerar_evento(quantidade_convidados, indice=0):
+    """Documento de evento sintético com data futura"""
+    return {
+        "nome": f"Evento de benchmark {indice}",
+        "responsavel": "Benchmark",
+        "data": "2099-12-31",
+        "hora": "19:00",
+        "local": "Salão de testes",
+        "descricao": "Evento gerado para benchmark",
+        "categoria": "outros",
+        "status": "ativo",
+        "convidados": gerar_convidados(quantidade_convidados),
+    }
+
+
+def gerar_planilha_convidados(quantidade, prefixo="importado"):
+    """Planilha .xlsx (bytes) no formato aceito pela importação de convidados"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    worksheet = workbook.active
+    worksheet.append(["Nome", "Email", "Telefone", "Observações"])
+    for i in range(quantidade):
+        worksheet.append([f"Convidado {prefixo} {i}", f"{prefixo}.{i}@exemplo.com.br", "(11) 91234-5678", None])
+    saida = io.BytesIO()
+    workbook.save(saida)
+    return saida.getvalue()
+
+
+async def semear_eventos(db, quantidade_eventos, convidados_por_evento):
+    """Grava eventos sintéticos e retorna os ids (str)"""
+    resultado = await db.eventos.insert_many(
+        [gerar_evento(convidados_por_evento, i) for i in range(quantidade_eventos)]
+    )
+    return [str(evento_id) for evento_id in resultado.inserted_ids]
+
+
+def cookie_admin():
+    """Cookie de sessão de um administrador"""
+    from routes.auth import create_access_token
+
+    return {"access_token": create_access_token({"sub": "admin", "role": "admin"})}
+
+
+def commit_atual():
+    """Hash curto do commit atual, registrado junto com os resultados"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar_metricas(atual, anterior, tolerancia):
+    """
+    Compara as métricas ("<nome>_ms" ou "<nome>_mib") com uma execução anterior
+
+    Returns:
+        list: Descrição das métricas que pioraram além da tolerância
+    """
+    regressoes = []
+    for nome, valor in atual["metricas"].items():
+        base = anterior.get("metricas", {}).get(nome)
+        if base is None:
+            continue
+        ruido = RUIDO_MIB if nome.endswith("_mib") else RUIDO_MS
+        if valor - base > max(base * tolerancia, ruido):
+            regressoes.append(f"{nome}: {base} -> {valor} (+{(valor / base - 1) * 100 if base else 0:.0f}%)")
+    return regressoes
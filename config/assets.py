@@ -0,0 +1,408 @@
+"""
+Assets estáticos do front-end (CSS, JS e fontes).
+
+As bibliotecas de terceiros ficam em static/vendor/, uma cópia de cada
+(sem versões duplicadas). O diretório não é versionado e nada é baixado ao
+subir o servidor: as bibliotecas são baixadas no build com
+
+    python -m config.assets [--forcar]        baixa as bibliotecas e comprime
+    python -m config.assets --comprimir       apenas gera as variantes .br/.gz
+    python -m config.assets --fixar           mostra o sha256 das bibliotecas na CDN
+
+Cada biblioteca tem o sha256 do arquivo fixado em BIBLIOTECAS. O download só
+é gravado se o hash conferir, e uma cópia local que não confere (ou de uma
+biblioteca ainda sem hash fixado) não é servida: `asset` devolve o endereço
+da CDN e /static responde 404. Para fixar uma biblioteca nova, confira a
+saída de `--fixar` com o hash publicado pelo projeto e copie-o para
+BIBLIOTECAS.
+
+Os templates referenciam qualquer arquivo de static/ com
+`{{ asset('css/style.css') }}`, que devolve o nome com a impressão digital
+do conteúdo (ex: /static/css/style.3f2a9c1b7d4e.css). Como o nome muda
+sempre que o arquivo muda, esses endereços são servidos com cache imutável
+de um ano; os caminhos sem impressão digital continuam acessíveis, com
+revalidação. Enquanto uma biblioteca não foi baixada (ou não confere com o
+hash fixado), `asset` devolve o endereço de origem na CDN.
+
+Os mounts /static e /uploads usam StaticFilesOtimizados: ETag forte (hash
+do conteúdo), requisições condicionais (304), Range e, em /static, as
+variantes pré-comprimidas .br/.gz geradas por pre_comprimir (executado pelo
+servidor.py antes de subir os workers, ou com `python -m config.assets
+--comprimir`). A variante brotli exige o pacote Brotli; sem ele apenas o
+gzip é gerado.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import re
+import stat
+import sys
+from collections import namedtuple
+from mimetypes import guess_type
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+STATIC_DIR = BASE_DIR / "static"
+
+# Bibliotecas de terceiros: caminho em static/ -> endereço de origem (sempre
+# com a versão exata, para que a cópia local e a CDN sirvam o mesmo arquivo) e
+# sha256 do arquivo. Sem o hash fixado (None) a biblioteca não é baixada nem
+# servida localmente: as páginas usam a CDN.
+Biblioteca = namedtuple("Biblioteca", ["url", "sha256"])
+
+BIBLIOTECAS = {
+    "vendor/bootstrap/bootstrap.min.css":
+        Biblioteca("https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css", None),
+    "vendor/bootstrap/bootstrap.bundle.min.js":
+        Biblioteca("https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js", None),
+    "vendor/bootstrap-icons/bootstrap-icons.css":
+        Biblioteca("https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css", None),
+    # Fontes referenciadas pelo CSS acima (caminho relativo fonts/)
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff2":
+        Biblioteca("https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff2", None),
+    "vendor/bootstrap-icons/fonts/bootstrap-icons.woff":
+        Biblioteca("https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff", None),
+    "vendor/sweetalert2/sweetalert2.min.css":
+        Biblioteca("https://cdn.jsdelivr.net/npm/sweetalert2@11.10.5/dist/sweetalert2.min.css", None),
+    "vendor/sweetalert2/sweetalert2.min.js":
+        Biblioteca("https://cdn.jsdelivr.net/npm/sweetalert2@11.10.5/dist/sweetalert2.min.js", None),
+    "vendor/jquery/jquery.min.js":
+        Biblioteca("https://code.jquery.com/jquery-3.6.0.min.js", None),
+    "vendor/exceljs/exceljs.min.js":
+        Biblioteca("https://cdn.jsdelivr.net/npm/exceljs@4.3.0/dist/exceljs.min.js", None),
+}
+
+TAMANHO_IMPRESSAO = 12
+# nome.<impressão>.extensão, como gerado por ManifestoAssets.url
+PADRAO_IMPRESSAO = re.compile(r'^(?P<base>.+)\.(?P<impressao>[0-9a-f]{%d})(?P<extensao>\.\w+)$' % TAMANHO_IMPRESSAO)
+
+CACHE_IMUTAVEL = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+# Pré-compressão: extensões de texto, tamanho mínimo e variantes em ordem de preferência
+EXTENSOES_COMPRIMIVEIS = {".css", ".js", ".json", ".svg", ".html", ".txt", ".map", ".xml"}
+TAMANHO_MINIMO_COMPRESSAO = 1024
+VARIANTES = (("br", ".br"), ("gzip", ".gz"))
+
+# caminho absoluto -> ((mtime, tamanho), sha256 do conteúdo)
+_hashes = {}
+
+
+def sha256_arquivo(caminho, estado):
+    """
+    sha256 do conteúdo de um arquivo, recalculado apenas quando o arquivo
+    muda (mtime ou tamanho diferentes)
+    """
+    versao = (estado.st_mtime_ns, estado.st_size)
+    item = _hashes.get(caminho)
+    if item is None or item[0] != versao:
+        digest = hashlib.sha256()
+        with open(caminho, "rb") as arquivo:
+            for bloco in iter(lambda: arquivo.read(1024 * 1024), b""):
+                digest.update(bloco)
+        item = (versao, digest.hexdigest())
+        _hashes[caminho] = item
+    return item[1]
+
+
+def impressao_arquivo(caminho, estado):
+    """Impressão digital (início do sha256) do conteúdo de um arquivo"""
+    return sha256_arquivo(caminho, estado)[:TAMANHO_IMPRESSAO]
+
+
+class ManifestoAssets:
+    """Impressões digitais (hash do conteúdo) dos arquivos de static/"""
+
+    def __init__(self, diretorio=STATIC_DIR, bibliotecas=BIBLIOTECAS):
+        self.diretorio = Path(diretorio).resolve()
+        self.bibliotecas = bibliotecas
+
+    def _hash(self, caminho):
+        arquivo = (self.diretorio / caminho).resolve()
+        if not arquivo.is_relative_to(self.diretorio):
+            return None
+        try:
+            estado = arquivo.stat()
+        except OSError:
+            return None
+        return sha256_arquivo(str(arquivo), estado)
+
+    def integra(self, caminho):
+        """
+        Indica se um arquivo de static/ pode ser servido: arquivos que não são
+        bibliotecas de terceiros sempre podem; bibliotecas apenas se a cópia
+        local confere com o sha256 fixado em BIBLIOTECAS
+        """
+        biblioteca = self.bibliotecas.get(caminho)
+        if biblioteca is None:
+            return True
+        if biblioteca.sha256 is None:
+            return False
+        digest = self._hash(caminho)
+        if digest is not None and digest != biblioteca.sha256:
+            logger.error(f"{caminho} não confere com o sha256 fixado: arquivo não será servido")
+            return False
+        return digest is not None
+
+    def impressao(self, caminho):
+        """
+        Hash do conteúdo de um arquivo de static/, recalculado apenas quando
+        o arquivo muda
+
+        Returns:
+            str: A impressão digital, ou None se o arquivo não existir ou for
+            uma biblioteca que não confere com o hash fixado
+        """
+        if not self.integra(caminho):
+            return None
+        digest = self._hash(caminho)
+        return digest[:TAMANHO_IMPRESSAO] if digest is not None else None
+
+    def url(self, caminho):
+        """Endereço público do arquivo, com a impressão digital no nome"""
+        caminho = caminho.lstrip("/")
+        impressao = self.impressao(caminho)
+        if impressao is None:
+            if caminho in self.bibliotecas:
+                return self.bibliotecas[caminho].url
+            logger.warning(f"Asset não encontrado em static/: {caminho}")
+            return f"/static/{caminho}"
+        base, extensao = os.path.splitext(caminho)
+        return f"/static/{base}.{impressao}{extensao}"
+
+    def resolver(self, caminho):
+        """
+        Separa a impressão digital de um caminho pedido
+
+        Returns:
+            tuple: (caminho original, impressao_confere), onde impressao_confere
+            é None se o caminho não tiver impressão digital
+        """
+        correspondencia = PADRAO_IMPRESSAO.match(caminho)
+        if correspondencia is None:
+            return caminho, None
+        original = correspondencia['base'] + correspondencia['extensao']
+        return original, self.impressao(original) == correspondencia['impressao']
+
+
+def codificacoes_aceitas(accept_encoding):
+    aceitas = set()
+    for item in accept_encoding.lower().split(","):
+        codificacao, _, parametros = item.partition(";")
+        if parametros.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        aceitas.add(codificacao.strip())
+    return aceitas
+
+
+class StaticFilesOtimizados(StaticFiles):
+    """
+    StaticFiles com ETag forte (hash do conteúdo em vez de mtime e tamanho),
+    Cache-Control configurável e entrega das variantes pré-comprimidas
+    (arquivo.br / arquivo.gz) quando o cliente aceita e a variante está
+    atualizada. Range e If-Range continuam tratados pelo FileResponse.
+    """
+
+    def __init__(self, *args, cache_control=CACHE_REVALIDAR, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_control = cache_control
+
+    def lookup_path(self, path):
+        full_path, stat_result = super().lookup_path(path)
+        if stat_result is not None and stat.S_ISREG(stat_result.st_mode):
+            # lookup_path roda em uma thread: o hash é calculado aqui, fora do event loop
+            impressao_arquivo(full_path, stat_result)
+        return full_path, stat_result
+
+    def _variante(self, full_path, stat_result, aceitas):
+        """Retorna (codificação, caminho, stat) da melhor variante disponível"""
+        for codificacao, extensao in VARIANTES:
+            if codificacao not in aceitas:
+                continue
+            try:
+                estado = os.stat(full_path + extensao)
+            except OSError:
+                continue
+            if estado.st_mtime_ns >= stat_result.st_mtime_ns:
+                return codificacao, full_path + extensao, estado
+        return None, full_path, stat_result
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        full_path = os.fspath(full_path)
+        impressao = impressao_arquivo(full_path, stat_result)
+
+        comprimivel = os.path.splitext(full_path)[1] in EXTENSOES_COMPRIMIVEIS
+        codificacao, caminho, estado = (None, full_path, stat_result)
+        if comprimivel:
+            aceitas = codificacoes_aceitas(request_headers.get("accept-encoding", ""))
+            codificacao, caminho, estado = self._variante(full_path, stat_result, aceitas)
+
+        response = FileResponse(
+            caminho, status_code=status_code, stat_result=estado,
+            media_type=guess_type(full_path)[0] or "text/plain"
+        )
+        response.headers["etag"] = f'"{impressao}-{codificacao}"' if codificacao else f'"{impressao}"'
+        response.headers["cache-control"] = self.cache_control
+        if codificacao:
+            response.headers["content-encoding"] = codificacao
+        if comprimivel:
+            response.headers["vary"] = "Accept-Encoding"
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+class StaticFilesVersionados(StaticFilesOtimizados):
+    """
+    StaticFiles que aceita os nomes com impressão digital: o arquivo é
+    servido pelo nome original, com cache imutável quando a impressão confere
+    com o conteúdo atual. Os demais caminhos (e impressões antigas) são
+    servidos com revalidação pelo ETag.
+    """
+
+    def __init__(self, *args, manifesto=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.manifesto = manifesto or manifesto_assets
+
+    def lookup_path(self, path):
+        # Bibliotecas que não conferem com o sha256 fixado respondem 404
+        if not self.manifesto.integra(path.replace(os.sep, "/")):
+            return "", None
+        return super().lookup_path(path)
+
+    async def get_response(self, path, scope):
+        original, impressao_confere = self.manifesto.resolver(path.replace(os.sep, "/"))
+        resposta = await super().get_response(original, scope)
+        if resposta.status_code in (200, 304):
+            resposta.headers["Cache-Control"] = CACHE_IMUTAVEL if impressao_confere else CACHE_REVALIDAR
+        return resposta
+
+
+def registrar_templates(templates):
+    """Disponibiliza asset() nos templates de uma instância de Jinja2Templates"""
+    templates.env.globals["asset"] = manifesto_assets.url
+    return templates
+
+
+def _gravar_atomicamente(destino, dados):
+    # Vários processos podem comprimir ao mesmo tempo: grava em um temporário e renomeia
+    temporario = destino.with_name(f"{destino.name}.{os.getpid()}.tmp")
+    temporario.write_bytes(dados)
+    os.replace(temporario, destino)
+
+
+def pre_comprimir(diretorio=STATIC_DIR):
+    """
+    Gera as variantes .gz (e .br, se o pacote Brotli estiver instalado) dos
+    arquivos de texto de `diretorio`, apenas para os arquivos novos ou
+    alterados desde a última execução
+
+    Returns:
+        int: Quantidade de variantes geradas
+    """
+    compressores = [(".gz", lambda dados: gzip.compress(dados, compresslevel=9, mtime=0))]
+    try:
+        import brotli
+        compressores.insert(0, (".br", lambda dados: brotli.compress(dados, quality=11)))
+    except ImportError:
+        logger.info("Pacote Brotli não instalado: gerando apenas variantes gzip")
+
+    geradas = 0
+    for arquivo in Path(diretorio).rglob("*"):
+        if arquivo.suffix not in EXTENSOES_COMPRIMIVEIS or not arquivo.is_file():
+            continue
+        estado = arquivo.stat()
+        if estado.st_size < TAMANHO_MINIMO_COMPRESSAO:
+            continue
+        conteudo = None
+        for extensao, comprimir in compressores:
+            destino = arquivo.with_name(arquivo.name + extensao)
+            if destino.exists() and destino.stat().st_mtime_ns >= estado.st_mtime_ns:
+                continue
+            if conteudo is None:
+                conteudo = arquivo.read_bytes()
+            dados = comprimir(conteudo)
+            # Variantes que não reduzem o tamanho não são servidas
+            if len(dados) < len(conteudo):
+                _gravar_atomicamente(destino, dados)
+                geradas += 1
+    return geradas
+
+
+def _baixar(url, timeout):
+    from urllib.request import urlopen
+
+    with urlopen(url, timeout=timeout) as resposta:
+        return resposta.read()
+
+
+def baixar_bibliotecas(forcar=False, timeout=15):
+    """
+    Baixa para static/vendor/ as bibliotecas que ainda não estão lá, gravando
+    apenas os arquivos cujo sha256 confere com o fixado em BIBLIOTECAS. Sem
+    acesso à rede, desiste na primeira falha (as páginas continuam usando a
+    CDN para as bibliotecas que faltam).
+
+    Returns:
+        int: Quantidade de bibliotecas baixadas
+    """
+    from urllib.error import HTTPError, URLError
+
+    baixadas = 0
+    for caminho, (url, sha256) in BIBLIOTECAS.items():
+        destino = STATIC_DIR / caminho
+        if sha256 is None:
+            logger.warning(f"{caminho} sem sha256 fixado, usando a CDN")
+            continue
+        if destino.exists() and not forcar:
+            continue
+        try:
+            conteudo = _baixar(url, timeout)
+        except HTTPError as e:
+            logger.warning(f"Não foi possível baixar {url}, usando a CDN: {e}")
+            continue
+        except (URLError, OSError) as e:
+            logger.warning(f"Sem acesso às CDNs, bibliotecas não baixadas: {e}")
+            break
+        if hashlib.sha256(conteudo).hexdigest() != sha256:
+            logger.error(f"{url} não confere com o sha256 fixado: arquivo descartado")
+            continue
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        # Grava em um arquivo temporário para nunca servir um download incompleto
+        temporario = destino.with_name(destino.name + ".tmp")
+        temporario.write_bytes(conteudo)
+        temporario.replace(destino)
+        baixadas += 1
+        print(f"{caminho}: {len(conteudo) / 1024:.0f} KiB")
+    return baixadas
+
+
+def hashes_bibliotecas(timeout=15):
+    """Baixa cada biblioteca e mostra o sha256, para conferir e fixar em BIBLIOTECAS"""
+    for caminho, (url, sha256) in BIBLIOTECAS.items():
+        digest = hashlib.sha256(_baixar(url, timeout)).hexdigest()
+        situacao = "fixado" if digest == sha256 else "NÃO FIXADO" if sha256 is None else "DIVERGENTE"
+        print(f"{digest}  {caminho}  ({situacao})")
+
+
+# Instância global
+manifesto_assets = ManifestoAssets()
+
+
+if __name__ == "__main__":
+    if "--fixar" in sys.argv:
+        hashes_bibliotecas()
+        sys.exit()
+    if "--comprimir" not in sys.argv:
+        baixar_bibliotecas(forcar="--forcar" in sys.argv)
+    print(f"Variantes comprimidas geradas: {pre_comprimir()}")
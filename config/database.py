@@ -2,7 +2,9 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from dotenv import load_dotenv
 import os
 import logging
+from pymongo import monitoring
 from pymongo.errors import ConnectionFailure
+from services.metricas import MONGO_DURACAO, MONGO_POOL_EM_USO
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -14,6 +16,64 @@ load_dotenv()
 client = None
 DATABASE_NAME = os.getenv('DATABASE_NAME', 'rsvp_db')
 
+class MonitorComandos(monitoring.CommandListener):
+    """
+    Registra a duração de cada comando do MongoDB nas métricas da aplicação
+    """
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_DURACAO.observe(event.duration_micros / 1_000_000, command=event.command_name, status="sucesso")
+
+    def failed(self, event):
+        MONGO_DURACAO.observe(event.duration_micros / 1_000_000, command=event.command_name, status="falha")
+
+class MonitorPool(monitoring.ConnectionPoolListener):
+    """
+    Acompanha quantas conexões de cada pool estão em uso, usado para medir a
+    saturação do pool nas verificações de prontidão. O medidor é mantido
+    apenas por check-out/check-in: quando o pool é limpo ou fechado, as
+    conexões que estavam em uso ainda passam pelo check-in ao serem
+    devolvidas, e zerar o medidor nesse momento o deixaria negativo.
+    """
+    def _endereco(self, event):
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def connection_checked_out(self, event):
+        MONGO_POOL_EM_USO.inc(address=self._endereco(event))
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_EM_USO.dec(address=self._endereco(event))
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        pass
+
 # Na função conectar_db(), substitua os prints por logs
 async def conectar_db():
     global client
@@ -28,7 +88,7 @@ async def conectar_db():
             raise ValueError("MONGODB_URL não configurada")
         
         # Estabelece conexão com o MongoDB
-        client = AsyncIOMotorClient(mongodb_url)
+        client = AsyncIOMotorClient(mongodb_url, event_listeners=[MonitorComandos(), MonitorPool()])
         
         # Verifica a conexão
         await client.admin.command('ping')
@@ -81,4 +141,13 @@ def get_client():
     """
     if not client:
         raise RuntimeError("Conexão com o banco de dados não estabelecida")
-    return client
\ No newline at end of file
+    return client
+
+def obter_client_opcional():
+    """
+    Obtém o cliente do MongoDB sem lançar erro quando não há conexão
+
+    Returns:
+        AsyncIOMotorClient | None: Cliente de conexão ou None
+    """
+    return client
@@ -1,80 +1,317 @@
 import re
-from email_validator import validate_email, EmailNotValidError
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from email_validator import validate_email, EmailNotValidError, EmailUndeliverableError
 import logging
 
+# Expressão regular compilada uma única vez (primeiro filtro, barato)
+PADRAO_EMAIL = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+
+# Parte local ASCII simples (dot-atom), aceita sem passar pelo email_validator
+PADRAO_PARTE_LOCAL = re.compile(r'^[a-z0-9_%+-]+(?:\.[a-z0-9_%+-]+)*$')
+TAMANHO_MAXIMO_EMAIL = 254
+TAMANHO_MAXIMO_PARTE_LOCAL = 64
+
+# Quantidade máxima de endereços normalizados mantidos no cache
+TAMANHO_CACHE_VALIDACAO = int(os.getenv('EMAIL_VALIDATION_CACHE_SIZE', '20000'))
+
+# Configuração das verificações de domínio (MX) via DNS
+DNS_MAX_WORKERS = int(os.getenv('EMAIL_DNS_WORKERS', '16'))
+DNS_TIMEOUT_SEGUNDOS = float(os.getenv('EMAIL_DNS_TIMEOUT_SECONDS', '5'))
+DNS_CACHE_TTL_SEGUNDOS = float(os.getenv('EMAIL_DNS_CACHE_TTL_SECONDS', '3600'))
+DNS_CACHE_TAMANHO = int(os.getenv('EMAIL_DNS_CACHE_SIZE', '10000'))
+
+RESULTADO_NAO_STRING = {
+    'valido': False,
+    'motivo': 'Email não é uma string válida',
+    'email_normalizado': None
+}
+
+def normalizar_email(email):
+    """
+    Normaliza um email para comparação e cache (sem espaços, minúsculo)
+
+    Returns:
+        str | None: Email normalizado ou None se não for uma string
+    """
+    if not isinstance(email, str):
+        return None
+    return email.strip().lower()
+
+@lru_cache(maxsize=DNS_CACHE_TAMANHO)
+def _validar_dominio_sintaxe(dominio):
+    """
+    Valida a sintaxe de um domínio ASCII com o email_validator (etapa mais
+    cara, por causa do IDNA) uma única vez por domínio
+
+    Returns:
+        str | None: Domínio normalizado ou None se for inválido
+    """
+    try:
+        return validate_email(f"a@{dominio}", check_deliverability=False).ascii_domain
+    except EmailNotValidError:
+        return None
+
+@lru_cache(maxsize=TAMANHO_CACHE_VALIDACAO)
+def _validar_sintaxe(email):
+    """
+    Valida a sintaxe de um email já normalizado, sem consultar DNS. O
+    resultado é memoizado, então cada endereço distinto passa pelo
+    email_validator uma única vez.
+
+    Returns:
+        tuple: (valido, motivo, email_normalizado, dominio)
+    """
+    if not email:
+        return (False, RESULTADO_NAO_STRING['motivo'], None, None)
+
+    # Validação por expressão regular (primeiro filtro)
+    if not PADRAO_EMAIL.match(email):
+        return (False, 'Formato de email inválido', None, None)
+
+    # Caminho rápido para o caso comum: parte local simples e domínio ASCII
+    # já validado. Qualquer outro caso (ou erro) segue para a validação
+    # completa, que produz a mensagem de erro detalhada.
+    parte_local, _, dominio = email.rpartition('@')
+    if (len(email) <= TAMANHO_MAXIMO_EMAIL and len(parte_local) <= TAMANHO_MAXIMO_PARTE_LOCAL
+            and 'xn--' not in dominio and PADRAO_PARTE_LOCAL.match(parte_local)):
+        dominio_ascii = _validar_dominio_sintaxe(dominio)
+        if dominio_ascii is not None:
+            return (True, 'Email válido', f"{parte_local}@{dominio_ascii}", dominio_ascii)
+
+    # Validação usando email_validator
+    try:
+        # Valida e normaliza o email
+        validacao = validate_email(email, check_deliverability=False)
+        return (True, 'Email válido', validacao.email, validacao.ascii_domain)
+
+    except EmailNotValidError as e:
+        # Registra o erro de validação
+        logging.warning(f"Erro na validação de email {email}: {str(e)}")
+        return (False, str(e), None, None)
+
+def criar_resolver_dns(timeout=DNS_TIMEOUT_SEGUNDOS):
+    """
+    Cria a função padrão de verificação de domínio, que procura registros MX
+    (ou A/AAAA como fallback) usando as mesmas regras do email_validator
+
+    Returns:
+        callable: função dominio -> (aceita_email, motivo, definitivo)
+    """
+    # Importação tardia: dns.resolver é lento para importar
+    import dns.resolver
+    from email_validator.deliverability import validate_email_deliverability
+
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = timeout
+
+    def verificar(dominio):
+        try:
+            info = validate_email_deliverability(dominio, dominio, dns_resolver=resolver)
+        except EmailUndeliverableError as e:
+            return (False, str(e), True)
+        if info.get('unknown-deliverability'):
+            # Falha transitória (timeout, servidor indisponível): não rejeita
+            return (True, f"Entregabilidade não verificada: {info['unknown-deliverability']}", False)
+        return (True, 'Domínio aceita emails', True)
+
+    return verificar
+
+class VerificadorDominios:
+    """
+    Verifica se domínios aceitam emails usando um pool de threads para as
+    consultas DNS e um cache por domínio com TTL.
+
+    O resolver pode ser substituído (ex: um stub local em testes); ele deve
+    receber o domínio e retornar (aceita_email, motivo, definitivo).
+    Resultados não definitivos (timeouts) não são armazenados no cache.
+    """
+
+    def __init__(self, resolver=None, max_workers=DNS_MAX_WORKERS,
+                 ttl=DNS_CACHE_TTL_SEGUNDOS, tamanho_cache=DNS_CACHE_TAMANHO):
+        self._resolver = resolver
+        self.max_workers = max_workers
+        self.ttl = ttl
+        self.tamanho_cache = tamanho_cache
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @property
+    def resolver(self):
+        if self._resolver is None:
+            self._resolver = criar_resolver_dns()
+        return self._resolver
+
+    def _do_cache(self, dominio):
+        with self._lock:
+            item = self._cache.get(dominio)
+            if item is None:
+                return None
+            expira_em, resultado = item
+            if expira_em < time.monotonic():
+                del self._cache[dominio]
+                return None
+            return resultado
+
+    def _consultar(self, dominio):
+        try:
+            aceita, motivo, definitivo = self.resolver(dominio)
+        except Exception as e:
+            logging.warning(f"Erro ao verificar domínio {dominio}: {str(e)}")
+            return (True, f"Entregabilidade não verificada: {str(e)}")
+
+        if definitivo:
+            with self._lock:
+                if len(self._cache) >= self.tamanho_cache:
+                    # Remove o item mais antigo (ordem de inserção do dict)
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[dominio] = (time.monotonic() + self.ttl, (aceita, motivo))
+        return (aceita, motivo)
+
+    def verificar(self, dominio):
+        """
+        Verifica um único domínio
+
+        Returns:
+            tuple: (aceita_email, motivo)
+        """
+        resultado = self._do_cache(dominio)
+        if resultado is None:
+            resultado = self._consultar(dominio)
+        return resultado
+
+    def verificar_varios(self, dominios):
+        """
+        Verifica vários domínios em paralelo, consultando o DNS apenas para os
+        que não estão no cache
+
+        Returns:
+            dict: dominio -> (aceita_email, motivo)
+        """
+        resultados = {}
+        pendentes = []
+        for dominio in set(dominios):
+            resultado = self._do_cache(dominio)
+            if resultado is None:
+                pendentes.append(dominio)
+            else:
+                resultados[dominio] = resultado
+
+        if len(pendentes) == 1:
+            resultados[pendentes[0]] = self._consultar(pendentes[0])
+        elif pendentes:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pendentes))) as pool:
+                resultados.update(zip(pendentes, pool.map(self._consultar, pendentes)))
+        return resultados
+
+    def limpar_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+# Verificador compartilhado pelo processo
+verificador_dominios = VerificadorDominios()
+
+def _montar_resultado(sintaxe, dominio_verificado=None):
+    valido, motivo, email_normalizado, _ = sintaxe
+    if valido and dominio_verificado is not None and not dominio_verificado[0]:
+        return {
+            'valido': False,
+            'motivo': dominio_verificado[1],
+            'email_normalizado': None
+        }
+    return {
+        'valido': valido,
+        'motivo': motivo,
+        'email_normalizado': email_normalizado
+    }
+
 class EmailValidador:
     @staticmethod
-    def validar_email(email):
+    def validar_email(email, verificar_dominio=False, verificador=None):
         """
         Valida um endereço de email usando múltiplas técnicas
         
         Args:
             email (str): Endereço de email a ser validado
+            verificar_dominio (bool): Se True, confirma via DNS que o domínio aceita emails
+                (bloqueia: chame fora do event loop)
+            verificador (VerificadorDominios): Verificador a usar (padrão: o compartilhado)
         
         Returns:
             dict: Resultado da validação com informações detalhadas
         """
         # Verificações preliminares
-        if not email or not isinstance(email, str):
-            return {
-                'valido': False,
-                'motivo': 'Email não é uma string válida',
-                'email_normalizado': None
-            }
+        email = normalizar_email(email)
+        if not email:
+            return dict(RESULTADO_NAO_STRING)
         
-        # Remover espaços em branco
-        email = email.strip().lower()
-        
-        # Validação por expressão regular (primeiro filtro)
-        padrao_email = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        if not re.match(padrao_email, email):
-            return {
-                'valido': False,
-                'motivo': 'Formato de email inválido',
-                'email_normalizado': None
-            }
+        sintaxe = _validar_sintaxe(email)
+        dominio_verificado = None
+        if verificar_dominio and sintaxe[0]:
+            dominio_verificado = (verificador or verificador_dominios).verificar(sintaxe[3])
+        return _montar_resultado(sintaxe, dominio_verificado)
+
+    @staticmethod
+    def validar_lote(lista_emails, verificar_dominio=False, verificador=None):
+        """
+        Valida uma lista de emails removendo duplicados antes da validação.
+        A sintaxe é verificada uma vez por endereço distinto e os domínios
+        distintos são consultados em paralelo.
         
-        # Validação usando email_validator
-        try:
-            # Valida e normaliza o email
-            validacao = validate_email(email)
-            email_normalizado = validacao.email
-            
-            return {
-                'valido': True,
-                'motivo': 'Email válido',
-                'email_normalizado': email_normalizado
-            }
+        Args:
+            lista_emails (list): Lista de emails (pode conter repetições)
+            verificar_dominio (bool): Se True, confirma via DNS que cada domínio aceita emails
+                (bloqueia: chame fora do event loop)
+            verificador (VerificadorDominios): Verificador a usar (padrão: o compartilhado)
         
-        except EmailNotValidError as e:
-            # Registra o erro de validação
-            logging.warning(f"Erro na validação de email {email}: {str(e)}")
-            
-            return {
-                'valido': False,
-                'motivo': str(e),
-                'email_normalizado': None
-            }
-    
+        Returns:
+            list: Um resultado (como em validar_email) por item, na mesma ordem
+        """
+        chaves = [normalizar_email(email) for email in lista_emails]
+        sintaxes = {chave: _validar_sintaxe(chave) for chave in set(chaves) if chave}
+
+        dominios_verificados = {}
+        if verificar_dominio:
+            dominios = {sintaxe[3] for sintaxe in sintaxes.values() if sintaxe[0]}
+            dominios_verificados = (verificador or verificador_dominios).verificar_varios(dominios)
+
+        resultados_unicos = {
+            chave: _montar_resultado(sintaxe, dominios_verificados.get(sintaxe[3]))
+            for chave, sintaxe in sintaxes.items()
+        }
+        return [
+            resultados_unicos[chave] if chave else dict(RESULTADO_NAO_STRING)
+            for chave in chaves
+        ]
+
+    @staticmethod
+    def limpar_cache():
+        """Descarta os resultados memoizados de sintaxe e de domínios"""
+        _validar_sintaxe.cache_clear()
+        _validar_dominio_sintaxe.cache_clear()
+        verificador_dominios.limpar_cache()
+
     @staticmethod
-    def validar_lista_emails(lista_emails):
+    def validar_lista_emails(lista_emails, verificar_dominio=False):
         """
         Valida uma lista de emails
         
         Args:
             lista_emails (list): Lista de emails para validação
+            verificar_dominio (bool): Se True, confirma via DNS que os domínios aceitam emails
+                (bloqueia: chame fora do event loop)
         
         Returns:
             dict: Resultado da validação de todos os emails
         """
-        resultados = []
         emails_validos = []
         emails_invalidos = []
         
-        for email in lista_emails:
-            resultado = EmailValidador.validar_email(email)
-            resultados.append(resultado)
-            
+        resultados = EmailValidador.validar_lote(lista_emails, verificar_dominio=verificar_dominio)
+        for email, resultado in zip(lista_emails, resultados):
             if resultado['valido']:
                 emails_validos.append(resultado['email_normalizado'])
             else:
@@ -91,19 +328,22 @@ class EmailValidador:
         }
     
     @staticmethod
-    def filtrar_emails_validos(lista_emails):
+    def filtrar_emails_validos(lista_emails, verificar_dominio=False):
         """
         Filtra apenas emails válidos de uma lista
         
         Args:
             lista_emails (list): Lista de emails para filtrar
+            verificar_dominio (bool): Se True, confirma via DNS que os domínios aceitam emails
+                (bloqueia: chame fora do event loop)
         
         Returns:
             list: Lista de emails válidos
         """
+        resultados = EmailValidador.validar_lote(lista_emails, verificar_dominio=verificar_dominio)
         return [
-            email for email in lista_emails 
-            if EmailValidador.validar_email(email)['valido']
+            email for email, resultado in zip(lista_emails, resultados)
+            if resultado['valido']
         ]
 
 # Configuração de logging
@@ -0,0 +1,56 @@
+"""
+Ambiente Jinja2 único da aplicação.
+
+Todas as rotas renderizam pela mesma instância `templates`, de modo que cada
+template é compilado uma vez por worker (e não uma vez por módulo de rotas).
+O código compilado também é gravado em um cache de bytecode em disco: o
+servidor.py pré-compila os templates antes de subir os workers e cada worker
+os carrega desse cache no lifespan, antes da primeira requisição.
+
+Configuração por variável de ambiente:
+    TEMPLATES_AUTO_RELOAD    recarrega os templates alterados em disco (padrão: 0;
+                             `python app.py` liga no modo de desenvolvimento)
+    TEMPLATES_CACHE_DIR      diretório do cache de bytecode (padrão: diretório
+                             temporário do usuário, criado pelo Jinja2)
+"""
+import os
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+from config.assets import registrar_templates
+
+TEMPLATES_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+RECARREGAR_TEMPLATES = os.getenv('TEMPLATES_AUTO_RELOAD', '0').lower() in ('1', 'true', 'sim')
+DIRETORIO_CACHE = os.getenv('TEMPLATES_CACHE_DIR') or None
+
+
+def _criar_cache_bytecode():
+    if DIRETORIO_CACHE:
+        Path(DIRETORIO_CACHE).mkdir(parents=True, exist_ok=True)
+    return FileSystemBytecodeCache(DIRETORIO_CACHE)
+
+
+ambiente = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=True,
+    auto_reload=RECARREGAR_TEMPLATES,
+    bytecode_cache=_criar_cache_bytecode(),
+)
+
+templates = registrar_templates(Jinja2Templates(env=ambiente))
+
+
+def pre_compilar():
+    """
+    Compila (ou carrega do cache de bytecode) todos os templates
+
+    Returns:
+        int: Quantidade de templates carregados
+    """
+    nomes = ambiente.list_templates(extensions=["html"])
+    for nome in nomes:
+        ambiente.get_template(nome)
+    return len(nomes)
@@ -1,11 +1,20 @@
-from pydantic import BaseModel, EmailStr, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 from typing import List, Optional
 from datetime import datetime, date
 from enum import Enum
-from bson import ObjectId
+from functools import lru_cache
 from config.email_validador import EmailValidador
 import re
 
+# Padrões compilados uma única vez, reutilizados por todos os validadores
+PADRAO_TELEFONE = re.compile(r'^\(\d{2}\) \d{4,5}-\d{4}$')
+# Mês e dia aceitam um ou dois dígitos (ex: 2025-1-5), como o strptime aceitava
+PADRAO_DATA = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})$')
+PADRAO_HORA = re.compile(r'^(\d{1,2}):(\d{1,2})$')
+
+# Quantidade máxima de erros descritos na mensagem da validação em lote
+MAXIMO_ERROS_LOTE = 20
+
 class StatusEvento(str, Enum):
     ATIVO = "ativo"
     CANCELADO = "cancelado"
@@ -22,47 +31,228 @@ class StatusConvidado(str, Enum):
     CONFIRMADO = "confirmado"
     RECUSADO = "recusado"
 
+
+@lru_cache(maxsize=1024)
+def _converter_data(v):
+    correspondencia = PADRAO_DATA.match(v)
+    if not correspondencia:
+        raise ValueError('Data deve estar no formato YYYY-MM-DD')
+    try:
+        return date(*map(int, correspondencia.groups()))
+    except ValueError:
+        raise ValueError('Data deve estar no formato YYYY-MM-DD')
+
+
+def validar_data_evento(v):
+    """Valida uma data YYYY-MM-DD que não pode estar no passado"""
+    if _converter_data(v) < date.today():
+        raise ValueError('Data do evento deve ser no futuro')
+    return v
+
+
+def validar_hora_evento(v):
+    """Valida uma hora HH:MM"""
+    correspondencia = PADRAO_HORA.match(v)
+    if not correspondencia or int(correspondencia.group(1)) > 23 or int(correspondencia.group(2)) > 59:
+        raise ValueError('Hora deve estar no formato HH:MM')
+    return v
+
+
+def validar_telefone_convidado(v):
+    if v is not None and (not isinstance(v, str) or not PADRAO_TELEFONE.match(v)):
+        raise ValueError("Telefone inválido. Use o formato (11) 98765-4321")
+    return v
+
+
 class Convidado(BaseModel):
-    _id: Optional[ObjectId] = None
     nome: str = Field(..., min_length=2, max_length=100, description="Nome do convidado")
-    email: EmailStr = Field(..., description="Email do convidado")
+    # A validação completa (sintaxe, normalização e domínio) é feita pelo EmailValidador
+    email: str = Field(..., description="Email do convidado")
     telefone: Optional[str] = Field(None, description="Telefone do convidado (formato: (11) 98765-4321)")
     status: StatusConvidado = Field(default=StatusConvidado.PENDENTE)
     confirmado: Optional[bool] = None
     data_confirmacao: Optional[datetime] = None
     observacoes: Optional[str] = Field(None, max_length=500)
 
-    @validator('email')
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "nome": "João Silva",
+                "email": "joao@email.com",
+                "telefone": "(11) 98765-4321",
+                "status": "pendente"
+            }
+        }
+    )
+
+    @field_validator('email')
+    @classmethod
     def validar_email(cls, v):
         """
-        Validação adicional de email usando EmailValidador
+        Validação adicional de email usando EmailValidador (apenas sintaxe:
+        a consulta DNS do domínio é feita pelas rotas, fora do event loop)
         """
-        validacao = EmailValidador.validar_email(v)
+        validacao = EmailValidador.validar_email(v, verificar_dominio=False)
         if not validacao['valido']:
             raise ValueError(f"Email inválido: {validacao['motivo']}")
         return validacao['email_normalizado']
 
-    @validator('telefone', always=True, pre=True)
+    @field_validator('telefone', mode='before')
+    @classmethod
     def validar_telefone(cls, v):
         """
         Validação do telefone
         """
-        if v is not None:
-            # Regex para validar telefone no formato (11) 98765-4321
-            padrao_telefone = re.compile(r'^\(\d{2}\) \d{4,5}-\d{4}$')
-            if not padrao_telefone.match(v):
-                raise ValueError("Telefone inválido. Use o formato (11) 98765-4321")
-        return v
+        return validar_telefone_convidado(v)
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "nome": "João Silva",
-                "email": "joao@email.com",
-                "telefone": "(11) 98765-4321",
-                "status": "pendente"
+    @classmethod
+    def construir_confiavel(cls, dados):
+        """
+        Cria o convidado sem executar a validação. Use apenas com dados já
+        validados (ex: lidos do banco ou aprovados por validar_convidados_em_lote)
+        """
+        return cls.model_construct(**dados)
+
+    @classmethod
+    def construir_confiavel_lote(cls, registros, campos_informados=None):
+        """
+        Versão em lote de construir_confiavel. `campos_informados` traz, para
+        cada registro, os campos presentes na entrada original, que formam o
+        model_fields_set (como no model_validate)
+        """
+        if campos_informados is None:
+            return [cls.model_construct(**dados) for dados in registros]
+        return [
+            cls.model_construct(_fields_set=campos, **dados)
+            for dados, campos in zip(registros, campos_informados)
+        ]
+
+
+# Campos que a validação em lote sabe tratar; registros com outros campos, ou
+# com valores fora das regras rápidas abaixo (ex: confirmado "true" ou 1),
+# passam pela validação completa do modelo
+CAMPOS_LOTE = {"nome", "email", "telefone", "status", "confirmado", "observacoes"}
+STATUS_CONVIDADO = {status.value: status for status in StatusConvidado}
+
+
+def _telefone_valido(v):
+    return v is None or (isinstance(v, str) and PADRAO_TELEFONE.match(v) is not None)
+
+
+# Regras rápidas da validação em lote: campo -> (valor padrão, predicado). Só
+# aceitam valores que o modelo aceitaria sem conversão; os demais não são
+# rejeitados aqui, e sim revalidados pelo Convidado.model_validate
+REGRAS_LOTE = {
+    "nome": (None, lambda v: isinstance(v, str) and 2 <= len(v) <= 100),
+    "telefone": (None, _telefone_valido),
+    "status": (StatusConvidado.PENDENTE.value, lambda v: type(v) is str and v in STATUS_CONVIDADO),
+    "confirmado": (None, lambda v: v is None or isinstance(v, bool)),
+    "observacoes": (None, lambda v: v is None or (isinstance(v, str) and len(v) <= 500)),
+}
+
+
+def _validar_modelo(registro, indice, erros):
+    """Validação completa de um convidado; os erros são acrescentados a `erros`"""
+    try:
+        return Convidado.model_validate(registro)
+    except ValidationError as e:
+        for erro in e.errors():
+            campo = erro['loc'][0] if erro['loc'] else None
+            erros.append({"indice": indice, "campo": campo, "mensagem": erro['msg']})
+        return None
+
+
+def validar_convidados_em_lote(registros, verificar_dominio=False):
+    """
+    Valida uma lista de convidados por coluna, em vez de um modelo por linha.
+    Os emails são validados de uma vez com EmailValidador.validar_lote
+    (endereços e domínios repetidos são verificados uma única vez) e os
+    convidados válidos são criados com Convidado.construir_confiavel_lote.
+    Aceita exatamente as mesmas entradas que Convidado.model_validate: as
+    linhas fora das regras rápidas passam pela validação completa.
+
+    Args:
+        registros (list): Convidados como dicts ou instâncias de Convidado
+        verificar_dominio (bool): Se True, confirma via DNS que cada domínio
+            aceita emails (bloqueia: chame fora do event loop)
+
+    Returns:
+        tuple: (convidados, erros), onde erros é uma lista de
+        {"indice", "campo", "mensagem"}
+    """
+    convidados = [None] * len(registros)
+    erros = []
+    linhas_lote = []
+
+    for indice, registro in enumerate(registros):
+        if type(registro) is dict and registro.keys() <= CAMPOS_LOTE:
+            linhas_lote.append(indice)
+        elif isinstance(registro, Convidado):
+            convidados[indice] = registro
+        else:
+            # Caso incomum (ex: data_confirmacao em texto): validação completa
+            convidados[indice] = _validar_modelo(registro, indice, erros)
+
+    if not linhas_lote:
+        return convidados, erros
+
+    linhas = [registros[i] for i in linhas_lote]
+    colunas = {
+        campo: [linha.get(campo, padrao) for linha in linhas]
+        for campo, (padrao, _) in REGRAS_LOTE.items()
+    }
+    validacoes_email = EmailValidador.validar_lote(
+        [linha.get("email") for linha in linhas], verificar_dominio=verificar_dominio
+    )
+
+    def erro_email(posicao):
+        erros.append({
+            "indice": linhas_lote[posicao], "campo": "email",
+            "mensagem": f"Email inválido: {validacoes_email[posicao]['motivo']}"
+        })
+
+    # Cada regra é aplicada à coluna inteira; só as linhas fora das regras
+    # rápidas são revalidadas, uma a uma, pelo modelo
+    fora_das_regras = set()
+    for campo, (_, valido) in REGRAS_LOTE.items():
+        fora_das_regras.update(posicao for posicao, valor in enumerate(colunas[campo]) if not valido(valor))
+
+    validas = []
+    for posicao, validacao in enumerate(validacoes_email):
+        indice = linhas_lote[posicao]
+        if posicao in fora_das_regras:
+            convidado = _validar_modelo(registros[indice], indice, erros)
+            # O modelo verifica só a sintaxe: a recusa do domínio vem do lote
+            if convidado is not None and not validacao['valido']:
+                erro_email(posicao)
+                convidado = None
+            convidados[indice] = convidado
+        elif not validacao['valido']:
+            erro_email(posicao)
+        else:
+            validas.append(posicao)
+
+    construidos = Convidado.construir_confiavel_lote(
+        (
+            {
+                "nome": colunas["nome"][posicao],
+                "email": validacoes_email[posicao]['email_normalizado'],
+                "telefone": colunas["telefone"][posicao],
+                "status": STATUS_CONVIDADO[colunas["status"][posicao]],
+                "confirmado": colunas["confirmado"][posicao],
+                "data_confirmacao": None,
+                "observacoes": colunas["observacoes"][posicao],
             }
-        }
+            for posicao in validas
+        ),
+        [set(linhas[posicao]) for posicao in validas],
+    )
+    for posicao, convidado in zip(validas, construidos):
+        convidados[linhas_lote[posicao]] = convidado
+
+    erros.sort(key=lambda erro: erro["indice"])
+    return convidados, erros
+
 
 class Evento(BaseModel):
     nome: str = Field(..., min_length=3, max_length=100, description="Nome do evento")
@@ -76,34 +266,60 @@ class Evento(BaseModel):
     max_convidados: Optional[int] = Field(None, gt=0)
     convidados: List[Convidado] = Field(default_factory=list)
     data_criacao: Optional[datetime] = Field(default_factory=datetime.utcnow)
-    
-    @validator('data')
+
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "nome": "Aniversário de 30 anos",
+                "responsavel": "João Silva",
+                "data": "2024-12-25",
+                "hora": "19:00",
+                "local": "Restaurante Central",
+                "descricao": "Celebração do aniversário de 30 anos",
+                "categoria": "aniversario",
+                "max_convidados": 100
+            }
+        }
+    )
+
+    @field_validator('data')
+    @classmethod
     def validar_data(cls, v):
-        try:
-            data_evento = datetime.strptime(v, '%Y-%m-%d').date()
-            
-            # Verificar se a data é futura
-            if data_evento < date.today():
-                raise ValueError('Data do evento deve ser no futuro')
-            
-            return v
-        except ValueError:
-            raise ValueError('Data deve estar no formato YYYY-MM-DD')
-    
-    @validator('hora')
+        return validar_data_evento(v)
+
+    @field_validator('hora')
+    @classmethod
     def validar_hora(cls, v):
-        try:
-            datetime.strptime(v, '%H:%M')
-            return v
-        except ValueError:
-            raise ValueError('Hora deve estar no formato HH:MM')
-
-    @validator('convidados', each_item=False)
-    def validar_max_convidados(cls, convidados, values):
+        return validar_hora_evento(v)
+
+    @field_validator('convidados', mode='before')
+    @classmethod
+    def validar_convidados(cls, convidados):
+        """
+        Valida a lista inteira de uma vez com validar_convidados_em_lote; as
+        instâncias já validadas não são revalidadas pelo pydantic. O validador
+        roda no event loop, então apenas a sintaxe dos emails é verificada.
+        """
+        if not isinstance(convidados, list):
+            return convidados
+        validos, erros = validar_convidados_em_lote(convidados, verificar_dominio=False)
+        if erros:
+            descricao = "; ".join(
+                f"convidado {e['indice'] + 1} ({e['campo']}): {e['mensagem']}"
+                for e in erros[:MAXIMO_ERROS_LOTE]
+            )
+            if len(erros) > MAXIMO_ERROS_LOTE:
+                descricao += f"; e mais {len(erros) - MAXIMO_ERROS_LOTE} erros"
+            raise ValueError(f"Convidados inválidos: {descricao}")
+        return validos
+
+    @field_validator('convidados')
+    @classmethod
+    def validar_max_convidados(cls, convidados, info):
         """
         Validar número máximo de convidados
         """
-        max_convidados = values.get('max_convidados')
+        max_convidados = info.data.get('max_convidados')
         if max_convidados is not None and len(convidados) > max_convidados:
             raise ValueError(f'Número máximo de convidados excedido. Limite: {max_convidados}')
         return convidados
@@ -119,20 +335,6 @@ class Evento(BaseModel):
             email=convidado.email
         )
 
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "nome": "Aniversário de 30 anos",
-                "responsavel": "João Silva",
-                "data": "2024-12-25",
-                "hora": "19:00",
-                "local": "Restaurante Central",
-                "descricao": "Celebração do aniversário de 30 anos",
-                "categoria": "aniversario",
-                "max_convidados": 100
-            }
-        }
-
 class EventoUpdate(BaseModel):
     nome: Optional[str] = Field(None, min_length=3, max_length=100)
     responsavel: Optional[str] = Field(None, min_length=2, max_length=100)
@@ -144,32 +346,23 @@ class EventoUpdate(BaseModel):
     status: Optional[StatusEvento] = None
     max_convidados: Optional[int] = Field(None, gt=0)
 
-    @validator('data')
+    @field_validator('data')
+    @classmethod
     def validar_data(cls, v):
         if v is not None:
-            try:
-                data_evento = datetime.strptime(v, '%Y-%m-%d').date()
-                
-                # Verificar se a data é futura
-                if data_evento < date.today():
-                    raise ValueError('Data do evento deve ser no futuro')
-                
-                return v
-            except ValueError:
-                raise ValueError('Data deve estar no formato YYYY-MM-DD')
-
-    @validator('hora')
+            return validar_data_evento(v)
+        return v
+
+    @field_validator('hora')
+    @classmethod
     def validar_hora(cls, v):
         if v is not None:
-            try:
-                datetime.strptime(v, '%H:%M')
-                return v
-            except ValueError:
-                raise ValueError('Hora deve estar no formato HH:MM')
+            return validar_hora_evento(v)
+        return v
 
 # Funções auxiliares
 def validar_email_convidado(email: str) -> bool:
     """
     Função auxiliar para validação de email de convidado
     """
-    return EmailValidador.validar_email(email)['valido']
\ No newline at end of file
+    return EmailValidador.validar_email(email)['valido']
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, HTTPException, Request, Depends, Form, Response
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
 from jose import jwt, JWTError
 from datetime import datetime, timedelta
 from passlib.context import CryptContext
 from dotenv import load_dotenv
 from config.secrets import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from config.templates import templates
 
 # Carregar variáveis de ambiente
 load_dotenv()
@@ -14,29 +14,29 @@ load_dotenv()
 # Router de autenticação
 router = APIRouter(tags=["auth"])
 
-# Templates
-templates = Jinja2Templates(directory="templates")
-
 # Contexto para hashing de senhas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # Configuração do OAuth2
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/token")
 
-# Hash das senhas
-ADMIN_PASSWORD_HASH = pwd_context.hash("admin123")
-CODE_EVENTS_PASSWORD_HASH = pwd_context.hash("code123")
+# Senhas iniciais dos usuários. O hash bcrypt é caro (centenas de ms) e é
+# calculado no primeiro acesso de cada usuário, não na importação do módulo
+SENHAS_INICIAIS = {
+    "admin": "admin123",
+    "code.events": "code123"
+}
 
 # Informações de usuários
 USERS = {
     "admin": {
         "username": "admin",
-        "hashed_password": ADMIN_PASSWORD_HASH,
+        "hashed_password": None,
         "role": "admin"
     },
     "code.events": {
         "username": "code.events",
-        "hashed_password": CODE_EVENTS_PASSWORD_HASH,
+        "hashed_password": None,
         "role": "reporter"
     }
 }
@@ -67,6 +67,8 @@ def authenticate_user(username: str, password: str):
     if not user:
         print("Usuário não encontrado")  # Debug
         return False
+    if user["hashed_password"] is None:
+        user["hashed_password"] = get_password_hash(SENHAS_INICIAIS[username])
     print(f"Hash armazenado: {user['hashed_password']}")  # Debug
     if not verify_password(password, user["hashed_password"]):
         print("Senha incorreta")  # Debug
@@ -1,22 +1,46 @@
 from typing import List
 from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, Request, Body, Form
-from fastapi.responses import HTMLResponse, JSONResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
+from services.perfilador import executar_em_thread
 from models.evento import Evento, Convidado, StatusConvidado, EventoUpdate
+from config.email_validador import EmailValidador
+from services.convidados import (
+    IndiceConvidados, MODO_IGNORAR, MODO_SUBSTITUIR, validar_modo, gravar_convidados,
+    RegistroConvidado, carregar_registros, pipeline_convidados, pipeline_convidado_estatisticas
+)
 from config.database import obter_db, get_database
+from config.templates import templates
 from services.email_service import email_service
+from services.serializacao import RespostaJSON
+from services.cabecalhos_eventos import cabecalhos_eventos
+from services.ao_vivo import canal_convidados
+from services.versoes import (
+    CAMPO_VERSAO, INCREMENTAR_VERSAO, PROJECAO_VERSAO,
+    etag_evento, etag_lista, etag_confere, cabecalhos_cache, nao_modificado
+)
 from bson import ObjectId
 from datetime import datetime
 import io
-from openpyxl import load_workbook
+import traceback
 from jose import jwt
 from config.secrets import SECRET_KEY
 
 # Cria o roteador de eventos
 eventos_router = APIRouter()
 
-# Templates config
-templates = Jinja2Templates(directory="templates")
+# Cabeçalho do evento e apenas os emails dos convidados (para deduplicação)
+PROJECAO_CABECALHO_EMAILS = {"nome": 1, "data": 1, "hora": 1, "local": 1, "convidados.email": 1}
+# Apenas o cabeçalho do evento usado nos emails
+PROJECAO_CABECALHO = {"nome": 1, "data": 1, "hora": 1, "local": 1}
+
+
+async def convidado_e_estatisticas(db, evento_oid, email):
+    """Convidado gravado com o email (ou None) e os totais por status do evento"""
+    cursor = db.eventos.aggregate(pipeline_convidado_estatisticas(evento_oid, email))
+    documentos = await cursor.to_list(length=1)
+    if not documentos:
+        return None, None
+    return documentos[0].get("convidado"), documentos[0]["estatisticas"]
 
 @eventos_router.post("/")
 async def criar_evento(evento: Evento):
@@ -24,6 +48,7 @@ async def criar_evento(evento: Evento):
     db = obter_db()
     try:
         evento_dict = evento.dict(exclude_unset=True)
+        evento_dict[CAMPO_VERSAO] = 1
         result = await db.eventos.insert_one(evento_dict)
         evento_dict['_id'] = str(result.inserted_id)
         
@@ -32,35 +57,59 @@ async def criar_evento(evento: Evento):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@eventos_router.get("/")
-async def listar_eventos():
-    """Lista todos os eventos"""
+@eventos_router.get("/", response_class=RespostaJSON)
+async def listar_eventos(request: Request):
+    """Lista todos os eventos (304 se a lista não mudou desde o ETag do cliente)"""
     db = obter_db()
-    eventos = []
-    async for evento in db.eventos.find():
-        if '_id' in evento:
-            evento['_id'] = str(evento['_id'])
-        if 'convidados' in evento:
-            for convidado in evento.get('convidados', []):
-                if '_id' in convidado:
-                    convidado['_id'] = str(convidado['_id'])
-        eventos.append(evento)
-    return eventos
-
-@eventos_router.get("/{evento_id}")
-async def obter_evento(evento_id: str):
-    """Obtém detalhes de um evento específico"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        versoes = await db.eventos.find({}, PROJECAO_VERSAO).to_list(length=None)
+        etag = etag_lista(versoes)
+        if etag_confere(if_none_match, etag):
+            return nao_modificado(etag)
+    eventos = await db.eventos.find().to_list(length=None)
+    return RespostaJSON(eventos, headers=cabecalhos_cache(etag_lista(eventos)))
+
+@eventos_router.get("/{evento_id}", response_class=RespostaJSON)
+async def obter_evento(request: Request, evento_id: str):
+    """Obtém detalhes de um evento específico (304 se a versão do cliente é a atual)"""
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            # Revalidação: lê apenas a versão, sem a lista de convidados
+            versao = await db.eventos.find_one({"_id": object_id}, PROJECAO_VERSAO)
+            if versao and etag_confere(if_none_match, etag_evento(versao)):
+                return nao_modificado(etag_evento(versao))
         evento = await db.eventos.find_one({"_id": object_id})
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
-        evento['_id'] = str(evento['_id'])
-        return evento
+        return RespostaJSON(evento, headers=cabecalhos_cache(etag_evento(evento)))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@eventos_router.get("/{evento_id}/ao-vivo")
+async def feed_ao_vivo(evento_id: str):
+    """Transmite (Server-Sent Events) as respostas dos convidados do evento"""
+    try:
+        object_id = ObjectId(evento_id)
+    except Exception:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    if not await cabecalhos_eventos.obter(obter_db(), object_id):
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    return StreamingResponse(
+        canal_convidados.transmitir(evento_id),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Desativa o buffer de proxies nginx
+        }
+    )
+
 @eventos_router.delete("/{evento_id}")
 async def excluir_evento(evento_id: str):
     """Exclui um evento"""
@@ -68,13 +117,14 @@ async def excluir_evento(evento_id: str):
     try:
         object_id = ObjectId(evento_id)
         resultado = await db.eventos.delete_one({"_id": object_id})
+        cabecalhos_eventos.invalidar(object_id)
         if resultado.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
         return {"mensagem": "Evento deletado com sucesso"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@eventos_router.patch("/{evento_id}")
+@eventos_router.patch("/{evento_id}", response_class=RespostaJSON)
 async def atualizar_evento(evento_id: str, evento_update: EventoUpdate):
     """Atualiza os dados de um evento"""
     db = obter_db()
@@ -84,29 +134,48 @@ async def atualizar_evento(evento_id: str, evento_update: EventoUpdate):
         
         resultado = await db.eventos.update_one(
             {"_id": object_id},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": INCREMENTAR_VERSAO}
         )
+        cabecalhos_eventos.invalidar(object_id)
         
         if resultado.modified_count == 0:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
         
         evento_atualizado = await db.eventos.find_one({"_id": object_id})
-        evento_atualizado['_id'] = str(evento_atualizado['_id'])
-        
-        return evento_atualizado
+        return RespostaJSON(evento_atualizado)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@eventos_router.post("/{evento_id}/convidados")
-async def adicionar_convidado(request: Request, evento_id: str, convidado: Convidado):
-    """Adiciona um novo convidado ao evento"""
+@eventos_router.post("/{evento_id}/convidados", response_class=RespostaJSON)
+async def adicionar_convidado(request: Request, evento_id: str, convidado: Convidado, modo: str = MODO_IGNORAR):
+    """
+    Adiciona um novo convidado ao evento. Se o email já estiver no evento,
+    o parâmetro `modo` define o que fazer: ignorar, atualizar ou substituir.
+    Retorna apenas o convidado gravado, a ação aplicada e os totais do evento.
+    """
     db = obter_db()
     try:
+        try:
+            modo = validar_modo(modo)
+        except ValueError as modo_error:
+            raise HTTPException(status_code=400, detail=str(modo_error))
+
         object_id = ObjectId(evento_id)
-        evento = await db.eventos.find_one({"_id": object_id})
+        evento = await db.eventos.find_one({"_id": object_id}, PROJECAO_CABECALHO_EMAILS)
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
 
+        # O modelo valida apenas a sintaxe; o domínio é consultado via DNS em uma thread
+        validacao = await executar_em_thread(
+            EmailValidador.validar_email, convidado.email, verificar_dominio=True
+        )
+        if not validacao['valido']:
+            raise HTTPException(status_code=400, detail=f"Email inválido: {validacao['motivo']}")
+
+        convidado_dict = convidado.dict()
+        indice = IndiceConvidados(evento.get('convidados', []))
+        inserir, alterar, _ = indice.classificar([convidado_dict], modo)
+
         # Gera os links de confirmação
         try:
             base_url = str(request.base_url).rstrip('/')
@@ -121,50 +190,74 @@ async def adicionar_convidado(request: Request, evento_id: str, convidado: Convi
             link_confirmacao = f"{base_url}/api/eventos/confirmar-presenca/{evento_id}/{convidado.email}/sim"
             link_recusa = f"{base_url}/api/eventos/confirmar-presenca/{evento_id}/{convidado.email}/nao"
 
-        # Adiciona o convidado
-        convidado_dict = convidado.dict()
-        await db.eventos.update_one(
-            {"_id": object_id},
-            {"$push": {"convidados": convidado_dict}}
-        )
-
-        # Envia o email de confirmação
-        try:
-            await email_service.enviar_email_confirmacao(
-                email=convidado.email,
-                nome=convidado.nome,
-                evento_nome=evento['nome'],
-                evento_data=evento['data'],
-                evento_hora=evento['hora'],
-                evento_local=evento['local'],
-                link_confirmacao=link_confirmacao,
-                link_recusa=link_recusa
-            )
-        except Exception as email_error:
-            print(f"Erro ao enviar email: {str(email_error)}")
-
-        evento_atualizado = await db.eventos.find_one({"_id": object_id})
-        evento_atualizado['_id'] = str(evento_atualizado['_id'])
-        return evento_atualizado
+        # Adiciona (ou atualiza) o convidado conforme o modo de deduplicação;
+        # se o mesmo email foi incluído por outra requisição nesse meio tempo,
+        # o convidado é reclassificado (atualizado ou ignorado)
+        inserir, alterar, _ = await gravar_convidados(db.eventos, object_id, inserir, alterar, modo)
+        enviar_convite = bool(inserir) or (modo == MODO_SUBSTITUIR and bool(alterar))
+        if inserir:
+            acao, email_gravado = "inserido", convidado.email
+        elif alterar:
+            # No modo substituir o registro inteiro (inclusive o email) é trocado
+            acao = "substituido" if modo == MODO_SUBSTITUIR else "atualizado"
+            email_gravado = convidado.email if modo == MODO_SUBSTITUIR else alterar[0][0]
+        else:
+            acao, email_gravado = "ignorado", indice.email_gravado(convidado.email) or convidado.email
+
+        # Envia o email de confirmação apenas para convites novos ou substituídos
+        if enviar_convite:
+            try:
+                await email_service.enviar_email_confirmacao(
+                    email=convidado.email,
+                    nome=convidado.nome,
+                    evento_nome=evento['nome'],
+                    evento_data=evento['data'],
+                    evento_hora=evento['hora'],
+                    evento_local=evento['local'],
+                    link_confirmacao=link_confirmacao,
+                    link_recusa=link_recusa
+                )
+            except Exception as email_error:
+                print(f"Erro ao enviar email: {str(email_error)}")
+
+        convidado_gravado, estatisticas = await convidado_e_estatisticas(db, object_id, email_gravado)
+        if (inserir or alterar) and convidado_gravado:
+            canal_convidados.publicar_convidado(evento_id, convidado_gravado)
+        return RespostaJSON({
+            "acao": acao,
+            "convidado": convidado_gravado,
+            "estatisticas": estatisticas
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @eventos_router.delete("/{evento_id}/convidados/excluir")
 async def excluir_convidado(evento_id: str, dados: dict = Body(...)):
-    """Exclui um convidado específico"""
+    """Exclui um convidado específico e retorna os totais atualizados do evento"""
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
+        # O filtro pelo email evita incrementar a versão quando não há o que excluir
         resultado = await db.eventos.update_one(
-            {"_id": object_id},
-            {"$pull": {"convidados": {"email": dados['email']}}}
+            {"_id": object_id, "convidados.email": dados['email']},
+            {"$pull": {"convidados": {"email": dados['email']}}, "$inc": INCREMENTAR_VERSAO}
         )
         
-        if resultado.modified_count == 0:
+        if resultado.matched_count == 0:
             raise HTTPException(status_code=404, detail="Convidado não encontrado")
         
-        return {"mensagem": "Convidado excluído com sucesso"}
+        canal_convidados.publicar_remocao(evento_id, dados['email'])
+        _, estatisticas = await convidado_e_estatisticas(db, object_id, dados['email'])
+        return {
+            "mensagem": "Convidado excluído com sucesso",
+            "email": dados['email'],
+            "estatisticas": estatisticas
+        }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -175,11 +268,13 @@ async def confirmar_presenca(request: Request, evento_id: str, convidado_email:
         evento_oid = ObjectId(evento_id)
         db = obter_db()
 
-        evento = await db.eventos.find_one({"_id": evento_oid})
+        evento = await cabecalhos_eventos.obter(db, evento_oid)
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
 
         confirmado = resposta.lower() == 'sim'
+        status = StatusConvidado.CONFIRMADO if confirmado else StatusConvidado.RECUSADO
+        data_confirmacao = datetime.utcnow()
 
         resultado = await db.eventos.update_one(
             {
@@ -189,18 +284,21 @@ async def confirmar_presenca(request: Request, evento_id: str, convidado_email:
             {
                 "$set": {
                     "convidados.$.confirmado": confirmado,
-                    "convidados.$.data_confirmacao": datetime.utcnow(),
-                    "convidados.$.status": (
-                        StatusConvidado.CONFIRMADO if confirmado 
-                        else StatusConvidado.RECUSADO
-                    )
-                }
+                    "convidados.$.data_confirmacao": data_confirmacao,
+                    "convidados.$.status": status
+                },
+                "$inc": INCREMENTAR_VERSAO
             }
         )
 
         if resultado.modified_count == 0:
             raise HTTPException(status_code=404, detail="Convidado não encontrado")
 
+        canal_convidados.publicar(
+            evento_id, convidado_email,
+            status=status, confirmado=confirmado, data_confirmacao=data_confirmacao
+        )
+
         return templates.TemplateResponse(
             "confirmacao_sucesso.html",
             {
@@ -234,6 +332,7 @@ async def salvar_observacoes(
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
+        data_observacoes = datetime.utcnow()
         
         resultado = await db.eventos.update_one(
             {
@@ -243,8 +342,9 @@ async def salvar_observacoes(
             {
                 "$set": {
                     "convidados.$.observacoes": observacoes,
-                    "convidados.$.data_observacoes": datetime.utcnow()
-                }
+                    "convidados.$.data_observacoes": data_observacoes
+                },
+                "$inc": INCREMENTAR_VERSAO
             }
         )
         
@@ -259,6 +359,9 @@ async def salvar_observacoes(
             )
         
         print("Observações salvas com sucesso")
+        canal_convidados.publicar(
+            evento_id, email, observacoes=observacoes, data_observacoes=data_observacoes
+        )
         return templates.TemplateResponse(
             "confirmacao_publica_agradecimento.html",
             {
@@ -283,6 +386,7 @@ async def salvar_motivo_recusa(request: Request, evento_id: str, email: str, mot
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
+        data_motivo = datetime.utcnow()
         
         resultado = await db.eventos.update_one(
             {
@@ -292,8 +396,9 @@ async def salvar_motivo_recusa(request: Request, evento_id: str, email: str, mot
             {
                 "$set": {
                     "convidados.$.motivo_recusa": motivo,
-                    "convidados.$.data_motivo": datetime.utcnow()
-                }
+                    "convidados.$.data_motivo": data_motivo
+                },
+                "$inc": INCREMENTAR_VERSAO
             }
         )
         
@@ -306,6 +411,7 @@ async def salvar_motivo_recusa(request: Request, evento_id: str, email: str, mot
                 }
             )
         
+        canal_convidados.publicar(evento_id, email, motivo_recusa=motivo, data_motivo=data_motivo)
         return templates.TemplateResponse(
             "confirmacao_publica_agradecimento.html",
             {
@@ -330,14 +436,23 @@ async def salvar_motivo_recusa(request: Request, evento_id: str, email: str, mot
 async def importar_convidados(request: Request, evento_id: str, file: UploadFile = File(...)):
     """Importa lista de convidados de um arquivo Excel"""
     enviar_emails = False
+    validar_emails = False
+    modo = MODO_IGNORAR
     
     try:
         query_params = dict(request.query_params)
         enviar_emails_str = query_params.get('enviar_emails', 'false').lower()
         enviar_emails = enviar_emails_str == 'true'
+        validar_emails = query_params.get('validar_emails', 'false').lower() == 'true'
+        modo = query_params.get('modo', MODO_IGNORAR)
     except:
         enviar_emails = False
 
+    try:
+        modo = validar_modo(modo)
+    except ValueError as modo_error:
+        raise HTTPException(status_code=400, detail=str(modo_error))
+
     db = obter_db()
     try:
         if not file:
@@ -348,15 +463,19 @@ async def importar_convidados(request: Request, evento_id: str, file: UploadFile
         if not contents:
             raise HTTPException(status_code=400, detail="Arquivo vazio")
 
+        from openpyxl import load_workbook
+
         try:
-            workbook = load_workbook(io.BytesIO(contents))
+            # Modo somente leitura: as linhas são lidas sob demanda, sem
+            # carregar todas as células na memória
+            workbook = load_workbook(io.BytesIO(contents), read_only=True, data_only=True)
         except Exception as excel_error:
             print(f"Erro ao processar Excel: {excel_error}")
             raise HTTPException(status_code=400, detail=f"Erro ao processar arquivo Excel: {str(excel_error)}")
 
         worksheet = workbook.active
         object_id = ObjectId(evento_id)
-        evento = await db.eventos.find_one({"_id": object_id})
+        evento = await db.eventos.find_one({"_id": object_id}, PROJECAO_CABECALHO_EMAILS)
         
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
@@ -383,17 +502,52 @@ async def importar_convidados(request: Request, evento_id: str, file: UploadFile
             else:
                 registros_incompletos += 1
 
-            convidado = {
-                'nome': nome,
-                'email': email,
-                'telefone': telefone,
-                'observacoes': observacoes,
-                'status': StatusConvidado.PENDENTE
-            }
+            convidados.append(RegistroConvidado(
+                nome=nome,
+                email=email,
+                telefone=telefone,
+                status=StatusConvidado.PENDENTE.value,
+                observacoes=observacoes
+            ))
+
+        workbook.close()
 
-            convidados.append(convidado)
+        # Deduplicação contra os convidados já cadastrados e dentro da planilha
+        indice = IndiceConvidados(evento.get('convidados', []))
+        convidados, alterar, ignorados = indice.classificar(convidados, modo)
 
-            if enviar_emails and email != "Sem email" and '@' in email:
+        # A inclusão é condicional: emails incluídos por uma importação
+        # simultânea são reclassificados em vez de duplicados
+        convidados, alterar, descartados = await gravar_convidados(
+            db.eventos, object_id, convidados, alterar, modo
+        )
+        ignorados.extend(descartados)
+        if convidados or alterar:
+            canal_convidados.publicar_recarga(evento_id)
+
+        # Convites apenas para quem foi de fato incluído (ou substituído) pela
+        # gravação, nunca para os convidados reclassificados como ignorados
+        convites = convidados + ([c for _, c in alterar] if modo == MODO_SUBSTITUIR else [])
+
+        # Validação opcional em lote (sintaxe + domínio/MX), fora do event loop
+        emails_invalidos = []
+        if validar_emails and convites:
+            resultados = await executar_em_thread(
+                EmailValidador.validar_lote, [c.email for c in convites], verificar_dominio=True
+            )
+            for convidado, resultado in zip(convites, resultados):
+                if not resultado['valido'] and convidado.email != "Sem email":
+                    emails_invalidos.append({
+                        'email': convidado.email,
+                        'motivo': resultado['motivo']
+                    })
+        emails_rejeitados = {item['email'] for item in emails_invalidos}
+
+        for convidado in convites:
+            nome = convidado.nome
+            email = convidado.email
+
+            if enviar_emails and email != "Sem email" and '@' in email and email not in emails_rejeitados:
                 try:
                     try:
                         link_confirmacao, link_recusa = email_service.gerar_tokens_para_evento(
@@ -420,19 +574,17 @@ async def importar_convidados(request: Request, evento_id: str, file: UploadFile
                     print(f"Erro ao enviar email para {email}: {str(email_error)}")
                     erros_email.append(email)
 
-        if convidados:
-            await db.eventos.update_one(
-                {"_id": object_id},
-                {"$push": {"convidados": {"$each": convidados}}}
-            )
-
         return {
-            "convidados": convidados,
+            "convidados": [c.como_documento() for c in convidados],
             "total_importados": len(convidados),
+            "total_atualizados": len(alterar),
+            "total_ignorados": len(ignorados),
+            "modo": modo,
             "total_registros": total_registros,
             "registros_completos": registros_completos,
             "registros_incompletos": registros_incompletos,
             "erros_email": erros_email,
+            "emails_invalidos": emails_invalidos,
             "emails_enviados": enviar_emails
         }
 
@@ -449,12 +601,15 @@ async def enviar_emails_convidados(request: Request, evento_id: str):
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
-        evento = await db.eventos.find_one({"_id": object_id})
+        evento = await db.eventos.find_one({"_id": object_id}, PROJECAO_CABECALHO)
         
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
         
-        convidados = evento.get('convidados', [])
+        # Apenas nome e email de cada convidado, em registros compactos
+        convidados = await carregar_registros(
+            db.eventos.aggregate(pipeline_convidados({"_id": object_id}, campos=("nome", "email")))
+        )
         
         if not convidados:
             return {"mensagem": "Não há convidados para enviar emails."}
@@ -465,8 +620,8 @@ async def enviar_emails_convidados(request: Request, evento_id: str):
         
         for convidado in convidados:
             try:
-                email = convidado.get('email')
-                nome = convidado.get('nome')
+                email = convidado.email
+                nome = convidado.nome
                 
                 if not email or not nome or email == "Sem email" or '@' not in email:
                     continue
@@ -516,12 +671,15 @@ async def enviar_emails_com_template(request: Request, evento_id: str, dados: di
     db = obter_db()
     try:
         object_id = ObjectId(evento_id)
-        evento = await db.eventos.find_one({"_id": object_id})
+        evento = await db.eventos.find_one({"_id": object_id}, PROJECAO_CABECALHO)
         
         if not evento:
             raise HTTPException(status_code=404, detail="Evento não encontrado")
         
-        convidados = evento.get('convidados', [])
+        # Apenas nome e email de cada convidado, em registros compactos
+        convidados = await carregar_registros(
+            db.eventos.aggregate(pipeline_convidados({"_id": object_id}, campos=("nome", "email")))
+        )
         
         if not convidados:
             return {"mensagem": "Não há convidados para enviar emails."}
@@ -535,8 +693,8 @@ async def enviar_emails_com_template(request: Request, evento_id: str, dados: di
         
         for convidado in convidados:
             try:
-                email = convidado.get('email')
-                nome = convidado.get('nome')
+                email = convidado.email
+                nome = convidado.nome
                 
                 if not email or not nome or email == "Sem email" or '@' not in email:
                     continue
@@ -603,7 +761,8 @@ async def confirmar_convite(token: str, request: Request):
             
             print(f"Processando confirmação para evento_id={evento_id}, email={email_convidado}")
             
-            evento = await db.eventos.find_one({"_id": ObjectId(evento_id)})
+            evento_oid = ObjectId(evento_id)
+            evento = await cabecalhos_eventos.obter(db, evento_oid)
             
             if not evento:
                 return templates.TemplateResponse("confirmacao_erro.html", {
@@ -611,31 +770,21 @@ async def confirmar_convite(token: str, request: Request):
                     "mensagem": "Evento não encontrado."
                 })
             
-            convidados = evento.get('convidados', [])
-            convidado_atualizado = False
-            convidado_info = None
-            
-            for convidado in convidados:
-                if convidado.get('email') == email_convidado:
-                    convidado['status'] = 'confirmado'
-                    convidado_atualizado = True
-                    convidado_info = convidado
-                    break
+            # Atualiza apenas o convidado, sem carregar a lista de convidados
+            resultado = await db.eventos.update_one(
+                {"_id": evento_oid, "convidados.email": email_convidado},
+                {"$set": {"convidados.$.status": "confirmado"}, "$inc": INCREMENTAR_VERSAO}
+            )
             
-            if convidado_atualizado:
-                await db.eventos.update_one(
-                    {"_id": ObjectId(evento_id)},
-                    {"$set": {"convidados": convidados}}
-                )
-                
+            if resultado.matched_count:
                 print(f"Confirmação processada com sucesso. Status: confirmado")
+                canal_convidados.publicar(evento_id, email_convidado, status="confirmado")
                 
                 return templates.TemplateResponse("confirmacao_sucesso.html", {
                     "request": request, 
                     "evento": evento,
                     "status": "confirmado",
-                    "email": email_convidado,
-                    "convidado": convidado_info
+                    "email": email_convidado
                 })
             else:
                 return templates.TemplateResponse("confirmacao_erro.html", {
@@ -694,7 +843,8 @@ async def recusar_convite(token: str, request: Request):
             
             print(f"Processando recusa para evento_id={evento_id}, email={email_convidado}")
             
-            evento = await db.eventos.find_one({"_id": ObjectId(evento_id)})
+            evento_oid = ObjectId(evento_id)
+            evento = await cabecalhos_eventos.obter(db, evento_oid)
             
             if not evento:
                 return templates.TemplateResponse("confirmacao_erro.html", {
@@ -702,31 +852,21 @@ async def recusar_convite(token: str, request: Request):
                     "mensagem": "Evento não encontrado."
                 })
             
-            convidados = evento.get('convidados', [])
-            convidado_atualizado = False
-            convidado_info = None
-            
-            for convidado in convidados:
-                if convidado.get('email') == email_convidado:
-                    convidado['status'] = 'recusado'
-                    convidado_atualizado = True
-                    convidado_info = convidado
-                    break
+            # Atualiza apenas o convidado, sem carregar a lista de convidados
+            resultado = await db.eventos.update_one(
+                {"_id": evento_oid, "convidados.email": email_convidado},
+                {"$set": {"convidados.$.status": "recusado"}, "$inc": INCREMENTAR_VERSAO}
+            )
             
-            if convidado_atualizado:
-                await db.eventos.update_one(
-                    {"_id": ObjectId(evento_id)},
-                    {"$set": {"convidados": convidados}}
-                )
-                
+            if resultado.matched_count:
                 print(f"Recusa processada com sucesso. Status: recusado")
+                canal_convidados.publicar(evento_id, email_convidado, status="recusado")
                 
                 return templates.TemplateResponse("confirmacao_sucesso.html", {
                     "request": request, 
                     "evento": evento,
                     "status": "recusado",
-                    "email": email_convidado,
-                    "convidado": convidado_info
+                    "email": email_convidado
                 })
             else:
                 return templates.TemplateResponse("confirmacao_erro.html", {
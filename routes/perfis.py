@@ -0,0 +1,27 @@
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse
+from routes.auth import get_current_user, is_admin
+from services.perfilador import listar_perfis, caminho_perfil
+
+router = APIRouter()
+
+async def verificar_admin(request: Request):
+    """Restringe o acesso aos perfis a administradores"""
+    user = await get_current_user(request)
+    if not user or not is_admin(user):
+        raise HTTPException(status_code=403, detail="Acesso restrito a administradores")
+
+@router.get("/")
+async def listar(request: Request):
+    """Lista os perfis de requisição salvos, do mais recente ao mais antigo"""
+    await verificar_admin(request)
+    return listar_perfis()
+
+@router.get("/{nome}")
+async def baixar(request: Request, nome: str):
+    """Baixa um perfil no formato folded stacks (flamegraph/speedscope)"""
+    await verificar_admin(request)
+    caminho = caminho_perfil(nome)
+    if not caminho:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(caminho, media_type="text/plain; charset=utf-8", filename=nome)
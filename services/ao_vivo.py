@@ -0,0 +1,188 @@
+"""
+Feed ao vivo das respostas dos convidados (Server-Sent Events).
+
+A página de detalhes do evento assina o feed do evento em
+/api/eventos/{evento_id}/ao-vivo e recebe apenas as alterações de cada
+convidado (status, observações, motivo da recusa, inclusões e exclusões) à
+medida que as rotas as gravam, em vez de buscar o documento inteiro de novo.
+
+Cada conexão tem uma fila limitada. Se o cliente não acompanhar as
+alterações (fila cheia), a fila é descartada e o cliente recebe um evento
+"recarregar", que faz a página buscar o evento completo uma vez.
+
+Com o change stream ativo (services/mudancas.py), as alterações chegam ao
+canal de todos os workers por ele, e as publicações feitas diretamente pelas
+rotas são ignoradas para não duplicar as mensagens. Sem change stream, cada
+worker entrega apenas as alterações gravadas nele.
+
+No desligamento o uvicorn espera as respostas em andamento terminarem; por
+isso, ao receber SIGTERM/SIGINT, o canal encerra as conexões abertas (o
+EventSource reconecta sozinho em outro worker).
+
+Configuração por variável de ambiente:
+    RSVP_FEED_HEARTBEAT_SECONDS    intervalo dos comentários de keep-alive (padrão: 15)
+    RSVP_FEED_QUEUE_SIZE           alterações pendentes por conexão (padrão: 100)
+"""
+import asyncio
+import os
+import signal
+import threading
+
+from services.metricas import FEED_ASSINANTES
+from services.mudancas import ouvinte_mudancas, REINICIO
+from services.serializacao import serializar
+
+INTERVALO_HEARTBEAT = float(os.getenv('RSVP_FEED_HEARTBEAT_SECONDS', '15'))
+TAMANHO_FILA = int(os.getenv('RSVP_FEED_QUEUE_SIZE', '100'))
+
+# O EventSource reconecta após este intervalo se a conexão cair
+RETRY_MS = 5000
+
+_RECARREGAR = ("recarregar", {})
+# Marca o fim da transmissão na fila de uma conexão
+_ENCERRAR = None
+
+
+class CanalConvidados:
+    """Distribui as alterações de convidados para as conexões de cada evento"""
+
+    def __init__(self, tamanho_fila=TAMANHO_FILA):
+        self.tamanho_fila = tamanho_fila
+        self._assinantes = {}
+        self._encerrado = False
+
+    def assinar(self, evento_id):
+        fila = asyncio.Queue(maxsize=self.tamanho_fila)
+        self._assinantes.setdefault(evento_id, set()).add(fila)
+        FEED_ASSINANTES.inc()
+        return fila
+
+    def cancelar(self, evento_id, fila):
+        filas = self._assinantes.get(evento_id)
+        if filas is None or fila not in filas:
+            return
+        filas.discard(fila)
+        if not filas:
+            del self._assinantes[evento_id]
+        FEED_ASSINANTES.dec()
+
+    def assinantes(self, evento_id):
+        return len(self._assinantes.get(evento_id, ()))
+
+    def publicar(self, evento_id, email, **alteracoes):
+        """Envia a alteração de um convidado (identificado pelo email) aos assinantes do evento"""
+        if not ouvinte_mudancas.ativo:
+            self._distribuir(evento_id, ("convidado", {"email": email, "alteracoes": alteracoes}))
+
+    def publicar_convidado(self, evento_id, convidado):
+        """Envia o registro completo de um convidado incluído ou substituído"""
+        if not ouvinte_mudancas.ativo:
+            self._distribuir(evento_id, ("convidado", {"email": convidado["email"], "alteracoes": convidado}))
+
+    def publicar_remocao(self, evento_id, email):
+        """Avisa os assinantes que o convidado foi excluído do evento"""
+        if not ouvinte_mudancas.ativo:
+            self._distribuir(evento_id, ("removido", {"email": email}))
+
+    def publicar_recarga(self, evento_id):
+        """Pede aos assinantes que busquem o evento completo (ex: após uma importação)"""
+        if not ouvinte_mudancas.ativo:
+            self._distribuir(evento_id, _RECARREGAR)
+
+    def aplicar_mudanca(self, mudanca):
+        """Assinante do change stream: repassa as alterações dos convidados às conexões deste worker"""
+        if mudanca.operacao == REINICIO:
+            for evento_id in list(self._assinantes):
+                self._distribuir(evento_id, _RECARREGAR)
+            return
+
+        evento_id = str(mudanca.evento_id)
+        if not self.assinantes(evento_id):
+            return
+        por_indice, estrutural = mudanca.alteracoes_convidados()
+        if estrutural or mudanca.altera_cabecalho:
+            self._distribuir(evento_id, _RECARREGAR)
+            return
+        mensagens = []
+        for indice, alteracoes in por_indice.items():
+            # O registro inteiro (convidado incluído ou substituído) já traz o
+            # email; para campos alterados ele vem do documento do updateLookup
+            email = alteracoes.get("email") or mudanca.email_convidado(indice)
+            if email is None:
+                self._distribuir(evento_id, _RECARREGAR)
+                return
+            mensagens.append(("convidado", {"email": email, "alteracoes": alteracoes}))
+        for mensagem in mensagens:
+            self._distribuir(evento_id, mensagem)
+
+    def _distribuir(self, evento_id, mensagem):
+        for fila in self._assinantes.get(evento_id, ()):
+            try:
+                fila.put_nowait(mensagem)
+            except asyncio.QueueFull:
+                # Cliente atrasado: descarta o que estava pendente e pede uma recarga
+                self._substituir_pendentes(fila, _RECARREGAR)
+
+    @staticmethod
+    def _substituir_pendentes(fila, mensagem):
+        while not fila.empty():
+            fila.get_nowait()
+        fila.put_nowait(mensagem)
+
+    def encerrar(self):
+        """Encerra todas as conexões abertas e recusa as novas"""
+        self._encerrado = True
+        for filas in self._assinantes.values():
+            for fila in filas:
+                self._substituir_pendentes(fila, _ENCERRAR)
+
+    def encerrar_ao_receber_sinal(self):
+        """
+        Encadeia encerrar() aos handlers de SIGINT/SIGTERM instalados pelo
+        uvicorn. Deve ser chamado no lifespan (no event loop do servidor).
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        loop = asyncio.get_running_loop()
+        for sinal in (signal.SIGINT, signal.SIGTERM):
+            anterior = signal.getsignal(sinal)
+            if not callable(anterior):
+                continue
+
+            def handler(signum, frame, anterior=anterior):
+                loop.call_soon_threadsafe(self.encerrar)
+                anterior(signum, frame)
+
+            signal.signal(sinal, handler)
+
+    async def transmitir(self, evento_id):
+        """
+        Gerador do corpo text/event-stream de uma conexão
+
+        Yields:
+            str: Eventos SSE (e comentários de keep-alive)
+        """
+        fila = self.assinar(evento_id)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            while not self._encerrado:
+                try:
+                    mensagem = await asyncio.wait_for(fila.get(), timeout=INTERVALO_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if mensagem is _ENCERRAR:
+                    return
+                if mensagem is _RECARREGAR:
+                    # A recarga já inclui as alterações pendentes na fila
+                    while not fila.empty():
+                        if fila.get_nowait() is _ENCERRAR:
+                            return
+                tipo, dados = mensagem
+                yield f"event: {tipo}\ndata: {serializar(dados).decode()}\n\n"
+        finally:
+            self.cancelar(evento_id, fila)
+
+
+# Canal compartilhado pelo processo
+canal_convidados = CanalConvidados()
@@ -0,0 +1,107 @@
+"""
+Cache dos cabeçalhos dos eventos usados nas páginas públicas de RSVP.
+
+As páginas de confirmação e recusa exibem apenas nome, data, hora e local do
+evento. Este cache guarda esses campos (consultados com projeção, sem a
+lista de convidados) por EVENT_HEADER_CACHE_TTL_SECONDS, de modo que uma
+onda de cliques nos links de um mesmo convite custa uma única leitura do
+evento. Requisições simultâneas para um evento fora do cache aguardam a
+mesma consulta.
+
+As rotas que alteram ou excluem eventos chamam invalidar(). Os outros
+workers são avisados pelo change stream (services/mudancas.py); sem ele, o
+TTL limita o tempo em que podem exibir um cabeçalho desatualizado.
+
+Configuração por variável de ambiente:
+    EVENT_HEADER_CACHE_TTL_SECONDS    validade de cada cabeçalho (padrão: 60)
+    EVENT_HEADER_CACHE_SIZE           quantidade máxima de eventos (padrão: 1000)
+"""
+import asyncio
+import os
+import time
+
+from services.metricas import CACHE_CONSULTAS
+from services.mudancas import REINICIO
+
+CABECALHO_TTL_SEGUNDOS = float(os.getenv('EVENT_HEADER_CACHE_TTL_SECONDS', '60'))
+CABECALHO_CACHE_TAMANHO = int(os.getenv('EVENT_HEADER_CACHE_SIZE', '1000'))
+
+# Campos exibidos nas páginas públicas (o _id sempre vem na consulta)
+PROJECAO_CABECALHO_PUBLICO = {"nome": 1, "data": 1, "hora": 1, "local": 1}
+
+
+class CacheCabecalhos:
+    """Cache com TTL dos cabeçalhos de eventos, indexado pelo ObjectId"""
+
+    def __init__(self, ttl=CABECALHO_TTL_SEGUNDOS, tamanho=CABECALHO_CACHE_TAMANHO):
+        self.ttl = ttl
+        self.tamanho = tamanho
+        self._cache = {}
+        self._consultas = {}
+
+    def _do_cache(self, evento_id):
+        item = self._cache.get(evento_id)
+        if item is None:
+            return None
+        expira_em, cabecalho = item
+        if expira_em < time.monotonic():
+            del self._cache[evento_id]
+            return None
+        return cabecalho
+
+    def _armazenar(self, evento_id, cabecalho):
+        if len(self._cache) >= self.tamanho:
+            # Remove o item mais antigo (ordem de inserção do dict)
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[evento_id] = (time.monotonic() + self.ttl, cabecalho)
+
+    async def obter(self, db, evento_id):
+        """
+        Cabeçalho do evento (_id, nome, data, hora e local)
+
+        Returns:
+            dict | None: Cópia do cabeçalho ou None se o evento não existe
+        """
+        cabecalho = self._do_cache(evento_id)
+        if cabecalho is not None:
+            CACHE_CONSULTAS.inc(cache="event_header", result="hit")
+            return dict(cabecalho)
+
+        CACHE_CONSULTAS.inc(cache="event_header", result="miss")
+        consulta = self._consultas.get(evento_id)
+        if consulta is None:
+            consulta = asyncio.ensure_future(self._carregar(db, evento_id))
+            self._consultas[evento_id] = consulta
+        cabecalho = await asyncio.shield(consulta)
+        return dict(cabecalho) if cabecalho is not None else None
+
+    async def _carregar(self, db, evento_id):
+        try:
+            cabecalho = await db.eventos.find_one({"_id": evento_id}, PROJECAO_CABECALHO_PUBLICO)
+            # Uma invalidação durante a consulta descarta o resultado
+            if cabecalho is not None and self._consultas.get(evento_id) is asyncio.current_task():
+                self._armazenar(evento_id, cabecalho)
+            return cabecalho
+        finally:
+            if self._consultas.get(evento_id) is asyncio.current_task():
+                del self._consultas[evento_id]
+
+    def invalidar(self, evento_id):
+        """Remove o evento do cache (após alterar ou excluir o evento)"""
+        self._cache.pop(evento_id, None)
+        self._consultas.pop(evento_id, None)
+
+    def limpar(self):
+        self._cache.clear()
+        self._consultas.clear()
+
+    def aplicar_mudanca(self, mudanca):
+        """Assinante do change stream: invalida os cabeçalhos alterados em qualquer worker"""
+        if mudanca.operacao == REINICIO:
+            self.limpar()
+        elif mudanca.altera_cabecalho:
+            self.invalidar(mudanca.evento_id)
+
+
+# Cache compartilhado pelo processo
+cabecalhos_eventos = CacheCabecalhos()
@@ -0,0 +1,169 @@
+"""
+Compressão das respostas dinâmicas (JSON da API e páginas HTML).
+
+Middleware ASGI que comprime com brotli (se o pacote Brotli estiver
+instalado) ou gzip, conforme o Accept-Encoding do cliente. Só são
+comprimidas respostas de tamanho conhecido (com Content-Length, como as
+JSONResponse e as páginas dos templates), de um tipo da lista permitida e
+entre o tamanho mínimo e o máximo (o corpo é acumulado em memória antes de
+ser comprimido). Respostas em streaming, sem Content-Length (como os
+downloads de relatórios e eventos SSE), são repassadas bloco a bloco, sem
+buffer e sem compressão, assim como respostas já codificadas (arquivos
+estáticos pré-comprimidos), parciais (Range) e sem corpo.
+
+Arquivos servidos com ETag forte e Accept-Ranges (FileResponse, como os
+mounts /uploads e /static) também não são comprimidos: a compressão
+enfraqueceria o ETag, que o If-Range dos downloads retomados precisa forte.
+
+Configuração por variável de ambiente:
+    COMPRESSION_ENABLED           liga/desliga a compressão (padrão: 1)
+    COMPRESSION_MIN_SIZE          tamanho mínimo do corpo em bytes (padrão: 1024)
+    COMPRESSION_MAX_SIZE          tamanho máximo do corpo em bytes (padrão: 8 MiB)
+    COMPRESSION_GZIP_LEVEL        nível do gzip, 1 a 9 (padrão: 6)
+    COMPRESSION_BROTLI_QUALITY    qualidade do brotli, 0 a 11 (padrão: 4)
+    COMPRESSION_TYPES             tipos comprimidos, separados por vírgula
+"""
+import gzip
+import os
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+
+from config.assets import codificacoes_aceitas
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSAO_ATIVA = os.getenv('COMPRESSION_ENABLED', '1').lower() in ('1', 'true', 'sim')
+TAMANHO_MINIMO = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+TAMANHO_MAXIMO = int(os.getenv('COMPRESSION_MAX_SIZE', str(8 * 1024 * 1024)))
+NIVEL_GZIP = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+QUALIDADE_BROTLI = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+TIPOS_COMPRIMIVEIS = frozenset(
+    tipo.strip() for tipo in os.getenv(
+        'COMPRESSION_TYPES',
+        'application/json,text/html,text/plain,text/css,text/javascript,'
+        'application/javascript,image/svg+xml,application/xml,text/xml'
+    ).split(',') if tipo.strip()
+)
+
+# Corpos maiores que isto são comprimidos em uma thread, fora do event loop
+TAMANHO_COMPRESSAO_EM_THREAD = 256 * 1024
+
+# Status sem corpo ou com corpo parcial
+STATUS_NAO_COMPRIMIVEIS = {204, 206, 304}
+
+
+class CompressaoMiddleware:
+    """Comprime as respostas elegíveis sem alterar as respostas em streaming"""
+
+    def __init__(self, app, tamanho_minimo=TAMANHO_MINIMO, tamanho_maximo=TAMANHO_MAXIMO,
+                 nivel_gzip=NIVEL_GZIP, qualidade_brotli=QUALIDADE_BROTLI, tipos=TIPOS_COMPRIMIVEIS):
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.tamanho_maximo = tamanho_maximo
+        self.nivel_gzip = nivel_gzip
+        self.qualidade_brotli = qualidade_brotli
+        self.tipos = tipos
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            return await self.app(scope, receive, send)
+        codificacao = self.escolher_codificacao(Headers(scope=scope).get("accept-encoding", ""))
+        if codificacao is None:
+            return await self.app(scope, receive, send)
+        await self.app(scope, receive, _RespostaComprimida(self, codificacao, send).send)
+
+    def escolher_codificacao(self, accept_encoding):
+        aceitas = codificacoes_aceitas(accept_encoding)
+        if brotli is not None and "br" in aceitas:
+            return "br"
+        if "gzip" in aceitas:
+            return "gzip"
+        return None
+
+    def elegivel(self, inicio):
+        """Verifica pelos headers (http.response.start) se a resposta pode ser comprimida"""
+        if inicio["status"] < 200 or inicio["status"] in STATUS_NAO_COMPRIMIVEIS:
+            return False
+        headers = Headers(raw=inicio["headers"])
+        if "content-encoding" in headers or "no-transform" in headers.get("cache-control", ""):
+            return False
+        tipo = headers.get("content-type", "").split(";")[0].strip().lower()
+        if tipo not in self.tipos:
+            return False
+        # Arquivo com ETag forte que aceita Range: mantém o ETag válido para o If-Range
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/") and "accept-ranges" in headers:
+            return False
+        # Sem Content-Length a resposta é um streaming: não é acumulada
+        tamanho = headers.get("content-length")
+        if tamanho is None or not tamanho.isdigit():
+            return False
+        return self.tamanho_minimo <= int(tamanho) <= self.tamanho_maximo
+
+    def comprimir(self, corpo, codificacao):
+        if codificacao == "br":
+            return brotli.compress(corpo, quality=self.qualidade_brotli)
+        return gzip.compress(corpo, compresslevel=self.nivel_gzip, mtime=0)
+
+
+class _RespostaComprimida:
+    """
+    Intercepta as mensagens de uma resposta elegível: o http.response.start
+    fica retido enquanto os blocos do corpo (de tamanho já conhecido pelo
+    Content-Length) são reunidos, e a resposta sai comprimida em um único bloco
+    """
+
+    def __init__(self, middleware, codificacao, send):
+        self.middleware = middleware
+        self.codificacao = codificacao
+        self._send = send
+        self._inicio = None
+        self._blocos = []
+        self._repassar = False
+
+    async def send(self, mensagem):
+        if self._repassar:
+            return await self._send(mensagem)
+
+        if mensagem["type"] == "http.response.start":
+            if self.middleware.elegivel(mensagem):
+                self._inicio = mensagem
+            else:
+                self._repassar = True
+                await self._send(mensagem)
+            return
+
+        if self._inicio is None or mensagem["type"] != "http.response.body":
+            return await self._send(mensagem)
+
+        self._blocos.append(mensagem.get("body", b""))
+        if mensagem.get("more_body", False):
+            return
+
+        inicio, self._inicio = self._inicio, None
+        self._repassar = True
+        corpo = b"".join(self._blocos)
+        self._blocos = []
+
+        if len(corpo) >= TAMANHO_COMPRESSAO_EM_THREAD:
+            comprimido = await anyio.to_thread.run_sync(self.middleware.comprimir, corpo, self.codificacao)
+        else:
+            comprimido = self.middleware.comprimir(corpo, self.codificacao)
+        if len(comprimido) >= len(corpo):
+            await self._send(inicio)
+            return await self._send({"type": "http.response.body", "body": corpo, "more_body": False})
+
+        headers = MutableHeaders(scope=inicio)
+        headers["Content-Encoding"] = self.codificacao
+        headers["Content-Length"] = str(len(comprimido))
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # O corpo comprimido não é idêntico byte a byte ao original
+            headers["ETag"] = f"W/{etag}"
+        await self._send(inicio)
+        await self._send({"type": "http.response.body", "body": comprimido, "more_body": False})
@@ -0,0 +1,343 @@
+"""
+Rotinas de processamento de convidados compartilhadas pelas rotas.
+
+Deduplicação: os emails já cadastrados no evento são normalizados e
+colocados em um índice (hash) antes de adicionar ou importar convidados,
+para que reimportar a mesma planilha não duplique a lista. Os convidados
+gravados por gravar_convidados levam também a chave normalizada
+(`email_chave`), usada no filtro da inclusão para que duas requisições
+simultâneas com o mesmo email em caixas diferentes não dupliquem o convidado.
+
+RegistroConvidado é a representação compacta usada no processamento em
+memória (importação, envio de emails e relatórios): um objeto com
+__slots__ por convidado, em vez de um dict com as chaves repetidas.
+"""
+import sys
+from enum import Enum
+from pymongo import UpdateOne
+from config.email_validador import normalizar_email
+from models.evento import StatusConvidado
+from services.versoes import INCREMENTAR_VERSAO
+
+# Modos de tratamento de emails já existentes no evento
+MODO_IGNORAR = "ignorar"        # mantém o convidado existente (padrão)
+MODO_ATUALIZAR = "atualizar"    # atualiza nome/telefone/observações, preserva a resposta
+MODO_SUBSTITUIR = "substituir"  # substitui o registro inteiro (volta a pendente)
+MODOS_DEDUPLICACAO = (MODO_IGNORAR, MODO_ATUALIZAR, MODO_SUBSTITUIR)
+
+# Campos alterados no modo "atualizar"
+CAMPOS_ATUALIZAVEIS = ("nome", "telefone", "observacoes")
+
+# Emails de preenchimento usados na importação, que nunca são deduplicados
+EMAILS_SEM_CHAVE = {None, "", "sem email"}
+
+# Campo com o email normalizado, gravado junto de cada convidado incluído
+CAMPO_CHAVE = "email_chave"
+
+# Tentativas de inclusão quando a lista muda entre a leitura e a gravação
+TENTATIVAS_INSERCAO = 5
+
+# Valores de preenchimento da importação, que não sobrescrevem dados no modo "atualizar"
+VALORES_PREENCHIMENTO = {"Sem nome", "Sem telefone", "Sem observações"}
+
+
+# Campos do convidado mantidos no registro compacto
+CAMPOS_REGISTRO = ("nome", "email", "telefone", "status", "observacoes")
+# Campos do evento presentes nas agregações dos relatórios
+CAMPOS_EVENTO_REGISTRO = ("evento_id", "evento_nome", "evento_data", "evento_local")
+
+
+def _compartilhar(valor):
+    """Reaproveita uma única cópia de strings muito repetidas (status, nome do evento)"""
+    if isinstance(valor, Enum):
+        valor = valor.value
+    return sys.intern(valor) if type(valor) is str else valor
+
+
+class RegistroConvidado:
+    """Convidado em memória, sem dict por instância"""
+
+    __slots__ = CAMPOS_REGISTRO + CAMPOS_EVENTO_REGISTRO
+
+    def __init__(self, nome=None, email=None, telefone=None, status=None, observacoes=None,
+                 evento_id=None, evento_nome=None, evento_data=None, evento_local=None):
+        self.nome = nome
+        self.email = email
+        self.telefone = telefone
+        self.status = _compartilhar(status)
+        self.observacoes = observacoes
+        self.evento_id = _compartilhar(str(evento_id)) if evento_id is not None else None
+        self.evento_nome = _compartilhar(evento_nome)
+        self.evento_data = _compartilhar(evento_data)
+        self.evento_local = _compartilhar(evento_local)
+
+    @classmethod
+    def do_documento(cls, documento):
+        """Cria o registro a partir de um convidado do banco ou de uma linha de agregação"""
+        obter = documento.get
+        return cls(
+            obter("nome"), obter("email"), obter("telefone"), obter("status"), obter("observacoes"),
+            obter("evento_id"), obter("evento_nome"), obter("evento_data"), obter("evento_local")
+        )
+
+    def como_documento(self):
+        """Retorna o convidado no formato gravado em eventos.convidados"""
+        return {campo: getattr(self, campo) for campo in CAMPOS_REGISTRO}
+
+    def __repr__(self):
+        return f"RegistroConvidado(nome={self.nome!r}, email={self.email!r}, status={self.status!r})"
+
+
+async def carregar_registros(cursor):
+    """
+    Consome um cursor (find/aggregate) convertendo cada documento em
+    RegistroConvidado à medida que os lotes chegam, sem montar a lista de dicts
+    """
+    return [RegistroConvidado.do_documento(documento) async for documento in cursor]
+
+
+async def carregar_colunas(cursor, campos):
+    """
+    Consome um cursor guardando cada campo em uma lista própria (uma coluna
+    por campo), no formato aceito por pandas.DataFrame
+
+    Returns:
+        dict: {campo: [valores na ordem do cursor]}
+    """
+    colunas = {campo: [] for campo in campos}
+    repetidos = [(campo, colunas[campo].append) for campo in campos
+                 if campo == "status" or campo in CAMPOS_EVENTO_REGISTRO]
+    demais = [(campo, colunas[campo].append) for campo in campos
+              if campo != "status" and campo not in CAMPOS_EVENTO_REGISTRO]
+    async for documento in cursor:
+        obter = documento.get
+        for campo, adicionar in demais:
+            adicionar(obter(campo))
+        for campo, adicionar in repetidos:
+            valor = obter(campo)
+            if campo == "evento_id" and valor is not None:
+                valor = str(valor)
+            adicionar(_compartilhar(valor))
+    return colunas
+
+
+def pipeline_convidados(filtro, campos=CAMPOS_REGISTRO):
+    """Agregação que devolve um documento por convidado, apenas com os campos pedidos"""
+    return [
+        {"$match": filtro},
+        {"$unwind": "$convidados"},
+        {"$project": {"_id": 0, **{campo: f"$convidados.{campo}" for campo in campos}}},
+    ]
+
+
+def _contar_status(status):
+    return {"$size": {"$filter": {
+        "input": {"$ifNull": ["$convidados", []]},
+        "as": "c",
+        "cond": {"$eq": [{"$ifNull": ["$$c.status", StatusConvidado.PENDENTE.value]}, status.value]},
+    }}}
+
+
+def pipeline_convidado_estatisticas(evento_oid, email):
+    """
+    Agregação que devolve apenas o convidado com o email informado (ou null,
+    após uma exclusão) e os totais por status do evento, sem transferir a
+    lista de convidados
+    """
+    return [
+        {"$match": {"_id": evento_oid}},
+        {"$project": {
+            "_id": 0,
+            "convidado": {"$arrayElemAt": [{"$filter": {
+                "input": {"$ifNull": ["$convidados", []]},
+                "as": "c",
+                "cond": {"$eq": ["$$c.email", email]},
+            }}, 0]},
+            "estatisticas": {
+                "total": {"$size": {"$ifNull": ["$convidados", []]}},
+                **{status.value: _contar_status(status) for status in StatusConvidado},
+            },
+        }},
+    ]
+
+
+def _email_de(convidado):
+    if isinstance(convidado, RegistroConvidado):
+        return convidado.email
+    return convidado.get("email")
+
+
+def _documento_de(convidado):
+    if isinstance(convidado, RegistroConvidado):
+        return convidado.como_documento()
+    return convidado
+
+
+def _documento_gravado(convidado):
+    """Documento do convidado com a chave de deduplicação, no formato gravado pelas inclusões"""
+    documento = dict(_documento_de(convidado))
+    chave = chave_convidado(documento.get("email"))
+    if chave is not None:
+        documento[CAMPO_CHAVE] = chave
+    return documento
+
+
+def chave_convidado(email):
+    """Retorna a chave de deduplicação do email, ou None se não for deduplicável"""
+    chave = normalizar_email(email)
+    if chave in EMAILS_SEM_CHAVE:
+        return None
+    return chave
+
+
+def validar_modo(modo):
+    modo = (modo or MODO_IGNORAR).lower()
+    if modo not in MODOS_DEDUPLICACAO:
+        raise ValueError(f"Modo de deduplicação inválido: {modo}. Use um de {', '.join(MODOS_DEDUPLICACAO)}")
+    return modo
+
+
+class IndiceConvidados:
+    """Índice email normalizado -> email gravado dos convidados de um evento"""
+
+    def __init__(self, convidados_existentes=()):
+        self._emails = {}
+        for convidado in convidados_existentes:
+            email = convidado.get("email")
+            chave = chave_convidado(email)
+            if chave is not None and chave not in self._emails:
+                self._emails[chave] = email
+
+    def email_gravado(self, email):
+        """Email com que o convidado está gravado no evento (ou None)"""
+        return self._emails.get(chave_convidado(email))
+
+    def __contains__(self, email):
+        chave = chave_convidado(email)
+        return chave is not None and chave in self._emails
+
+    def classificar(self, novos, modo=MODO_IGNORAR):
+        """
+        Separa os novos convidados em inserções, alterações e ignorados.
+        Repetições dentro da própria lista também são tratadas: no modo
+        "ignorar" vale a primeira ocorrência, nos demais a última.
+
+        Args:
+            novos (list): Convidados (dicts ou RegistroConvidado) a adicionar
+            modo (str): Um de MODOS_DEDUPLICACAO
+
+        Returns:
+            tuple: (inserir, alterar, ignorados), onde alterar é uma lista de
+            (email_gravado, convidado)
+        """
+        modo = validar_modo(modo)
+        inserir = []
+        posicao_insercao = {}
+        alterar = {}
+        ignorados = []
+
+        for convidado in novos:
+            chave = chave_convidado(_email_de(convidado))
+            if chave is None:
+                inserir.append(convidado)
+                continue
+
+            if chave in self._emails:
+                if modo == MODO_IGNORAR:
+                    ignorados.append(convidado)
+                else:
+                    if chave in alterar:
+                        ignorados.append(alterar[chave][1])
+                    alterar[chave] = (self._emails[chave], convidado)
+            elif chave in posicao_insercao:
+                # Repetido dentro da própria lista
+                if modo == MODO_IGNORAR:
+                    ignorados.append(convidado)
+                else:
+                    indice = posicao_insercao[chave]
+                    ignorados.append(inserir[indice])
+                    inserir[indice] = convidado
+            else:
+                posicao_insercao[chave] = len(inserir)
+                inserir.append(convidado)
+
+        return inserir, list(alterar.values()), ignorados
+
+
+def operacoes_alteracao(evento_oid, alterar, modo):
+    """
+    Monta as operações de bulk_write que aplicam as alterações de
+    IndiceConvidados.classificar aos convidados já cadastrados
+
+    Returns:
+        list: Operações UpdateOne
+    """
+    operacoes = []
+    for email_gravado, convidado in alterar:
+        if modo == MODO_SUBSTITUIR:
+            atualizacao = {"convidados.$": _documento_gravado(convidado)}
+        else:
+            convidado = _documento_de(convidado)
+            atualizacao = {
+                f"convidados.$.{campo}": convidado[campo]
+                for campo in CAMPOS_ATUALIZAVEIS
+                if convidado.get(campo) is not None and convidado[campo] not in VALORES_PREENCHIMENTO
+            }
+        if atualizacao:
+            operacoes.append(UpdateOne(
+                {"_id": evento_oid, "convidados.email": email_gravado},
+                {"$set": atualizacao, "$inc": INCREMENTAR_VERSAO}
+            ))
+    return operacoes
+
+
+def filtro_insercao(evento_oid, inserir):
+    """
+    Filtro da inclusão dos novos convidados: o evento só é atualizado se
+    nenhuma das chaves normalizadas ainda estiver na lista, o que torna a
+    deduplicação atômica mesmo com gravações concorrentes do mesmo email
+    (em qualquer caixa). Convidados antigos, sem a chave gravada, já estavam
+    na lista lida por IndiceConvidados antes da gravação.
+    """
+    chaves = [chave for chave in map(chave_convidado, map(_email_de, inserir)) if chave is not None]
+    if not chaves:
+        return {"_id": evento_oid}
+    return {"_id": evento_oid, f"convidados.{CAMPO_CHAVE}": {"$nin": chaves}}
+
+
+async def gravar_convidados(colecao, evento_oid, inserir, alterar, modo):
+    """
+    Grava o resultado de IndiceConvidados.classificar. As alterações vão em
+    um único bulk_write e as inclusões em uma única atualização condicional
+    (filtro_insercao). Se outra requisição incluiu algum dos emails depois
+    da leitura, os novos convidados são classificados de novo contra a lista
+    atual e a gravação é repetida.
+
+    Returns:
+        tuple: (inseridos, alterados, ignorados) efetivamente aplicados,
+        onde ignorados são os convidados descartados por essa nova
+        classificação
+    """
+    alterados = []
+    ignorados = []
+    for _ in range(TENTATIVAS_INSERCAO):
+        operacoes = operacoes_alteracao(evento_oid, alterar, modo)
+        if operacoes:
+            await colecao.bulk_write(operacoes, ordered=True)
+        alterados.extend(alterar)
+        if not inserir:
+            return inserir, alterados, ignorados
+
+        resultado = await colecao.update_one(filtro_insercao(evento_oid, inserir), {
+            "$push": {"convidados": {"$each": [_documento_gravado(c) for c in inserir]}},
+            "$inc": INCREMENTAR_VERSAO
+        })
+        if resultado.matched_count:
+            return inserir, alterados, ignorados
+
+        evento = await colecao.find_one({"_id": evento_oid}, {"convidados.email": 1})
+        if evento is None:
+            return [], alterados, ignorados
+        inserir, alterar, descartados = IndiceConvidados(evento.get("convidados", [])).classificar(inserir, modo)
+        ignorados.extend(descartados)
+    raise RuntimeError("Não foi possível incluir os convidados: a lista foi alterada em todas as tentativas")
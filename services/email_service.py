@@ -9,18 +9,19 @@ import logging
 import uuid
 import json
 import asyncio
+import time
 from email.mime.text import MIMEText
 from jose import jwt
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-from mailjet_rest import Client
 
 # Carrega variáveis de ambiente
 load_dotenv()
 
 # Importar secreto
 from config.secrets import SECRET_KEY
+from services.metricas import EMAIL_DURACAO, EMAIL_EM_ANDAMENTO
+from services.perfilador import executar_em_thread
 
 # Configurações de email
 SENDER_EMAIL = os.getenv('SENDER_EMAIL', 'eventos@cod.events')
@@ -42,7 +43,23 @@ logger = logging.getLogger(__name__)
 
 class EmailService:
     def __init__(self):
-        self.mailjet = Client(auth=(MAILJET_API_KEY, MAILJET_API_SECRET), version='v3.1')
+        self._mailjet = None
+
+    @property
+    def mailjet(self):
+        """Cliente Mailjet, criado (e importado) apenas no primeiro envio"""
+        if self._mailjet is None:
+            from mailjet_rest import Client
+            self._mailjet = Client(auth=(MAILJET_API_KEY, MAILJET_API_SECRET), version='v3.1')
+        return self._mailjet
+
+    @mailjet.setter
+    def mailjet(self, cliente):
+        self._mailjet = cliente
+
+    def _enviar_mailjet(self, data):
+        # Chamada HTTP bloqueante: executada em uma thread por enviar_email_html
+        return self.mailjet.send.create(data=data)
         
     def gerar_tokens_para_evento(self, evento_id, email_convidado, base_url=None):
         """
@@ -97,6 +114,7 @@ class EmailService:
             
             # Criar versão texto plano do conteúdo HTML
             try:
+                from bs4 import BeautifulSoup
                 texto_plano = BeautifulSoup(conteudo_html, 'html.parser').get_text()
             except Exception as text_error:
                 logger.warning(f"Erro ao criar versão texto: {text_error}")
@@ -144,13 +162,27 @@ class EmailService:
             if tags:
                 data['Messages'][0]['Tags'] = tags
             
-            # Enviar email via Mailjet API
+            # Enviar email via Mailjet API, em uma thread para não bloquear o
+            # event loop (e para que EMAIL_EM_ANDAMENTO conte os envios simultâneos)
             logger.info(f"Enviando email via Mailjet para {email}")
-            response = self.mailjet.send.create(data=data)
+            inicio_envio = time.perf_counter()
+            EMAIL_EM_ANDAMENTO.inc()
+            try:
+                response = await executar_em_thread(self._enviar_mailjet, data)
+            except Exception:
+                EMAIL_DURACAO.observe(time.perf_counter() - inicio_envio, provider="mailjet", result="erro")
+                raise
+            finally:
+                EMAIL_EM_ANDAMENTO.dec()
             
             # Verificar resposta da API
             status_code = response.status_code
             response_data = response.json()
+            EMAIL_DURACAO.observe(
+                time.perf_counter() - inicio_envio,
+                provider="mailjet",
+                result="sucesso" if status_code == 200 else "falha"
+            )
             
             if status_code == 200:
                 logger.info(f"Email enviado com sucesso para {email}. Tracking ID: {tracking_id}")
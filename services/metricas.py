@@ -0,0 +1,343 @@
+"""
+Métricas da aplicação no formato de exposição de texto do Prometheus.
+
+Implementação leve (sem dependência de prometheus_client) com contadores,
+medidores e histogramas com rótulos. As métricas são registradas em memória
+por processo e exportadas pelo endpoint /metrics.
+
+O /metrics não é público: o Prometheus se autentica com o header
+`Authorization: Bearer <METRICS_TOKEN>`; sem METRICS_TOKEN configurado,
+apenas administradores logados conseguem ler as métricas.
+
+A latência HTTP é medida por MetricasMiddleware (ASGI puro) até o último
+bloco do corpo ser enviado, de modo que respostas em streaming (SSE do feed
+ao vivo, exportações Excel) contam como em andamento durante toda a conexão.
+"""
+import hmac
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+
+# Token esperado no header Authorization do scraper (opcional)
+TOKEN_METRICAS = os.getenv('METRICS_TOKEN') or None
+
+# Tipo de conteúdo esperado pelo Prometheus
+CONTENT_TYPE_METRICAS = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites padrão dos buckets de latência (em segundos)
+BUCKETS_PADRAO = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def token_metricas_valido(authorization, token=TOKEN_METRICAS):
+    """Confere o header Authorization (Bearer) com o METRICS_TOKEN, em tempo constante"""
+    if not token or not authorization:
+        return False
+    esquema, _, credencial = authorization.partition(" ")
+    if esquema.lower() != "bearer":
+        return False
+    return hmac.compare_digest(credencial.strip().encode(), token.encode())
+
+
+def _escapar_rotulo(valor):
+    """Escapa o valor de um rótulo conforme o formato de texto do Prometheus"""
+    return str(valor).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_rotulos(nomes, valores, extra=None):
+    pares = [f'{nome}="{_escapar_rotulo(valor)}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _formatar_numero(valor):
+    if valor == float("inf"):
+        return "+Inf"
+    if isinstance(valor, float) and valor.is_integer():
+        return str(int(valor))
+    return repr(valor) if isinstance(valor, float) else str(valor)
+
+
+class _Metrica:
+    tipo = "untyped"
+
+    def __init__(self, nome, descricao, rotulos=()):
+        self.nome = nome
+        self.descricao = descricao
+        self.rotulos = tuple(rotulos)
+        self._valores = {}
+        # Os listeners do pymongo rodam em threads do executor do Motor
+        self._lock = threading.Lock()
+
+    def _chave(self, rotulos):
+        if set(rotulos) != set(self.rotulos):
+            raise ValueError(
+                f"Rótulos inválidos para {self.nome}: esperado {self.rotulos}, recebido {tuple(rotulos)}"
+            )
+        return tuple(rotulos[nome] for nome in self.rotulos)
+
+    def _cabecalho(self):
+        return [
+            f"# HELP {self.nome} {self.descricao}",
+            f"# TYPE {self.nome} {self.tipo}",
+        ]
+
+    def valores(self):
+        """Retorna uma cópia dos valores atuais indexados pela tupla de rótulos"""
+        with self._lock:
+            return dict(self._valores)
+
+    def exportar(self):
+        linhas = self._cabecalho()
+        with self._lock:
+            itens = sorted(self._valores.items())
+        for chave, valor in itens:
+            linhas.append(f"{self.nome}{_formatar_rotulos(self.rotulos, chave)} {_formatar_numero(valor)}")
+        return linhas
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def inc(self, valor=1, **rotulos):
+        if valor < 0:
+            raise ValueError("Contadores só podem ser incrementados")
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+
+class Medidor(_Metrica):
+    tipo = "gauge"
+
+    def inc(self, valor=1, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = self._valores.get(chave, 0) + valor
+
+    def dec(self, valor=1, **rotulos):
+        self.inc(-valor, **rotulos)
+
+    def set(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            self._valores[chave] = valor
+
+    def obter(self, **rotulos):
+        chave = self._chave(rotulos)
+        with self._lock:
+            return self._valores.get(chave, 0)
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome, descricao, rotulos=(), buckets=BUCKETS_PADRAO):
+        super().__init__(nome, descricao, rotulos)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, valor, **rotulos):
+        chave = self._chave(rotulos)
+        indice = bisect_left(self.buckets, valor)
+        with self._lock:
+            serie = self._valores.get(chave)
+            if serie is None:
+                # [contagens por bucket (não cumulativas), soma, total]
+                serie = self._valores[chave] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            serie[0][indice] += 1
+            serie[1] += valor
+            serie[2] += 1
+
+    @contextmanager
+    def medir(self, **rotulos):
+        """Mede a duração do bloco e registra no histograma"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - inicio, **rotulos)
+
+    def exportar(self):
+        linhas = self._cabecalho()
+        with self._lock:
+            itens = sorted((chave, [list(serie[0]), serie[1], serie[2]]) for chave, serie in self._valores.items())
+        limites = self.buckets + (float("inf"),)
+        for chave, (contagens, soma, total) in itens:
+            acumulado = 0
+            for limite, contagem in zip(limites, contagens):
+                acumulado += contagem
+                rotulos = _formatar_rotulos(self.rotulos, chave, f'le="{_formatar_numero(float(limite))}"')
+                linhas.append(f"{self.nome}_bucket{rotulos} {acumulado}")
+            rotulos = _formatar_rotulos(self.rotulos, chave)
+            linhas.append(f"{self.nome}_sum{rotulos} {_formatar_numero(soma)}")
+            linhas.append(f"{self.nome}_count{rotulos} {total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """Registro central das métricas do processo"""
+
+    def __init__(self):
+        self._metricas = {}
+        self._lock = threading.Lock()
+
+    def _registrar(self, metrica):
+        with self._lock:
+            if metrica.nome in self._metricas:
+                raise ValueError(f"Métrica já registrada: {metrica.nome}")
+            self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome, descricao, rotulos=()):
+        return self._registrar(Contador(nome, descricao, rotulos))
+
+    def medidor(self, nome, descricao, rotulos=()):
+        return self._registrar(Medidor(nome, descricao, rotulos))
+
+    def histograma(self, nome, descricao, rotulos=(), buckets=BUCKETS_PADRAO):
+        return self._registrar(Histograma(nome, descricao, rotulos, buckets))
+
+    def exportar(self):
+        """Retorna todas as métricas no formato de texto do Prometheus"""
+        with self._lock:
+            metricas = list(self._metricas.values())
+        linhas = []
+        for metrica in metricas:
+            linhas.extend(metrica.exportar())
+        return "\n".join(linhas) + "\n"
+
+
+def cronometrar(histograma, **rotulos):
+    """
+    Decorator que registra a duração de uma rota assíncrona no histograma.
+    Preserva a assinatura da função para a injeção de dependências do FastAPI.
+    """
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with histograma.medir(**rotulos):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class MetricasMiddleware:
+    """
+    Registra as requisições HTTP em andamento e a latência por rota. A
+    requisição termina no último http.response.body (more_body=False), ou
+    quando a aplicação encerra sem enviá-lo (erro ou cliente desconectado).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        metodo = scope["method"]
+        HTTP_EM_ANDAMENTO.inc(method=metodo)
+        inicio = time.perf_counter()
+        status = 500
+        concluida = False
+
+        def concluir():
+            nonlocal concluida
+            if concluida:
+                return
+            concluida = True
+            HTTP_EM_ANDAMENTO.dec(method=metodo)
+            # Usa o template da rota (ex: /api/eventos/{evento_id}) para evitar
+            # uma série por URL; mounts estáticos são agrupados pelo prefixo
+            rota = scope.get("route")
+            nome_rota = getattr(rota, "path", None) or scope.get("root_path") or "nao_mapeada"
+            HTTP_DURACAO.observe(time.perf_counter() - inicio, method=metodo, route=nome_rota, status=str(status))
+
+        async def enviar(mensagem):
+            nonlocal status
+            if mensagem["type"] == "http.response.start":
+                status = mensagem["status"]
+            await send(mensagem)
+            if mensagem["type"] == "http.response.pathsend" or (
+                mensagem["type"] == "http.response.body" and not mensagem.get("more_body", False)
+            ):
+                concluir()
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            concluir()
+
+
+# Registro global
+registro = RegistroMetricas()
+
+# Métricas HTTP
+HTTP_DURACAO = registro.histograma(
+    "rsvp_http_request_duration_seconds",
+    "Latência das requisições HTTP por rota",
+    ("method", "route", "status"),
+)
+HTTP_EM_ANDAMENTO = registro.medidor(
+    "rsvp_http_requests_in_progress",
+    "Requisições HTTP em andamento",
+    ("method",),
+)
+
+# Métricas do MongoDB (via command monitoring do pymongo)
+MONGO_DURACAO = registro.histograma(
+    "rsvp_mongodb_command_duration_seconds",
+    "Duração dos comandos enviados ao MongoDB",
+    ("command", "status"),
+)
+MONGO_POOL_EM_USO = registro.medidor(
+    "rsvp_mongodb_pool_connections_in_use",
+    "Conexões do pool do MongoDB em uso por servidor",
+    ("address",),
+)
+
+# Métricas de envio de email
+EMAIL_DURACAO = registro.histograma(
+    "rsvp_email_send_duration_seconds",
+    "Latência das chamadas ao provedor de email",
+    ("provider", "result"),
+)
+EMAIL_EM_ANDAMENTO = registro.medidor(
+    "rsvp_email_sends_in_progress",
+    "Envios de email aguardando resposta do provedor",
+)
+
+# Métricas de geração de relatórios
+RELATORIO_DURACAO = registro.histograma(
+    "rsvp_report_generation_duration_seconds",
+    "Duração da geração de relatórios Excel",
+    ("report",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+# Métricas do event loop
+LOOP_LAG = registro.medidor(
+    "rsvp_event_loop_lag_seconds",
+    "Atraso mais recente medido no event loop",
+)
+LOOP_BLOQUEIOS = registro.contador(
+    "rsvp_event_loop_blocked_total",
+    "Bloqueios do event loop acima do limite detectados pelo watchdog",
+    ("route",),
+)
+
+# Métricas dos caches em memória
+CACHE_CONSULTAS = registro.contador(
+    "rsvp_cache_lookups_total",
+    "Consultas aos caches em memória",
+    ("cache", "result"),
+)
+
+# Conexões do feed ao vivo de RSVP
+FEED_ASSINANTES = registro.medidor(
+    "rsvp_live_feed_subscribers",
+    "Conexões abertas no feed ao vivo de RSVP",
+)
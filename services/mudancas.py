@@ -0,0 +1,263 @@
+"""
+Propagação das alterações dos eventos entre os workers (change streams).
+
+Cada worker abre um change stream na coleção eventos e repassa as alterações
+aos assinantes do processo (cache de cabeçalhos, feed ao vivo), de modo que
+uma gravação feita em qualquer worker chega a todos sem polling. O pipeline
+descarta, ainda no servidor, os valores de campos que são listas inteiras
+(ex: o array de convidados reescrito por um $pull), para que cada evento do
+stream tenha poucos bytes.
+
+O change stream identifica os convidados pela posição no array. O stream é
+aberto com fullDocument="updateLookup" e o pipeline devolve apenas o email
+das posições alteradas e a versão do documento consultado: se essa versão
+não é a gravada pela própria alteração (outra gravação, como um $pull, já
+deslocou as posições), o email não é usado e os assinantes recarregam o
+evento.
+
+Sempre que o stream volta a abrir depois de um intervalo em que as
+alterações podem ter sido perdidas (sem token de retomada), os assinantes
+recebem uma Mudanca REINICIO.
+
+Change streams exigem um replica set (ou cluster shardado). Com um MongoDB
+standalone o ouvinte se desativa na primeira tentativa e os assinantes
+continuam recebendo apenas as alterações feitas no próprio worker. Para
+testar localmente basta um replica set de um nó:
+
+    mongod --replSet rs0 --dbpath /tmp/rs0 --port 27017
+    mongosh --eval 'rs.initiate()'
+    MONGODB_URL=mongodb://localhost:27017/?replicaSet=rs0
+
+Configuração por variável de ambiente:
+    CHANGE_STREAMS_ENABLED    liga/desliga o ouvinte (padrão: 1)
+"""
+import asyncio
+import inspect
+import logging
+import os
+import re
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+logger = logging.getLogger(__name__)
+
+MUDANCAS_ATIVAS = os.getenv('CHANGE_STREAMS_ENABLED', '1').lower() in ('1', 'true', 'sim')
+
+# Espera entre reconexões após uma falha (dobra a cada tentativa)
+ESPERA_INICIAL_SEGUNDOS = 1
+ESPERA_MAXIMA_SEGUNDOS = 30
+
+# Erros que indicam que o servidor não suporta change streams (standalone)
+CODIGOS_SEM_SUPORTE = {20, 40573}
+# Erros em que o stream não pode ser retomado do último token
+CODIGOS_HISTORICO_PERDIDO = {260, 280, 286}
+
+# Operação sintética entregue aos assinantes quando alterações podem ter
+# sido perdidas (o stream recomeçou sem o token de retomada)
+REINICIO = "reinicio"
+
+CAMPO_VERSAO = "versao"
+
+# Posição de um caminho convidados.<posição>.<campo>
+_POSICAO_CONVIDADO = {"$toInt": {"$arrayElemAt": [{"$split": ["$$campo.k", "."]}, 1]}}
+
+PIPELINE_MUDANCAS = [
+    {"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}},
+    {"$project": {
+        "operationType": 1,
+        "documentKey": 1,
+        "campos": {"$map": {
+            "input": {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}},
+            "as": "campo",
+            "in": {"k": "$$campo.k", "v": {"$cond": [{"$isArray": "$$campo.v"}, None, "$$campo.v"]}},
+        }},
+        "removidos": {"$ifNull": ["$updateDescription.removedFields", []]},
+        # Email dos convidados cujos campos foram alterados, pela posição no documento consultado
+        "emails": {"$map": {
+            "input": {"$filter": {
+                "input": {"$objectToArray": {"$ifNull": ["$updateDescription.updatedFields", {}]}},
+                "as": "campo",
+                "cond": {"$regexMatch": {"input": "$$campo.k", "regex": r"^convidados\.\d+\."}},
+            }},
+            "as": "campo",
+            "in": {"k": _POSICAO_CONVIDADO, "v": {"$ifNull": [
+                {"$arrayElemAt": [{"$ifNull": ["$fullDocument.convidados.email", []]}, _POSICAO_CONVIDADO]},
+                None,
+            ]}},
+        }},
+        "versao_documento": f"$fullDocument.{CAMPO_VERSAO}",
+    }},
+]
+
+PADRAO_CAMPO_CONVIDADO = re.compile(r'^convidados\.(\d+)\.(.+)$')
+# Registro inteiro de um convidado (incluído por $push ou substituído)
+PADRAO_CONVIDADO = re.compile(r'^convidados\.(\d+)$')
+# Campos de controle gravados junto de toda alteração (services/versoes.py),
+# que não fazem parte do cabeçalho do evento
+CAMPOS_CONTROLE = {CAMPO_VERSAO}
+
+
+class Mudanca:
+    """Alteração de um evento recebida do change stream"""
+
+    __slots__ = ("operacao", "evento_id", "campos", "removidos", "emails", "versao_documento")
+
+    def __init__(self, operacao, evento_id=None, campos=None, removidos=(), emails=None,
+                 versao_documento=None):
+        self.operacao = operacao
+        self.evento_id = evento_id
+        self.campos = campos or {}
+        self.removidos = list(removidos)
+        self.emails = emails or {}
+        self.versao_documento = versao_documento
+
+    @classmethod
+    def do_documento(cls, documento):
+        return cls(
+            documento["operationType"],
+            documento.get("documentKey", {}).get("_id"),
+            {campo["k"]: campo["v"] for campo in documento.get("campos", [])},
+            documento.get("removidos", []),
+            {item["k"]: item["v"] for item in documento.get("emails", [])},
+            documento.get("versao_documento"),
+        )
+
+    def email_convidado(self, indice):
+        """
+        Email do convidado na posição informada, ou None se o documento
+        consultado pelo updateLookup já não for o resultado desta alteração
+        (as posições podem ter mudado)
+        """
+        versao = self.campos.get(CAMPO_VERSAO)
+        if versao is None or self.versao_documento != versao:
+            return None
+        return self.emails.get(indice)
+
+    @property
+    def altera_cabecalho(self):
+        """Indica se algum campo fora da lista de convidados pode ter mudado"""
+        if self.operacao != "update":
+            return True
+        return any(
+            not caminho.startswith("convidados") and caminho not in CAMPOS_CONTROLE
+            for caminho in (*self.campos, *self.removidos)
+        )
+
+    def alteracoes_convidados(self):
+        """
+        Separa as alterações de convidados (campos alterados ou o registro
+        inteiro de um convidado incluído ou substituído) das alterações
+        estruturais da lista (exclusão, reescrita)
+
+        Returns:
+            tuple: ({indice: {campo: valor}}, estrutural)
+        """
+        por_indice = {}
+        estrutural = self.operacao != "update"
+        for caminho in (*self.campos, *self.removidos):
+            if not caminho.startswith("convidados"):
+                continue
+            registro = PADRAO_CONVIDADO.match(caminho)
+            if registro is not None and isinstance(self.campos.get(caminho), dict):
+                por_indice.setdefault(int(registro.group(1)), {}).update(self.campos[caminho])
+                continue
+            correspondencia = PADRAO_CAMPO_CONVIDADO.match(caminho)
+            if correspondencia is None or caminho in self.removidos:
+                estrutural = True
+                continue
+            indice, campo = int(correspondencia.group(1)), correspondencia.group(2)
+            por_indice.setdefault(indice, {})[campo] = self.campos[caminho]
+        return por_indice, estrutural
+
+
+class OuvinteMudancas:
+    """
+    Mantém o change stream da coleção eventos aberto (retomando do último
+    token após falhas) e entrega cada Mudanca aos assinantes do processo
+    """
+
+    def __init__(self):
+        self._assinantes = []
+        self._tarefa = None
+        # Verdadeiro enquanto as alterações chegam pelo change stream
+        self.ativo = False
+
+    def assinar(self, funcao):
+        """Registra uma função (síncrona ou assíncrona) que recebe cada Mudanca"""
+        if funcao not in self._assinantes:
+            self._assinantes.append(funcao)
+
+    async def _entregar(self, mudanca):
+        for funcao in self._assinantes:
+            try:
+                resultado = funcao(mudanca)
+                if inspect.isawaitable(resultado):
+                    await resultado
+            except Exception:
+                logger.exception("Erro ao aplicar alteração do change stream em %r", funcao)
+
+    async def _ouvir(self, db):
+        token = None
+        espera = ESPERA_INICIAL_SEGUNDOS
+        # Se o stream já esteve aberto, reabri-lo sem token pode ter perdido alterações
+        aberto_antes = False
+        while True:
+            fluxo = None
+            try:
+                async with db.eventos.watch(
+                    PIPELINE_MUDANCAS, resume_after=token, full_document="updateLookup"
+                ) as fluxo:
+                    if not self.ativo:
+                        logger.info("Change stream da coleção eventos aberto")
+                        if aberto_antes:
+                            await self._entregar(Mudanca(REINICIO))
+                    self.ativo = aberto_antes = True
+                    espera = ESPERA_INICIAL_SEGUNDOS
+                    async for documento in fluxo:
+                        token = fluxo.resume_token
+                        await self._entregar(Mudanca.do_documento(documento))
+            except OperationFailure as e:
+                if e.code in CODIGOS_SEM_SUPORTE:
+                    logger.warning(f"Change streams indisponíveis, alterações ficam locais a cada worker: {e}")
+                    self.ativo = False
+                    return
+                if e.code in CODIGOS_HISTORICO_PERDIDO or e.has_error_label("NonResumableChangeStreamError"):
+                    # Sem token, a reabertura entrega o REINICIO aos assinantes
+                    logger.warning(f"Change stream não pode ser retomado, recomeçando: {e}")
+                    token = fluxo = None
+                else:
+                    logger.warning(f"Erro no change stream, reconectando em {espera}s: {e}")
+            except PyMongoError as e:
+                logger.warning(f"Erro no change stream, reconectando em {espera}s: {e}")
+            except (AttributeError, NotImplementedError, TypeError) as e:
+                # Cliente sem suporte a watch (ex: mongomock nos benchmarks)
+                logger.warning(f"Change streams indisponíveis neste cliente: {e}")
+                self.ativo = False
+                return
+
+            # O token também avança nos lotes vazios (postBatchResumeToken)
+            if fluxo is not None:
+                token = fluxo.resume_token or token
+            # Sem token, as alterações do intervalo não serão reenviadas
+            if token is None:
+                self.ativo = False
+            await asyncio.sleep(espera)
+            espera = min(espera * 2, ESPERA_MAXIMA_SEGUNDOS)
+
+    def iniciar(self, db):
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._ouvir(db))
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+        self.ativo = False
+
+
+# Ouvinte compartilhado pelo processo
+ouvinte_mudancas = OuvinteMudancas()
@@ -0,0 +1,239 @@
+"""
+Profiler por amostragem para requisições individuais.
+
+Um administrador pode pedir o perfil de uma requisição com o header
+`X-Profile: 1` ou o parâmetro `?__profile=1`. Enquanto o handler executa,
+uma thread amostra a pilha da thread do event loop em intervalos fixos e
+guarda apenas as amostras em que o endpoint da requisição está na pilha.
+O trabalho que a requisição envia ao threadpool por executar_em_thread
+(planilhas, validação de emails) também é amostrado, sob a raiz
+"threadpool" do perfil: o amostrador em andamento é propagado às threads
+por uma ContextVar, copiada pelo run_in_threadpool.
+O resultado é salvo no formato "folded stacks" (uma linha por pilha com a
+contagem de amostras), aceito por flamegraph.pl, speedscope e inferno.
+
+Limites para uso em produção:
+    PROFILING_ENABLED              liga/desliga o recurso (padrão: 0; `python app.py`
+                                   liga no modo de desenvolvimento)
+    PROFILING_INTERVAL_MS          intervalo entre amostras (padrão: 5, mínimo: 1)
+    PROFILING_MAX_SECONDS          duração máxima da amostragem (padrão: 30)
+    PROFILING_MAX_SAMPLES          máximo de amostras por perfil (padrão: 10000)
+    PROFILING_COOLDOWN_SECONDS     intervalo mínimo entre perfis (padrão: 10)
+    PROFILING_KEEP                 quantidade de perfis mantidos em disco (padrão: 20)
+Apenas um perfil é coletado por vez em cada worker.
+"""
+import contextvars
+import inspect
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+
+from fastapi.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PERFILAMENTO_ATIVO = os.getenv('PROFILING_ENABLED', '0').lower() in ('1', 'true', 'sim')
+INTERVALO_AMOSTRAGEM = max(1.0, float(os.getenv('PROFILING_INTERVAL_MS', '5'))) / 1000
+DURACAO_MAXIMA = float(os.getenv('PROFILING_MAX_SECONDS', '30'))
+MAXIMO_AMOSTRAS = int(os.getenv('PROFILING_MAX_SAMPLES', '10000'))
+INTERVALO_ENTRE_PERFIS = float(os.getenv('PROFILING_COOLDOWN_SECONDS', '10'))
+PERFIS_MANTIDOS = int(os.getenv('PROFILING_KEEP', '20'))
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+DIRETORIO_PERFIS = BASE_DIR / "perfis"
+
+# Nomes de arquivo gerados por salvar_perfil
+PADRAO_NOME_PERFIL = re.compile(r'^[\w.-]+\.folded$')
+
+# Raiz das pilhas amostradas nas threads do threadpool
+ROTULO_THREADPOOL = "threadpool"
+
+# Amostrador da requisição perfilada (None fora de um perfil)
+amostrador_atual = contextvars.ContextVar("amostrador_atual", default=None)
+
+
+def perfil_solicitado(request):
+    """Verifica se a requisição pediu perfilamento via header ou query string"""
+    valor = request.headers.get('x-profile') or request.query_params.get('__profile')
+    return bool(valor) and valor.lower() in ('1', 'true', 'sim')
+
+
+def endpoint_da_requisicao(app, scope):
+    """Resolve o endpoint que vai atender a requisição antes do roteamento"""
+    from starlette.routing import Match
+
+    for rota in app.router.routes:
+        correspondencia, _ = rota.matches(scope)
+        if correspondencia == Match.FULL:
+            endpoint = getattr(rota, 'endpoint', None)
+            if endpoint is not None:
+                return getattr(rota, 'path', ''), inspect.unwrap(endpoint)
+    return None, None
+
+
+def _rotulo_frame(codigo):
+    try:
+        arquivo = os.path.relpath(codigo.co_filename, BASE_DIR)
+    except ValueError:
+        arquivo = codigo.co_filename
+    if arquivo.startswith('..'):
+        arquivo = os.path.basename(codigo.co_filename)
+    return f"{codigo.co_name} ({arquivo}:{codigo.co_firstlineno})"
+
+
+class AmostradorPilha:
+    """Amostra periodicamente a pilha de uma thread em uma thread separada"""
+
+    def __init__(self, id_thread, codigo_alvo=None, intervalo=INTERVALO_AMOSTRAGEM,
+                 duracao_maxima=DURACAO_MAXIMA, maximo_amostras=MAXIMO_AMOSTRAS):
+        self.id_thread = id_thread
+        self.codigo_alvo = codigo_alvo
+        self.intervalo = intervalo
+        self.duracao_maxima = duracao_maxima
+        self.maximo_amostras = maximo_amostras
+        self.pilhas = Counter()
+        self.total_amostras = 0
+        self.interrompido = False
+        self._parar = threading.Event()
+        self._thread = None
+        self._rotulos = {}
+        # Threads do threadpool trabalhando para a requisição
+        self._threads_acompanhadas = set()
+
+    def acompanhar(self, id_thread):
+        self._threads_acompanhadas.add(id_thread)
+
+    def esquecer(self, id_thread):
+        self._threads_acompanhadas.discard(id_thread)
+
+    def _rotulo(self, codigo):
+        rotulo = self._rotulos.get(codigo)
+        if rotulo is None:
+            rotulo = self._rotulos[codigo] = _rotulo_frame(codigo)
+        return rotulo
+
+    def _amostrar(self):
+        limite = time.monotonic() + self.duracao_maxima
+        while not self._parar.wait(self.intervalo):
+            if time.monotonic() > limite or self.total_amostras >= self.maximo_amostras:
+                self.interrompido = True
+                return
+            frames = sys._current_frames()
+            codigos = self._pilha(frames.get(self.id_thread))
+            # Descarta amostras de outras requisições e do loop ocioso
+            if self.codigo_alvo is None or self.codigo_alvo in codigos:
+                self._registrar(codigos)
+            for id_thread in tuple(self._threads_acompanhadas):
+                codigos = self._pilha(frames.get(id_thread))
+                if codigos:
+                    self._registrar(codigos, ROTULO_THREADPOOL)
+
+    @staticmethod
+    def _pilha(frame):
+        codigos = []
+        while frame is not None:
+            codigos.append(frame.f_code)
+            frame = frame.f_back
+        return codigos
+
+    def _registrar(self, codigos, raiz=None):
+        rotulos = [self._rotulo(c) for c in reversed(codigos)]
+        if raiz is not None:
+            rotulos.insert(0, raiz)
+        self.pilhas[';'.join(rotulos)] += 1
+        self.total_amostras += 1
+
+    def iniciar(self):
+        self._thread = threading.Thread(target=self._amostrar, name="perfilador", daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+
+    def como_folded(self):
+        return ''.join(f"{pilha} {contagem}\n" for pilha, contagem in self.pilhas.most_common())
+
+
+def _executar_acompanhado(funcao, *args, **kwargs):
+    amostrador = amostrador_atual.get()
+    if amostrador is None:
+        return funcao(*args, **kwargs)
+    id_thread = threading.get_ident()
+    amostrador.acompanhar(id_thread)
+    try:
+        return funcao(*args, **kwargs)
+    finally:
+        amostrador.esquecer(id_thread)
+
+
+async def executar_em_thread(funcao, *args, **kwargs):
+    """run_in_threadpool que inclui a thread no perfil da requisição, quando houver"""
+    return await run_in_threadpool(_executar_acompanhado, funcao, *args, **kwargs)
+
+
+class ControlePerfilamento:
+    """Garante um perfil por vez e o intervalo mínimo entre perfis"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ultimo_inicio = 0.0
+
+    def reservar(self):
+        """Tenta reservar a vaga de perfilamento; retorna False se ocupada ou em espera"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        if time.monotonic() - self._ultimo_inicio < INTERVALO_ENTRE_PERFIS:
+            self._lock.release()
+            return False
+        self._ultimo_inicio = time.monotonic()
+        return True
+
+    def liberar(self):
+        self._lock.release()
+
+
+def salvar_perfil(amostrador, rota):
+    """
+    Salva o perfil em disco e remove os mais antigos
+
+    Returns:
+        str: Nome do arquivo gerado
+    """
+    DIRETORIO_PERFIS.mkdir(exist_ok=True)
+    rota_limpa = re.sub(r'[^\w-]+', '_', rota).strip('_') or 'raiz'
+    nome = f"{time.strftime('%Y%m%d-%H%M%S')}_{rota_limpa}_{uuid.uuid4().hex[:8]}.folded"
+    (DIRETORIO_PERFIS / nome).write_text(amostrador.como_folded(), encoding='utf-8')
+
+    antigos = sorted(DIRETORIO_PERFIS.glob('*.folded'), key=lambda p: p.stat().st_mtime)
+    for arquivo in antigos[:-PERFIS_MANTIDOS]:
+        arquivo.unlink(missing_ok=True)
+
+    logger.info(f"Perfil salvo: {nome} ({amostrador.total_amostras} amostras)")
+    return nome
+
+
+def listar_perfis():
+    if not DIRETORIO_PERFIS.exists():
+        return []
+    arquivos = sorted(DIRETORIO_PERFIS.glob('*.folded'), key=lambda p: p.stat().st_mtime, reverse=True)
+    return [{"nome": a.name, "tamanho": a.stat().st_size} for a in arquivos]
+
+
+def caminho_perfil(nome):
+    """Retorna o caminho de um perfil salvo, ou None se o nome for inválido"""
+    if not PADRAO_NOME_PERFIL.match(nome):
+        return None
+    caminho = DIRETORIO_PERFIS / nome
+    return caminho if caminho.is_file() else None
+
+
+# Instância global
+controle_perfilamento = ControlePerfilamento()
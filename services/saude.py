@@ -0,0 +1,174 @@
+"""
+Verificações de saúde (liveness) e prontidão (readiness) da aplicação.
+
+A prontidão considera o MongoDB (ping com cache curto), a saturação do pool
+de conexões, o atraso do event loop e a fila de envios de email. O ping é
+feito no máximo uma vez por intervalo de cache, mesmo com várias sondas
+simultâneas, para não sobrecarregar o banco.
+"""
+import asyncio
+import logging
+import os
+import time
+
+from config.database import obter_client_opcional
+from services.metricas import MONGO_POOL_EM_USO, EMAIL_EM_ANDAMENTO, HTTP_EM_ANDAMENTO, LOOP_LAG
+
+logger = logging.getLogger(__name__)
+
+# Limites configuráveis por variável de ambiente
+CACHE_PING_SEGUNDOS = float(os.getenv('HEALTH_PING_CACHE_SECONDS', '5'))
+TIMEOUT_PING_SEGUNDOS = float(os.getenv('HEALTH_PING_TIMEOUT_SECONDS', '1'))
+LIMITE_SATURACAO_POOL = float(os.getenv('HEALTH_POOL_SATURATION_LIMIT', '0.9'))
+LIMITE_LAG_SEGUNDOS = float(os.getenv('HEALTH_LOOP_LAG_LIMIT_SECONDS', '0.5'))
+LIMITE_EMAILS_PENDENTES = int(os.getenv('HEALTH_MAIL_BACKLOG_LIMIT', '50'))
+INTERVALO_LAG_SEGUNDOS = 0.5
+
+
+class MonitorLagLoop:
+    """
+    Mede continuamente o atraso do event loop: uma tarefa dorme por um
+    intervalo fixo e registra quanto tempo a mais levou para acordar
+    """
+
+    def __init__(self, intervalo=INTERVALO_LAG_SEGUNDOS):
+        self.intervalo = intervalo
+        self.lag_atual = 0.0
+        # Instante (time.monotonic) da última vez que a tarefa acordou,
+        # lido pelo watchdog a partir de outra thread
+        self.ultimo_batimento = time.monotonic()
+        self._tarefa = None
+
+    async def _medir(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            inicio = loop.time()
+            self.ultimo_batimento = time.monotonic()
+            await asyncio.sleep(self.intervalo)
+            self.lag_atual = max(0.0, loop.time() - inicio - self.intervalo)
+            LOOP_LAG.set(self.lag_atual)
+
+    def iniciar(self):
+        if self._tarefa is None:
+            self._tarefa = asyncio.create_task(self._medir())
+
+    async def parar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+            self._tarefa = None
+
+
+class VerificadorSaude:
+    """Executa e armazena em cache as verificações de prontidão"""
+
+    def __init__(self, monitor_lag):
+        self.monitor_lag = monitor_lag
+        self._ultimo_ping = None
+        self._instante_ping = 0.0
+        self._lock = asyncio.Lock()
+
+    async def _ping_mongodb(self):
+        client = obter_client_opcional()
+        if client is None:
+            return {"ok": False, "erro": "Conexão com o banco de dados não estabelecida"}
+
+        inicio = time.perf_counter()
+        try:
+            await asyncio.wait_for(client.admin.command('ping'), timeout=TIMEOUT_PING_SEGUNDOS)
+            return {"ok": True, "latencia_ms": round((time.perf_counter() - inicio) * 1000, 2)}
+        except asyncio.TimeoutError:
+            return {"ok": False, "erro": f"Ping excedeu {TIMEOUT_PING_SEGUNDOS}s"}
+        except Exception as e:
+            logger.warning(f"Falha no ping ao MongoDB: {e}")
+            return {"ok": False, "erro": str(e)}
+
+    async def verificar_mongodb(self):
+        """Retorna o resultado do ping, reaproveitando o último dentro do TTL"""
+        agora = time.monotonic()
+        if self._ultimo_ping is not None and agora - self._instante_ping < CACHE_PING_SEGUNDOS:
+            return {**self._ultimo_ping, "cache": True}
+
+        async with self._lock:
+            # Outra sonda pode ter atualizado o resultado enquanto esperávamos
+            agora = time.monotonic()
+            if self._ultimo_ping is not None and agora - self._instante_ping < CACHE_PING_SEGUNDOS:
+                return {**self._ultimo_ping, "cache": True}
+            self._ultimo_ping = await self._ping_mongodb()
+            self._instante_ping = time.monotonic()
+            return {**self._ultimo_ping, "cache": False}
+
+    def verificar_pool(self):
+        """Calcula a saturação do pool de conexões do MongoDB"""
+        client = obter_client_opcional()
+        tamanho_maximo = 100
+        if client is not None:
+            try:
+                tamanho_maximo = client.options.pool_options.max_pool_size or tamanho_maximo
+            except AttributeError:
+                pass
+
+        em_uso = {chave[0]: valor for chave, valor in MONGO_POOL_EM_USO.valores().items()}
+        maior_uso = max(em_uso.values(), default=0)
+        saturacao = maior_uso / tamanho_maximo if tamanho_maximo else 0.0
+        return {
+            "ok": saturacao < LIMITE_SATURACAO_POOL,
+            "em_uso": em_uso,
+            "tamanho_maximo": tamanho_maximo,
+            "saturacao": round(saturacao, 3),
+        }
+
+    def verificar_loop(self):
+        lag = self.monitor_lag.lag_atual
+        return {"ok": lag < LIMITE_LAG_SEGUNDOS, "lag_ms": round(lag * 1000, 2)}
+
+    def verificar_emails(self):
+        pendentes = EMAIL_EM_ANDAMENTO.obter()
+        return {"ok": pendentes < LIMITE_EMAILS_PENDENTES, "em_andamento": pendentes}
+
+    async def prontidao(self):
+        """
+        Executa todas as verificações
+
+        Returns:
+            tuple: (pronto, detalhes) onde pronto é True se todas passaram
+        """
+        verificacoes = {
+            "mongodb": await self.verificar_mongodb(),
+            "pool": self.verificar_pool(),
+            "event_loop": self.verificar_loop(),
+            "emails": self.verificar_emails(),
+        }
+        pronto = all(v["ok"] for v in verificacoes.values())
+        return pronto, verificacoes
+
+
+def trabalhos_pendentes():
+    """Soma as requisições HTTP e os envios de email ainda em andamento"""
+    requisicoes = sum(HTTP_EM_ANDAMENTO.valores().values())
+    return requisicoes + EMAIL_EM_ANDAMENTO.obter()
+
+
+async def drenar_trabalhos_pendentes(timeout=30.0, intervalo=0.1):
+    """
+    Aguarda o fim das confirmações e envios de email em andamento antes do
+    desligamento, até o limite de tempo informado
+
+    Returns:
+        bool: True se tudo foi concluído dentro do prazo
+    """
+    limite = time.monotonic() + timeout
+    while trabalhos_pendentes() > 0:
+        if time.monotonic() >= limite:
+            logger.warning(f"Desligando com {trabalhos_pendentes()} trabalhos ainda em andamento")
+            return False
+        await asyncio.sleep(intervalo)
+    return True
+
+
+# Instâncias globais
+monitor_lag = MonitorLagLoop()
+verificador_saude = VerificadorSaude(monitor_lag)
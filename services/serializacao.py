@@ -0,0 +1,34 @@
+"""
+Serialização JSON das respostas da API de eventos.
+
+Os documentos vindos do MongoDB trazem ObjectId (no _id do evento e, em
+documentos antigos, no _id dos convidados), datetime e, nos modelos, enums.
+RespostaJSON serializa tudo isso em uma única passada com o orjson, sem
+precisar percorrer o documento antes para converter os ObjectId nem passar
+pelo jsonable_encoder do FastAPI. Para isso a rota deve retornar a resposta
+já montada (`return RespostaJSON(evento)`): um dict retornado diretamente
+ainda passaria pelo jsonable_encoder.
+"""
+from typing import Any
+
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+
+def _converter(valor):
+    """Tipos que o orjson não conhece nativamente (datetime e enums ele já trata)"""
+    if isinstance(valor, ObjectId):
+        return str(valor)
+    raise TypeError(f"Tipo não serializável em JSON: {type(valor).__name__}")
+
+
+def serializar(conteudo: Any) -> bytes:
+    return orjson.dumps(conteudo, default=_converter)
+
+
+class RespostaJSON(JSONResponse):
+    """JSONResponse serializada com orjson, com suporte a ObjectId"""
+
+    def render(self, content: Any) -> bytes:
+        return serializar(content)
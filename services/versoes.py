@@ -0,0 +1,57 @@
+"""
+Versão dos eventos e revalidação condicional (ETag / If-None-Match).
+
+Todo documento de evento carrega um campo `versao`, incrementado por cada
+rota que grava no evento (`"$inc": INCREMENTAR_VERSAO` na mesma operação da
+alteração). O ETag das respostas da API é derivado do _id e da versão, de
+modo que para revalidar um evento basta ler esse único campo pelo índice do
+_id: se o cliente já tem a versão atual, a resposta é um 304 sem corpo.
+
+Eventos gravados antes do campo existir são tratados como versão 0 até a
+primeira alteração.
+"""
+import hashlib
+
+from fastapi import Response
+
+CAMPO_VERSAO = "versao"
+INCREMENTAR_VERSAO = {CAMPO_VERSAO: 1}
+PROJECAO_VERSAO = {CAMPO_VERSAO: 1}
+
+# O navegador guarda a resposta, mas revalida a cada uso
+CACHE_REVALIDAR_PRIVADO = "private, no-cache"
+
+
+def versao_de(evento):
+    return evento.get(CAMPO_VERSAO, 0)
+
+
+def etag_evento(evento):
+    """ETag (fraco) de um evento a partir do _id e da versão"""
+    return f'W/"{evento["_id"]}-{versao_de(evento)}"'
+
+
+def etag_lista(eventos):
+    """ETag (fraco) de uma lista de eventos: muda com inclusões, exclusões e alterações"""
+    digest = hashlib.blake2b(digest_size=12)
+    for evento in eventos:
+        digest.update(f'{evento["_id"]}-{versao_de(evento)};'.encode())
+    return f'W/"{digest.hexdigest()}"'
+
+
+def etag_confere(if_none_match, etag):
+    """Comparação fraca do If-None-Match com o ETag atual (RFC 9110, 13.1.2)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    atual = etag.removeprefix("W/")
+    return any(item.strip().removeprefix("W/") == atual for item in if_none_match.split(","))
+
+
+def cabecalhos_cache(etag):
+    return {"ETag": etag, "Cache-Control": CACHE_REVALIDAR_PRIVADO}
+
+
+def nao_modificado(etag):
+    return Response(status_code=304, headers=cabecalhos_cache(etag))
@@ -0,0 +1,110 @@
+"""
+Watchdog de bloqueios do event loop.
+
+Uma thread separada acompanha o batimento do MonitorLagLoop. Quando o loop
+fica parado por mais que o limite configurado (chamadas síncronas ao
+Mailjet, montagem de planilhas com openpyxl, bcrypt...), a thread captura a
+pilha da thread do loop enquanto o bloqueio ainda acontece, identifica a
+rota pelo endpoint presente na pilha e registra no log e nas métricas.
+
+Ativado com LOOP_WATCHDOG_ENABLED=1; limite em LOOP_WATCHDOG_THRESHOLD_MS.
+"""
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+from services.metricas import LOOP_BLOQUEIOS
+from services.saude import monitor_lag
+
+logger = logging.getLogger(__name__)
+
+WATCHDOG_ATIVO = os.getenv('LOOP_WATCHDOG_ENABLED', '0').lower() in ('1', 'true', 'sim')
+LIMITE_BLOQUEIO_SEGUNDOS = float(os.getenv('LOOP_WATCHDOG_THRESHOLD_MS', '200')) / 1000
+PROFUNDIDADE_PILHA = int(os.getenv('LOOP_WATCHDOG_STACK_DEPTH', '30'))
+
+
+def mapear_endpoints(app):
+    """
+    Monta um dicionário {code object do endpoint: caminho da rota}, usado para
+    descobrir qual rota está na pilha capturada
+    """
+    endpoints = {}
+    for rota in getattr(app, 'routes', []):
+        endpoint = getattr(rota, 'endpoint', None)
+        caminho = getattr(rota, 'path', None)
+        if endpoint is None or caminho is None:
+            continue
+        # Inclui funções decoradas (ex: cronometrar) e a função original
+        for funcao in (endpoint, inspect.unwrap(endpoint)):
+            codigo = getattr(funcao, '__code__', None)
+            if codigo is not None:
+                endpoints[codigo] = caminho
+    return endpoints
+
+
+class WatchdogLoop:
+    """Detecta e reporta callbacks que bloqueiam o event loop"""
+
+    def __init__(self, monitor_lag, limite=LIMITE_BLOQUEIO_SEGUNDOS):
+        self.monitor_lag = monitor_lag
+        self.limite = limite
+        self._endpoints = {}
+        self._id_thread_loop = None
+        self._parar = threading.Event()
+        self._thread = None
+
+    def iniciar(self, app):
+        """Deve ser chamado a partir do event loop (ex: no lifespan)"""
+        if self._thread is not None:
+            return
+        self._id_thread_loop = threading.get_ident()
+        self._endpoints = mapear_endpoints(app)
+        self._parar.clear()
+        self._thread = threading.Thread(target=self._vigiar, name="watchdog-event-loop", daemon=True)
+        self._thread.start()
+        logger.info(f"Watchdog do event loop ativo (limite: {self.limite * 1000:.0f}ms)")
+
+    def parar(self):
+        if self._thread is not None:
+            self._parar.set()
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _rota_da_pilha(self, frame):
+        while frame is not None:
+            caminho = self._endpoints.get(frame.f_code)
+            if caminho:
+                return caminho
+            frame = frame.f_back
+        return "desconhecida"
+
+    def _vigiar(self):
+        intervalo = min(self.limite / 2, self.monitor_lag.intervalo / 2)
+        batimento_reportado = None
+        while not self._parar.wait(intervalo):
+            batimento = self.monitor_lag.ultimo_batimento
+            bloqueio = time.monotonic() - batimento - self.monitor_lag.intervalo
+            # Reporta cada bloqueio apenas uma vez
+            if bloqueio < self.limite or batimento == batimento_reportado:
+                continue
+            batimento_reportado = batimento
+
+            frame = sys._current_frames().get(self._id_thread_loop)
+            if frame is None:
+                continue
+            rota = self._rota_da_pilha(frame)
+            pilha = ''.join(traceback.format_stack(frame, limit=PROFUNDIDADE_PILHA))
+            del frame
+
+            LOOP_BLOQUEIOS.inc(route=rota)
+            logger.warning(
+                f"Event loop bloqueado há {bloqueio * 1000:.0f}ms na rota {rota}. Pilha atual:\n{pilha}"
+            )
+
+
+# Instância global
+watchdog_loop = WatchdogLoop(monitor_lag)
@@ -0,0 +1,77 @@
+"""
+Ponto de entrada de produção.
+
+Executa o uvicorn com múltiplos workers, sem o file watcher do modo de
+desenvolvimento (`python app.py`). Todas as opções são configuradas por
+variáveis de ambiente:
+
+    WEB_CONCURRENCY              número de workers (padrão: núcleos da CPU)
+    UVICORN_LOOP                 auto | uvloop | asyncio (padrão: auto)
+    UVICORN_HTTP                 auto | httptools | h11 (padrão: auto)
+    UVICORN_KEEPALIVE            timeout de keep-alive em segundos (padrão: 5)
+    UVICORN_BACKLOG              backlog do socket (padrão: 2048)
+    UVICORN_GRACEFUL_TIMEOUT     tempo para drenar requisições no desligamento (padrão: 30)
+    UVICORN_LIMIT_CONCURRENCY    máximo de conexões simultâneas por worker (opcional)
+"""
+import os
+import importlib.util
+import uvicorn
+
+
+def _disponivel(modulo):
+    return importlib.util.find_spec(modulo) is not None
+
+
+def escolher_loop(preferencia):
+    """Usa uvloop quando instalado, caindo para asyncio"""
+    if preferencia == "auto":
+        return "uvloop" if _disponivel("uvloop") else "asyncio"
+    if preferencia == "uvloop" and not _disponivel("uvloop"):
+        print("uvloop não instalado, usando asyncio")
+        return "asyncio"
+    return preferencia
+
+
+def escolher_http(preferencia):
+    """Usa httptools quando instalado, caindo para h11"""
+    if preferencia == "auto":
+        return "httptools" if _disponivel("httptools") else "h11"
+    if preferencia == "httptools" and not _disponivel("httptools"):
+        print("httptools não instalado, usando h11")
+        return "h11"
+    return preferencia
+
+
+def configuracao_producao():
+    """Monta os argumentos do uvicorn a partir das variáveis de ambiente"""
+    limite_concorrencia = os.getenv("UVICORN_LIMIT_CONCURRENCY")
+    return {
+        "host": os.getenv("HOST", "0.0.0.0"),
+        "port": int(os.getenv("PORT", 8000)),
+        "workers": int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        "loop": escolher_loop(os.getenv("UVICORN_LOOP", "auto")),
+        "http": escolher_http(os.getenv("UVICORN_HTTP", "auto")),
+        "timeout_keep_alive": int(os.getenv("UVICORN_KEEPALIVE", 5)),
+        "backlog": int(os.getenv("UVICORN_BACKLOG", 2048)),
+        "timeout_graceful_shutdown": int(os.getenv("UVICORN_GRACEFUL_TIMEOUT", 30)),
+        "limit_concurrency": int(limite_concorrencia) if limite_concorrencia else None,
+        "proxy_headers": True,
+        "forwarded_allow_ips": os.getenv("FORWARDED_ALLOW_IPS", "*"),
+        "reload": False,
+    }
+
+
+if __name__ == "__main__":
+    config = configuracao_producao()
+    # Gera as variantes .br/.gz dos arquivos estáticos uma vez, antes dos
+    # workers (as bibliotecas de static/vendor/ são baixadas no build)
+    from config.assets import pre_comprimir
+    print(f"Variantes comprimidas geradas: {pre_comprimir()}")
+    # Grava o cache de bytecode dos templates, que os workers carregam no lifespan
+    from config.templates import pre_compilar
+    print(f"Templates pré-compilados: {pre_compilar()}")
+    print(
+        f"Iniciando servidor de produção: {config['workers']} workers, "
+        f"loop={config['loop']}, http={config['http']}"
+    )
+    uvicorn.run("app:app", **config)
@@ -1,6 +1,10 @@
+// Convidados exibidos na tabela (atualizados pelo feed ao vivo)
+let convidadosEvento = [];
+
 // Carrega os dados do evento ao iniciar
 document.addEventListener('DOMContentLoaded', function() {
     carregarDadosEvento();
+    iniciarFeedAoVivo();
     
     // Adiciona listeners para filtros
     document.getElementById('pesquisaConvidado').addEventListener('input', filtrarConvidados);
@@ -63,12 +67,12 @@ async function carregarDadosEvento() {
         preencherDadosEvento(evento);
         
         // Atualiza estatísticas
-        const convidados = evento.convidados || [];
-        console.log("Total de convidados:", convidados.length);
-        atualizarEstatisticas(convidados);
+        convidadosEvento = evento.convidados || [];
+        console.log("Total de convidados:", convidadosEvento.length);
+        atualizarEstatisticas(convidadosEvento);
         
         // Renderiza a lista de convidados
-        renderizarConvidados(convidados);
+        renderizarConvidados(convidadosEvento);
         
     } catch (error) {
         console.error('Erro ao carregar dados do evento:', error);
@@ -96,6 +100,11 @@ function atualizarEstatisticas(convidados) {
         return acc;
     }, { total: 0 });
     
+    aplicarEstatisticas(stats);
+}
+
+// Exibe os totais por status (calculados na página ou retornados pela API)
+function aplicarEstatisticas(stats) {
     document.getElementById('totalConvidados').textContent = stats.total || 0;
     document.getElementById('totalConfirmados').textContent = stats.confirmado || 0;
     document.getElementById('totalRecusados').textContent = stats.recusado || 0;
@@ -117,43 +126,120 @@ function renderizarConvidados(convidados) {
     }
     
     convidados.forEach(convidado => {
-        // Função para escapar caracteres especiais
-        const escapeHtml = (unsafe) => {
-            if (!unsafe) return '';
-            return unsafe
-                .replace(/&/g, "&amp;")
-                .replace(/</g, "&lt;")
-                .replace(/>/g, "&gt;")
-                .replace(/"/g, "&quot;")
-                .replace(/'/g, "&#039;");
-        };
-        
-        const row = document.createElement('tr');
-        
-        // Verificação segura para observações
-        const obsHtml = convidado.observacoes ? 
-            `<button class="btn btn-info btn-sm" onclick="mostrarObservacoes('${escapeHtml(convidado.nome)}', '${escapeHtml(convidado.email)}', '${escapeHtml(convidado.status)}', '${escapeHtml(convidado.observacoes)}')">
-                <i class="bi bi-info-circle"></i> Ver
-            </button>` : 
-            '<span class="text-muted">-</span>';
-        
-        row.innerHTML = `
-            <td>${escapeHtml(convidado.nome)}</td>
-            <td>${escapeHtml(convidado.email)}</td>
-            <td>${convidado.telefone ? escapeHtml(convidado.telefone) : '-'}</td>
-            <td><span class="badge ${getStatusClass(convidado.status)}">${escapeHtml(convidado.status)}</span></td>
-            <td>${obsHtml}</td>
-            <td>
-                <button class="btn btn-primary btn-sm me-1" onclick="reenviarEmail('${escapeHtml(convidado.email)}', '${escapeHtml(convidado.nome)}')" title="Reenviar Email">
-                    <i class="bi bi-envelope"></i>
-                </button>
-                <button class="btn btn-danger btn-sm" onclick="excluirConvidado('${escapeHtml(convidado.email)}')" title="Excluir">
-                    <i class="bi bi-trash"></i>
-                </button>
-            </td>
-        `;
-        
-        tbody.appendChild(row);
+        tbody.appendChild(criarLinhaConvidado(convidado));
+    });
+}
+
+// Monta a linha da tabela de um convidado
+function criarLinhaConvidado(convidado) {
+    // Função para escapar caracteres especiais
+    const escapeHtml = (unsafe) => {
+        if (!unsafe) return '';
+        return unsafe
+            .replace(/&/g, "&amp;")
+            .replace(/</g, "&lt;")
+            .replace(/>/g, "&gt;")
+            .replace(/"/g, "&quot;")
+            .replace(/'/g, "&#039;");
+    };
+    
+    const row = document.createElement('tr');
+    row.dataset.email = convidado.email;
+
+    // Verificação segura para observações
+    const obsHtml = convidado.observacoes ? 
+        `<button class="btn btn-info btn-sm" onclick="mostrarObservacoes('${escapeHtml(convidado.nome)}', '${escapeHtml(convidado.email)}', '${escapeHtml(convidado.status)}', '${escapeHtml(convidado.observacoes)}')">
+            <i class="bi bi-info-circle"></i> Ver
+        </button>` : 
+        '<span class="text-muted">-</span>';
+    
+    row.innerHTML = `
+        <td>${escapeHtml(convidado.nome)}</td>
+        <td>${escapeHtml(convidado.email)}</td>
+        <td>${convidado.telefone ? escapeHtml(convidado.telefone) : '-'}</td>
+        <td><span class="badge ${getStatusClass(convidado.status)}">${escapeHtml(convidado.status)}</span></td>
+        <td>${obsHtml}</td>
+        <td>
+            <button class="btn btn-primary btn-sm me-1" onclick="reenviarEmail('${escapeHtml(convidado.email)}', '${escapeHtml(convidado.nome)}')" title="Reenviar Email">
+                <i class="bi bi-envelope"></i>
+            </button>
+            <button class="btn btn-danger btn-sm" onclick="excluirConvidado('${escapeHtml(convidado.email)}')" title="Excluir">
+                <i class="bi bi-trash"></i>
+            </button>
+        </td>
+    `;
+    
+    return row;
+}
+
+// Linha da tabela de um convidado (ou null)
+function linhaConvidado(email) {
+    return document.querySelector(`#listaConvidados tr[data-email="${CSS.escape(email)}"]`);
+}
+
+// Aplica a alteração de um convidado (feed ao vivo ou resposta da API), sem recarregar a lista
+function aplicarAlteracaoConvidado(email, alteracoes) {
+    let convidado = convidadosEvento.find(c => c.email === email);
+    if (!convidado) {
+        // Convidado novo: só é possível incluí-lo com o registro completo
+        if (!alteracoes.nome) {
+            carregarDadosEvento();
+            return;
+        }
+        convidado = { email };
+        convidadosEvento.push(convidado);
+    }
+    Object.assign(convidado, alteracoes);
+    
+    const linhaAtual = linhaConvidado(email);
+    if (linhaAtual) {
+        linhaAtual.replaceWith(criarLinhaConvidado(convidado));
+    } else if (convidadosEvento.length === 1) {
+        // Remove a mensagem de lista vazia
+        renderizarConvidados(convidadosEvento);
+    } else {
+        document.getElementById('listaConvidados').appendChild(criarLinhaConvidado(convidado));
+    }
+    atualizarEstatisticas(convidadosEvento);
+    filtrarConvidados();
+}
+
+// Retira um convidado excluído da tabela
+function removerConvidado(email) {
+    const posicao = convidadosEvento.findIndex(c => c.email === email);
+    if (posicao === -1) return;
+    convidadosEvento.splice(posicao, 1);
+    
+    const linhaAtual = linhaConvidado(email);
+    if (linhaAtual) linhaAtual.remove();
+    if (convidadosEvento.length === 0) renderizarConvidados(convidadosEvento);
+    atualizarEstatisticas(convidadosEvento);
+}
+
+// Assina o feed de respostas dos convidados (Server-Sent Events)
+function iniciarFeedAoVivo() {
+    if (!window.EventSource) return;
+    
+    const fonte = new EventSource(`/api/eventos/${getEventoId()}/ao-vivo`);
+    let reconectando = false;
+    
+    fonte.addEventListener('convidado', function(e) {
+        const dados = JSON.parse(e.data);
+        aplicarAlteracaoConvidado(dados.email, dados.alteracoes);
+    });
+    fonte.addEventListener('removido', function(e) {
+        removerConvidado(JSON.parse(e.data).email);
+    });
+    fonte.addEventListener('recarregar', function() {
+        carregarDadosEvento();
+    });
+    fonte.addEventListener('open', function() {
+        // Alterações feitas enquanto a conexão estava fechada não são reenviadas
+        if (reconectando) carregarDadosEvento();
+        reconectando = false;
+    });
+    fonte.addEventListener('error', function() {
+        reconectando = true;
     });
 }
 
@@ -414,6 +500,10 @@ async function importarConvidados() {
             mensagem += `, ${result.registros_incompletos} com dados incompletos)`;
         }
         
+        if (result.total_ignorados) {
+            mensagem += `<br>${result.total_ignorados} já estavam na lista e foram ignorados.`;
+        }
+        
         if (result.convidados && result.convidados.length > 0) {
             mensagem += '<br><br>Convidados importados (primeiros 5):<br>';
             const convidadosExemplo = result.convidados.slice(0, 5);
@@ -469,14 +559,25 @@ async function adicionarConvidado() {
             throw new Error(`Erro ${response.status}: ${response.statusText}`);
         }
         
+        const resultado = await response.json();
+        
         // Fecha o modal e limpa o formulário
         const modal = bootstrap.Modal.getInstance(document.getElementById('addConvidadoModal'));
         modal.hide();
         document.getElementById('formAddConvidado').reset();
         
-        // Recarrega os dados
-        await carregarDadosEvento();
-        showAlert('Convidado adicionado com sucesso!');
+        // A API retorna apenas o convidado gravado e os totais do evento
+        if (resultado.convidado) {
+            aplicarAlteracaoConvidado(resultado.convidado.email, resultado.convidado);
+        }
+        if (resultado.estatisticas) {
+            aplicarEstatisticas(resultado.estatisticas);
+        }
+        if (resultado.acao === 'ignorado') {
+            showAlert('Este email já está na lista de convidados.', 'info');
+        } else {
+            showAlert('Convidado adicionado com sucesso!');
+        }
         
     } catch (error) {
         console.error('Erro ao adicionar convidado:', error);
@@ -528,7 +629,11 @@ async function excluirConvidado(email) {
             throw new Error(`Erro ${response.status}: ${response.statusText}`);
         }
         
-        await carregarDadosEvento();
+        const resultado = await response.json();
+        removerConvidado(email);
+        if (resultado.estatisticas) {
+            aplicarEstatisticas(resultado.estatisticas);
+        }
         showAlert('Convidado excluído com sucesso!');
         
     } catch (error) {
@@ -615,7 +720,7 @@ async function atualizarObservacoes(email, observacoes) {
             throw new Error(`Erro ${response.status}: ${response.statusText}`);
         }
         
-        await carregarDadosEvento();
+        aplicarAlteracaoConvidado(email, { observacoes });
         showAlert('Observações atualizadas com sucesso!');
         
     } catch (error) {
@@ -0,0 +1,22 @@
+import asyncio
+
+from bson import ObjectId
+from mongomock_motor import AsyncMongoMockClient
+
+from services.convidados import IndiceConvidados, gravar_convidados
+
+
+def test_inclusao_concorrente_nao_duplica_email_em_outra_caixa():
+    async def cenario():
+        colecao = AsyncMongoMockClient().db.eventos
+        evento_oid = ObjectId()
+        await colecao.insert_one({"_id": evento_oid, "convidados": []})
+        # As duas requisições leram a lista antes de qualquer gravação
+        lida = IndiceConvidados([])
+        for email in ("Foo@x.com", "foo@x.com"):
+            inserir, alterar, _ = lida.classificar([{"nome": "Foo", "email": email}])
+            await gravar_convidados(colecao, evento_oid, inserir, alterar, "ignorar")
+        return (await colecao.find_one({"_id": evento_oid}))["convidados"]
+
+    convidados = asyncio.run(cenario())
+    assert [c["email"] for c in convidados] == ["Foo@x.com"]
@@ -0,0 +1,100 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from config import email_validador
+from config.email_validador import EmailValidador, VerificadorDominios
+
+MOTIVO_NXDOMAIN = "The domain name inexistente.com.br does not exist."
+
+
+class ResolverStub:
+    """Resolver DNS local: respostas fixas por domínio e contagem de consultas"""
+
+    def __init__(self, respostas):
+        self.respostas = respostas
+        self.consultas = []
+        self._lock = threading.Lock()
+
+    def __call__(self, dominio):
+        with self._lock:
+            self.consultas.append(dominio)
+        resposta = self.respostas[dominio]
+        if isinstance(resposta, Exception):
+            raise resposta
+        return resposta
+
+
+@pytest.fixture
+def resolver():
+    return ResolverStub({
+        "exemplo.com.br": (True, "Domínio aceita emails", True),
+        "inexistente.com.br": (False, MOTIVO_NXDOMAIN, True),
+        "lento.com.br": (True, "Entregabilidade não verificada: The DNS operation timed out.", False),
+        "quebrado.com.br": TimeoutError("timed out"),
+    })
+
+
+@pytest.fixture
+def relogio(monkeypatch):
+    agora = SimpleNamespace(valor=1000.0)
+    monkeypatch.setattr(email_validador, "time", SimpleNamespace(monotonic=lambda: agora.valor))
+    return agora
+
+
+def test_dominio_com_mx_aceito_e_reaproveitado_do_cache(resolver):
+    verificador = VerificadorDominios(resolver=resolver)
+    assert verificador.verificar("exemplo.com.br") == (True, "Domínio aceita emails")
+    assert verificador.verificar("exemplo.com.br") == (True, "Domínio aceita emails")
+    assert resolver.consultas == ["exemplo.com.br"]
+
+
+def test_nxdomain_rejeita_o_email(resolver):
+    verificador = VerificadorDominios(resolver=resolver)
+    resultado = EmailValidador.validar_email(
+        "ana@inexistente.com.br", verificar_dominio=True, verificador=verificador
+    )
+    assert resultado == {"valido": False, "motivo": MOTIVO_NXDOMAIN, "email_normalizado": None}
+
+
+@pytest.mark.parametrize("dominio", ["lento.com.br", "quebrado.com.br"])
+def test_timeout_nao_rejeita_nem_fica_no_cache(resolver, dominio):
+    verificador = VerificadorDominios(resolver=resolver)
+    for _ in range(2):
+        aceita, motivo = verificador.verificar(dominio)
+        assert aceita and motivo.startswith("Entregabilidade não verificada")
+    assert resolver.consultas == [dominio, dominio]
+
+
+def test_cache_expira_depois_do_ttl(resolver, relogio):
+    verificador = VerificadorDominios(resolver=resolver, ttl=60)
+    verificador.verificar("exemplo.com.br")
+    relogio.valor += 59
+    verificador.verificar("exemplo.com.br")
+    assert resolver.consultas == ["exemplo.com.br"]
+    relogio.valor += 2
+    verificador.verificar("exemplo.com.br")
+    assert resolver.consultas == ["exemplo.com.br", "exemplo.com.br"]
+
+
+def test_validar_lote_consulta_cada_dominio_uma_vez(resolver):
+    verificador = VerificadorDominios(resolver=resolver)
+    emails = [
+        "ana@exemplo.com.br", "Bia@Exemplo.com.br", "ana@exemplo.com.br ",
+        "caio@inexistente.com.br", "davi@inexistente.com.br", "sem-arroba",
+    ]
+    resultados = EmailValidador.validar_lote(emails, verificar_dominio=True, verificador=verificador)
+
+    assert sorted(resolver.consultas) == ["exemplo.com.br", "inexistente.com.br"]
+    assert [r["valido"] for r in resultados] == [True, True, True, False, False, False]
+    assert [r["email_normalizado"] for r in resultados[:3]] == [
+        "ana@exemplo.com.br", "bia@exemplo.com.br", "ana@exemplo.com.br"
+    ]
+    assert resultados[3]["motivo"] == MOTIVO_NXDOMAIN
+
+
+def test_sem_verificar_dominio_o_resolver_nao_e_consultado(resolver):
+    verificador = VerificadorDominios(resolver=resolver)
+    resultados = EmailValidador.validar_lote(["ana@inexistente.com.br"], verificador=verificador)
+    assert resultados[0]["valido"] and resolver.consultas == []
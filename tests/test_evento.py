@@ -0,0 +1,56 @@
+import pytest
+from pydantic import ValidationError
+
+from models.evento import Convidado, StatusConvidado, validar_convidados_em_lote, validar_data_evento
+
+
+@pytest.mark.parametrize("data", ["2099-1-5", "2099-01-05", "2099-12-31"])
+def test_data_aceita_mes_e_dia_com_ou_sem_zero(data):
+    assert validar_data_evento(data) == data
+
+
+@pytest.mark.parametrize("data", ["2099-13-1", "2099-2-30", "99-1-5", "2099/01/05", "2000-01-01"])
+def test_data_invalida_ou_no_passado(data):
+    with pytest.raises(ValueError):
+        validar_data_evento(data)
+
+
+BASE_CONVIDADO = {"nome": "Ana Souza", "email": "Ana@Exemplo.com.br"}
+
+
+@pytest.mark.parametrize("extra", [
+    {},
+    {"confirmado": True},
+    {"confirmado": "true"},
+    {"confirmado": 1},
+    {"confirmado": "no"},
+    {"status": StatusConvidado.CONFIRMADO},
+    {"status": "recusado", "telefone": "(11) 98765-4321", "observacoes": None},
+])
+def test_lote_aceita_as_mesmas_entradas_que_o_modelo(extra):
+    registro = {**BASE_CONVIDADO, **extra}
+    esperado = Convidado.model_validate(registro)
+
+    (convidado,), erros = validar_convidados_em_lote([registro])
+
+    assert erros == []
+    assert convidado.model_dump() == esperado.model_dump()
+    assert convidado.model_fields_set == esperado.model_fields_set
+    assert convidado.__pydantic_private__ == esperado.__pydantic_private__
+
+
+@pytest.mark.parametrize("extra, campo", [
+    ({"confirmado": "talvez"}, "confirmado"),
+    ({"nome": "A"}, "nome"),
+    ({"status": "ausente"}, "status"),
+    ({"email": "sem-arroba"}, "email"),
+])
+def test_lote_rejeita_o_que_o_modelo_rejeita(extra, campo):
+    registro = {**BASE_CONVIDADO, **extra}
+    with pytest.raises(ValidationError):
+        Convidado.model_validate(registro)
+
+    (convidado,), erros = validar_convidados_em_lote([registro])
+
+    assert convidado is None
+    assert [erro["campo"] for erro in erros] == [campo]
@@ -0,0 +1,68 @@
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+
+from services.metricas import HTTP_DURACAO, HTTP_EM_ANDAMENTO, MetricasMiddleware
+
+ROTA = "/feed/{canal}"
+
+
+def _app(liberar):
+    app = FastAPI()
+
+    @app.get(ROTA)
+    async def feed(canal: str):
+        async def eventos():
+            yield b"data: inicio\n\n"
+            await liberar.wait()
+            yield b"data: fim\n\n"
+        return StreamingResponse(eventos(), media_type="text/event-stream")
+
+    return MetricasMiddleware(app)
+
+
+def _duracao_total():
+    serie = HTTP_DURACAO.valores().get(("GET", ROTA, "200"))
+    return (serie[1], serie[2]) if serie else (0.0, 0)
+
+
+def test_resposta_em_streaming_conta_ate_o_ultimo_bloco():
+    async def cenario():
+        liberar = asyncio.Event()
+        app = _app(liberar)
+        primeiro_bloco = asyncio.Event()
+        enviados = []
+
+        async def receive():
+            await asyncio.Event().wait()
+
+        async def send(mensagem):
+            enviados.append(mensagem)
+            if mensagem["type"] == "http.response.body":
+                primeiro_bloco.set()
+
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": "/feed/a", "raw_path": b"/feed/a", "root_path": "",
+            "query_string": b"", "headers": [], "server": ("teste", 80), "client": ("teste", 1),
+        }
+        em_andamento_antes = HTTP_EM_ANDAMENTO.obter(method="GET")
+        soma_antes, total_antes = _duracao_total()
+
+        requisicao = asyncio.create_task(app(scope, receive, send))
+        await asyncio.wait_for(primeiro_bloco.wait(), timeout=5)
+        await asyncio.sleep(0.2)
+        durante = HTTP_EM_ANDAMENTO.obter(method="GET") - em_andamento_antes
+        total_durante = _duracao_total()[1] - total_antes
+
+        liberar.set()
+        await asyncio.wait_for(requisicao, timeout=5)
+        soma_depois, total_depois = _duracao_total()
+        return (durante, total_durante, HTTP_EM_ANDAMENTO.obter(method="GET") - em_andamento_antes,
+                total_depois - total_antes, soma_depois - soma_antes)
+
+    durante, total_durante, depois, total, duracao = asyncio.run(cenario())
+    assert (durante, total_durante) == (1, 0)
+    assert (depois, total) == (0, 1)
+    assert duracao >= 0.2
@@ -0,0 +1,80 @@
+import asyncio
+
+import mongomock
+from pymongo.errors import PyMongoError
+
+from services import mudancas
+from services.mudancas import Mudanca, OuvinteMudancas, PIPELINE_MUDANCAS, REINICIO
+
+
+def _evento_do_stream(versao_alteracao, versao_documento, emails):
+    """Evento de change stream de uma resposta (convidados.1.status) com o fullDocument do updateLookup"""
+    colecao = mongomock.MongoClient().db.mudancas
+    colecao.insert_one({
+        "operationType": "update",
+        "documentKey": {"_id": "evento"},
+        "updateDescription": {
+            "updatedFields": {"convidados.1.status": "confirmado", "versao": versao_alteracao},
+            "removedFields": [],
+        },
+        "fullDocument": {"versao": versao_documento, "convidados": [{"email": e} for e in emails]},
+    })
+    return Mudanca.do_documento(next(colecao.aggregate(PIPELINE_MUDANCAS)))
+
+
+def test_email_do_convidado_vem_do_documento_da_propria_alteracao():
+    mudanca = _evento_do_stream(7, 7, ["ana@x.com", "bia@x.com", "caio@x.com"])
+    assert mudanca.alteracoes_convidados() == ({1: {"status": "confirmado"}}, False)
+    assert mudanca.email_convidado(1) == "bia@x.com"
+
+
+def test_documento_posterior_a_alteracao_nao_identifica_o_convidado():
+    # Um $pull de ana@x.com depois da resposta deslocou as posições
+    mudanca = _evento_do_stream(7, 8, ["bia@x.com", "caio@x.com"])
+    assert mudanca.email_convidado(1) is None
+
+
+class FluxoFalso:
+    def __init__(self, cair):
+        self.cair = cair
+        self.resume_token = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *erro):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.cair:
+            raise PyMongoError("conexão perdida")
+        await asyncio.Event().wait()
+
+
+class ColecaoFalsa:
+    def __init__(self, fluxos):
+        self.fluxos = iter(fluxos)
+
+    def watch(self, pipeline, resume_after=None, full_document=None):
+        return next(self.fluxos)
+
+
+def test_reabrir_o_stream_sem_token_entrega_reinicio(monkeypatch):
+    monkeypatch.setattr(mudancas, "ESPERA_INICIAL_SEGUNDOS", 0)
+
+    async def cenario():
+        ouvinte = OuvinteMudancas()
+        recebidas = []
+        ouvinte.assinar(recebidas.append)
+        db = type("Db", (), {"eventos": ColecaoFalsa([FluxoFalso(cair=True), FluxoFalso(cair=False)])})
+        ouvinte.iniciar(db)
+        for _ in range(20):
+            await asyncio.sleep(0)
+        ativo = ouvinte.ativo
+        await ouvinte.parar()
+        return [m.operacao for m in recebidas], ativo
+
+    assert asyncio.run(cenario()) == ([REINICIO], True)
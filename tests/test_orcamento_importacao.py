@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Dependências que só podem ser importadas no primeiro uso (relatórios,
+# importação de planilhas, envio de emails e verificação de domínios)
+MODULOS_PESADOS = ("openpyxl", "pandas", "numpy", "bs4", "mailjet_rest", "dns")
+
+ORCAMENTO_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+CODIGO = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+print(json.dumps({
+    "importacao_ms": (time.perf_counter() - inicio) * 1000,
+    "carregados": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def _importar_app():
+    resultado = subprocess.run(
+        [sys.executable, "-c", CODIGO % (MODULOS_PESADOS,)],
+        cwd=BASE_DIR, capture_output=True, text=True, timeout=120,
+    )
+    assert resultado.returncode == 0, resultado.stderr
+    # A última linha é o JSON; as anteriores são prints da aplicação
+    return json.loads(resultado.stdout.strip().splitlines()[-1])
+
+
+def test_importar_app_nao_carrega_dependencias_pesadas():
+    assert _importar_app()["carregados"] == []
+
+
+def test_importar_app_dentro_do_orcamento():
+    # Melhor de três processos novos, para não medir o aquecimento do cache de disco
+    tempos = [_importar_app()["importacao_ms"] for _ in range(3)]
+    assert min(tempos) <= ORCAMENTO_MS, f"importação levou {min(tempos):.0f}ms (orçamento: {ORCAMENTO_MS:.0f}ms)"
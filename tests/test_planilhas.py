@@ -0,0 +1,56 @@
+from bson import ObjectId
+import openpyxl
+import pandas as pd
+
+from services.planilhas import montar_relatorio_completo
+
+CAMPOS_COMPLETO = ["evento_id", "evento_nome", "evento_data", "evento_local",
+                   "nome", "email", "telefone", "status", "observacoes"]
+
+
+def _convidado(evento, nome, status):
+    return [str(evento["_id"]), evento["nome"], evento["data"], evento["local"],
+            nome, f"{nome.lower()}@exemplo.com.br", None, status, None]
+
+
+def test_relatorio_completo_conta_convidados_sem_status():
+    sem_status = {"_id": ObjectId(), "nome": "Sem status", "data": "2099-01-01", "local": "A"}
+    com_status = {"_id": ObjectId(), "nome": "Com status", "data": "2099-01-02", "local": "B"}
+    quadro = pd.DataFrame([
+        _convidado(sem_status, "Ana", None),
+        _convidado(sem_status, "Bia", None),
+        _convidado(com_status, "Caio", "confirmado"),
+        _convidado(com_status, "Davi", "pendente"),
+    ], columns=CAMPOS_COMPLETO)
+
+    arquivo = montar_relatorio_completo([sem_status, com_status], quadro)
+    resumo = openpyxl.load_workbook(arquivo)["Resumo Geral"]
+
+    # Colunas: nome, data, local, total de convidados, confirmados
+    assert [resumo.cell(row=4, column=c).value for c in (1, 4, 5)] == ["Sem status", 2, 0]
+    assert [resumo.cell(row=5, column=c).value for c in (1, 4, 5)] == ["Com status", 2, 1]
+
+
+def test_relatorio_completo_totais_por_status_e_dados_detalhados():
+    primeiro = {"_id": ObjectId(), "nome": "Primeiro", "data": "2099-01-01", "local": "A"}
+    segundo = {"_id": ObjectId(), "nome": "Segundo", "data": "2099-01-02", "local": "B"}
+    quadro = pd.DataFrame([
+        _convidado(primeiro, "Ana", "confirmado"),
+        _convidado(primeiro, "Bia", "recusado"),
+        _convidado(segundo, "Caio", "confirmado"),
+        _convidado(segundo, "Davi", None),
+        _convidado(segundo, "Eva", "pendente"),
+    ], columns=CAMPOS_COMPLETO)
+
+    pasta = openpyxl.load_workbook(montar_relatorio_completo([primeiro, segundo], quadro))
+    resumo = pasta["Resumo Geral"]
+    estatisticas = pasta["Estatísticas Detalhadas"]
+    dados = pasta["Dados Detalhados"]
+
+    assert [c.value for c in resumo[5]][:6] == ["Segundo", "2099-01-02", "B", 3, 1, "33.3%"]
+    assert [resumo.cell(row=6, column=c).value for c in (1, 4, 5, 6)] == ["TOTAL GERAL", 5, 2, "40.0%"]
+    # Confirmados, recusados e pendentes
+    assert [estatisticas.cell(row=r, column=2).value for r in (9, 10, 11)] == [2, 1, 1]
+    assert [c.value for c in dados[7]] == ["Segundo", "2099-01-02", "Davi", "davi@exemplo.com.br", None, None, None]
+    cores = [dados.cell(row=r, column=6).fill.fgColor.rgb for r in (4, 5, 7)]
+    assert cores == ["00C6EFCE", "00FFC7CE", "00000000"]
@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from services import saude
+from services.email_service import EmailService
+from services.metricas import EMAIL_EM_ANDAMENTO
+
+
+class MailjetBloqueado:
+    """Cliente Mailjet que só responde depois de liberado"""
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.send = SimpleNamespace(create=self.create)
+
+    def create(self, data):
+        self.liberar.wait(timeout=10)
+        return SimpleNamespace(status_code=200, json=lambda: {})
+
+
+def test_prontidao_falha_com_fila_de_emails_acima_do_limite(monkeypatch):
+    monkeypatch.setattr(saude, "LIMITE_EMAILS_PENDENTES", 3)
+    servico = EmailService()
+    servico.mailjet = MailjetBloqueado()
+
+    async def cenario():
+        envios = [
+            asyncio.create_task(servico.enviar_email_html(f"c{i}@exemplo.com.br", "Convite", "<p>Oi</p>"))
+            for i in range(5)
+        ]
+        while EMAIL_EM_ANDAMENTO.obter() < 5:
+            await asyncio.sleep(0.01)
+        durante = saude.verificador_saude.verificar_emails()
+        servico.mailjet.liberar.set()
+        resultados = await asyncio.gather(*envios)
+        return durante, resultados, saude.verificador_saude.verificar_emails()
+
+    durante, resultados, depois = asyncio.run(asyncio.wait_for(cenario(), timeout=10))
+    assert durante == {"ok": False, "em_andamento": 5}
+    assert resultados == [True] * 5
+    assert depois == {"ok": True, "em_andamento": 0}